@@ -4,19 +4,37 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+def parse_symbols(value):
+    """"EURUSD, gbpusd," or a list -> ["EURUSD", "GBPUSD"]."""
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(s).strip().upper() for s in value if str(s).strip()]
+
 class Config:
     # Telegram
     TELEGRAM_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
     TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+    TELEGRAM_MODE = os.getenv("TELEGRAM_MODE", "polling")  # "polling" or "webhook"
+    TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL")  # e.g. a local fake API for tests
+    TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL")  # public https base URL (reverse proxy / tunnel)
+    TELEGRAM_WEBHOOK_HOST = os.getenv("TELEGRAM_WEBHOOK_HOST", "127.0.0.1")
+    TELEGRAM_WEBHOOK_PORT = int(os.getenv("TELEGRAM_WEBHOOK_PORT", 8443))
+    TELEGRAM_WEBHOOK_PATH = os.getenv("TELEGRAM_WEBHOOK_PATH", "/telegram")
+    TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET")  # required for webhook mode
 
     # MT5
     MT5_LOGIN = int(os.getenv("MT5_LOGIN")) if os.getenv("MT5_LOGIN") else 0
     MT5_PASSWORD = os.getenv("MT5_PASSWORD")
     MT5_SERVER = os.getenv("MT5_SERVER")
     MT5_PATH = os.getenv("MT5_PATH")
+    MT5_RECONNECT_BASE = 0.25     # first reconnect delay, seconds (doubles, jittered)
+    MT5_RECONNECT_MAX = 30.0      # backoff cap, seconds
+    MT5_HEALTH_INTERVAL = 15      # terminal probe period, seconds
+    MT5_MAX_EMPTY_RESULTS = 3     # consecutive empty results treated as a disconnect
+    MT5_RECORD_PATH = os.getenv("MT5_RECORD_PATH")  # Set to record every terminal call for offline replay
 
     # Trading Defaults
-    SYMBOL_LIST = ["EURUSD", "GBPUSD", "XAUUSD"]  # Default list
+    SYMBOL_LIST = parse_symbols(os.getenv("SYMBOL_LIST", "EURUSD,GBPUSD,XAUUSD"))  # Default list
     TIMEFRAME_HTF = "H1"
     TIMEFRAME_LTF = "M1"
     
@@ -24,17 +42,99 @@ class Config:
     RISK_PER_TRADE = float(os.getenv("RISK_PERCENT", 2.0))
     MAX_DAILY_DD = float(os.getenv("MAX_DAILY_DRAWDOWN", 5.0))
     MAGIC_NUMBER = 234987
+    SESSION_START = os.getenv("SESSION_START", "08:00")  # UTC, London open
+    SESSION_END = os.getenv("SESSION_END", "22:00")      # UTC, NY close
+
+    # Execution
+    ORDER_DEVIATION = int(os.getenv("ORDER_DEVIATION", 20))  # max slippage in points
+    ADAPTIVE_DEVIATION = os.getenv("ADAPTIVE_DEVIATION", "false").lower() == "true"
+    DEVIATION_MIN = 5
+    DEVIATION_MAX = 100
+    DEVIATION_MIN_SAMPLES = 20  # orders per symbol before adapting
+    EXEC_STATS_WINDOW = 1000    # recent orders kept in memory per symbol
+    EXEC_FLUSH_BATCH = 50
+    EXEC_FLUSH_INTERVAL = 300   # seconds
     
     # Strategy
-    RSI_PERIOD = 14
-    EMA_FAST = 9  # Razgon Mode: Fast Scalping
-    EMA_SLOW = 21 # Razgon Mode: Fast Trend
-    ATR_PERIOD = 14
+    RSI_PERIOD = int(os.getenv("RSI_PERIOD", 14))
+    EMA_FAST = int(os.getenv("EMA_FAST", 9))  # Razgon Mode: Fast Scalping
+    EMA_SLOW = int(os.getenv("EMA_SLOW", 21)) # Razgon Mode: Fast Trend
+    ATR_PERIOD = int(os.getenv("ATR_PERIOD", 14))
+    # "closed": evaluate each closed LTF bar once (memoized), "forming": re-evaluate the live bar every pass
+    SIGNAL_MODE = os.getenv("SIGNAL_MODE", "closed").lower()
     
+    # Shared-memory market data bus (one feeder, many strategy workers)
+    # On: a feeder process polls the terminal and the strategy, zones and correlation read shared memory
+    DATA_BUS = os.getenv("DATA_BUS", "false").lower() == "true"
+    DATA_BUS_NAME = os.getenv("DATA_BUS_NAME", "razgon")
+    DATA_BUS_BARS = int(os.getenv("DATA_BUS_BARS", 500))   # ring size per symbol/timeframe
+    DATA_BUS_TICKS = int(os.getenv("DATA_BUS_TICKS", 4096)) # ring size per symbol
+    DATA_BUS_INTERVAL = float(os.getenv("DATA_BUS_INTERVAL", 1.0)) # feeder poll seconds
+    DATA_BUS_TIMEFRAMES = ["H1", "M1"]
+
+    # Event loop watchdog
+    LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", 0.1))    # tick, seconds
+    LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", 0.5))  # stall, seconds
+    LOOP_LAG_SAMPLES = 3000
+    LOOP_LAG_ALERT_COOLDOWN = 300  # seconds between Telegram stall alerts
+
+    # Memory instrumentation (/mem)
+    MEM_TRACE = os.getenv("MEM_TRACE", "false").lower() == "true"  # start tracemalloc at boot
+    MEM_TRACE_FRAMES = 1
+    MEM_TOP_N = 10
+    MEM_SNAPSHOT_INTERVAL = int(os.getenv("MEM_SNAPSHOT_INTERVAL", 0))  # seconds, 0 = on demand only
+
+    # Sampling profiler (/profile, or automatic on slow loop iterations)
+    PROFILE_INTERVAL = 0.005  # seconds between stack samples
+    PROFILE_AUTO_THRESHOLD = float(os.getenv("PROFILE_AUTO_THRESHOLD", 5.0))  # iteration seconds, 0 = off
+    PROFILE_AUTO_DURATION = 30     # seconds sampled after a slow iteration
+    PROFILE_AUTO_COOLDOWN = 1800   # seconds between automatic sessions
+    PROFILE_MAX_DURATION = 600     # manual sessions stop themselves after this
+    PROFILE_TOP_N = 12
+
+    # Hot reload (.env plus optional YAML/TOML/JSON overrides keyed by attribute name)
+    ENV_FILE = os.path.join(os.getcwd(), ".env")
+    CONFIG_FILE = os.getenv("CONFIG_FILE")
+    CONFIG_RELOAD_INTERVAL = 5  # seconds between file checks
+
     # Directories
     LOG_DIR = os.path.join(os.getcwd(), "logs")
     DATA_DIR = os.path.join(os.getcwd(), "data")
 
+    # News blackout calendar (CSV or JSON rows: time (UTC ISO), currency, impact, title)
+    NEWS_FILE = os.getenv("NEWS_FILE", os.path.join(DATA_DIR, "news.csv"))
+    NEWS_MIN_IMPACT = os.getenv("NEWS_MIN_IMPACT", "MEDIUM")
+    NEWS_BLACKOUT_MINUTES = {"HIGH": (30, 30), "MEDIUM": (15, 15), "LOW": (5, 5)}  # before, after
+    NEWS_RELOAD_INTERVAL = 60  # seconds between file change checks
+    SYMBOL_CURRENCIES = {}     # overrides for symbols that are not 6-letter pairs, e.g. {"US30": ["USD"]}
+
+    # Multi-timeframe support/resistance zones
+    ZONE_TIMEFRAMES = {"H1": 500, "H4": 300, "D1": 200}  # timeframe -> bars scanned for pivots
+    ZONE_PIVOT_LOOKBACK = 20
+    ZONE_WIDTH_ATR = float(os.getenv("ZONE_WIDTH_ATR", 0.25))  # pivots closer than this x H1 ATR share a zone
+    ZONE_NEAR_ATR = float(os.getenv("ZONE_NEAR_ATR", 1.0))     # "price is at a zone" distance, x H1 ATR
+    ZONE_CHECK_INTERVAL = 60  # seconds between new-bar checks per symbol
+    ZONE_FILTER = os.getenv("ZONE_FILTER", "false").lower() == "true"  # skip entries straight into a zone
+
+    # Trade journal (SQLite, WAL)
+    JOURNAL_PATH = os.getenv("JOURNAL_PATH", os.path.join(DATA_DIR, "journal.db"))
+    JOURNAL_BATCH = 200             # rows per write transaction
+    JOURNAL_FLUSH_INTERVAL = 2.0    # seconds a row may wait for its batch
+    JOURNAL_DEAL_SYNC_INTERVAL = 60  # seconds between MT5 deal history pulls
+    JOURNAL_DEAL_LOOKBACK_DAYS = 7   # history pulled on first sync
+
+    # Correlated exposure gate (rolling correlation of closed-bar log returns)
+    CORR_TIMEFRAME = "M15"
+    CORR_WINDOW = 96           # bars (one day of M15)
+    CORR_CHECK_INTERVAL = 60   # seconds between new-bar checks
+    CORR_THRESHOLD = float(os.getenv("CORR_THRESHOLD", 0.7))         # |correlation| counted as the same bet
+    CORR_MAX_EXPOSURE = float(os.getenv("CORR_MAX_EXPOSURE", 0.04))  # lots per correlated direction, 0 = off
+
+    # Warm-start snapshot (risk counters, toggles, signal memo, S/R zones)
+    STATE_PATH = os.getenv("STATE_PATH", os.path.join(DATA_DIR, "state.json"))
+    STATE_SAVE_INTERVAL = 60   # seconds between periodic snapshots
+    STATE_MAX_AGE = 86400      # older snapshots are ignored at startup
+
     @staticmethod
     def validate():
         if not Config.TELEGRAM_TOKEN:
@@ -8,34 +8,86 @@ from modules.risk_manager import risk_manager
 from modules.strategy import strategy
 from modules.telegram_bot import telegram_bot
 from modules.market_analysis import market_analyzer
+from modules.watchdog import loop_watchdog
+from modules.execution_stats import execution_stats
+from modules.connection_manager import connection_manager
+from modules.config_watcher import config_watcher
+from modules.mem_profiler import memory_monitor
+from modules.trade_journal import trade_journal
+from modules.sampling_profiler import sampling_profiler
+from modules.position_tracker import position_tracker
+from modules.clock import clock
+from modules.state_store import state_store
+from modules.correlation import correlation_monitor
+from modules.zone_index import zone_index
+from modules.data_bus import market_data_bus, start_feeder_process, required_timeframes
+
+# Tickets whose SL is still on the losing side of the open price (break-even not done yet)
+break_even_pending = set()
+
+# (process, stop_event) of the market data feeder when DATA_BUS is on
+data_feeder = None
+
+def start_data_bus():
+    """
+    DATA_BUS: a feeder process polls bars for Config.SYMBOL_LIST and the strategy,
+    zone index and correlation monitor read them from shared memory. Orders,
+    positions and account queries stay on mt5_interface. Symbols added by a
+    config reload are not fed until a restart.
+    """
+    global data_feeder
+    timeframes = required_timeframes()
+    data_feeder = start_feeder_process(list(Config.SYMBOL_LIST), timeframes)
+    for reader in (strategy, zone_index, correlation_monitor):
+        reader.data_source = market_data_bus
+    logger.info(f"Market data bus on: feeder pid {data_feeder[0].pid}, timeframes {', '.join(timeframes)}")
+
+def stop_data_bus():
+    global data_feeder
+    if data_feeder is None:
+        return
+    process, stop_event = data_feeder
+    stop_event.set()
+    process.join(timeout=5)
+    market_data_bus.close()
+    data_feeder = None
+
+def track_break_even(event):
+    """Position tracker subscriber: keeps break_even_pending in step with opens, SL moves and closes."""
+    p = event.position
+    waiting = p.sl < p.price_open if p.type == 0 else p.sl > p.price_open
+    if event.kind != 'closed' and waiting:
+        break_even_pending.add(event.ticket)
+    else:
+        break_even_pending.discard(event.ticket)
 
 async def trading_loop():
     """Core Trading Logic Loop."""
     logger.info("Trading Loop Started")
     
     # Initial Setup
-    if mt5_interface.initialize():
+    if await connection_manager.ensure_connected(max_attempts=1):
         account = mt5_interface.get_account_info()
-        if account:
+        # A warm start keeps today's start balance; drawdown counts from the day's start, not the restart
+        if account and not risk_manager.daily_start_balance:
             risk_manager.set_daily_start_balance(account['balance'])
     else:
         logger.error("MT5 Initialization Failed. Trading loop will wait for connection.")
     
-    last_analysis_time = 0
     ANALYSIS_INTERVAL = 1800 # 30 minutes in seconds
 
     while True:
+        iteration_start = time.perf_counter()
         try:
             # Heartbeat every ~1 minute
-            if int(time.time()) % 60 < 11:
+            if int(clock.time()) % 60 < 11:
                 status = "Trading Active" if telegram_bot.trading_enabled else "Trading Paused (Waiting for /on)"
                 logger.info(f"Heartbeat: {status}")
 
             # maintain connection
             if not mt5_interface.connected:
-                 if not mt5_interface.initialize():
-                     logger.error("MT5 Reconnection failed")
-                     await asyncio.sleep(60)
+                 # Backs off from sub-second retries, returns as soon as the terminal is back
+                 if not await connection_manager.ensure_connected():
                      continue
 
             # Check if trading allowed (Global Switch)
@@ -43,7 +95,8 @@ async def trading_loop():
                 await asyncio.sleep(5)
                 continue
 
-            # Check Risk Limits
+            # Check Risk Limits (daily counters roll over at 00:00 UTC)
+            risk_manager.roll_day()
             can_trade, reason = risk_manager.can_trade()
             if not can_trade:
                 # Log once per hour or change status?
@@ -52,60 +105,81 @@ async def trading_loop():
                 continue
 
             # --- MARKET ANALYSIS REPORTING ---
-            current_time = time.time()
-            if current_time - last_analysis_time > ANALYSIS_INTERVAL:
+            current_time = clock.time()
+            if current_time - market_analyzer.last_report_time > ANALYSIS_INTERVAL:
                 for symbol in Config.SYMBOL_LIST:
                     report = market_analyzer.get_market_report(symbol)
                     if report:
                         await telegram_bot.send_message(report)
                         logger.info(f"Sent market report for {symbol}")
-                last_analysis_time = current_time
+                market_analyzer.last_report_time = current_time
             # ---------------------------------
 
             # --- POSITION MANAGEMENT (Break-Even) ---
-            positions = mt5_interface.get_positions()
-            for pos in positions:
-                symbol = pos['symbol']
-                ticket = pos['ticket']
-                open_price = pos['price_open']
-                current_price = pos['price_current']
-                current_sl = pos['sl']
-                tp = pos['tp']
+            # Diff against the last snapshot; subscribers hear about opens, SL/TP moves and closes
+            position_tracker.update()
+            for ticket in list(break_even_pending):
+                pos = position_tracker.positions.get(ticket)
+                if pos is None:
+                    continue
+                symbol = pos.symbol
+                open_price = pos.price_open
+                current_price = pos.price_current
+                current_sl = pos.sl
+                tp = pos.tp
                 
                 # Calculate current profit in pips/points
                 # For long: profit = current - open
                 # For short: profit = open - current
-                if pos['type'] == 0: # BUY
+                if pos.type == 0: # BUY
                     profit_points = current_price - open_price
                     # Move to BE if profit > 40% of TP distance
                     tp_dist = abs(tp - open_price) if tp > 0 else 0
                     if tp_dist > 0 and current_sl < open_price and profit_points > (tp_dist * 0.4):
                         new_sl = open_price + (mt5_interface.get_symbol_info(symbol).point * 10) # BE + 1 pip
-                        mt5_interface.modify_position(ticket, new_sl, tp)
+                        ok = mt5_interface.modify_position(ticket, new_sl, tp)
+                        trade_journal.record_modification(ticket, symbol, "BREAK_EVEN", current_sl, new_sl, tp, ok)
                         logger.info(f"Moved BUY {symbol} to Break-Even")
                         
-                elif pos['type'] == 1: # SELL
+                elif pos.type == 1: # SELL
                     profit_points = open_price - current_price
                     tp_dist = abs(tp - open_price) if tp > 0 else 0
                     if tp_dist > 0 and current_sl > open_price and profit_points > (tp_dist * 0.4):
                         new_sl = open_price - (mt5_interface.get_symbol_info(symbol).point * 10) # BE + 1 pip
-                        mt5_interface.modify_position(ticket, new_sl, tp)
+                        ok = mt5_interface.modify_position(ticket, new_sl, tp)
+                        trade_journal.record_modification(ticket, symbol, "BREAK_EVEN", current_sl, new_sl, tp, ok)
                         logger.info(f"Moved SELL {symbol} to Break-Even")
             # ----------------------------------------
 
-            for symbol in Config.SYMBOL_LIST:
-                # Check for existing positions?
-                symbol_positions = [p for p in positions if p['symbol'] == symbol]
-                
-                # Simple rule: Only 1 trade per symbol at a time
-                if len(symbol_positions) > 0:
-                    continue
+            # Rolling cross-symbol correlation (new closed bars only)
+            correlation_monitor.update()
 
-                # Run Strategy
-                signal_data = strategy.get_signal(symbol)
+            # Simple rule: Only 1 trade per symbol at a time
+            open_symbols = position_tracker.symbols()
+            # News blackout is per symbol (currency), the rest of can_trade() is global
+            candidates = [s for s in Config.SYMBOL_LIST
+                          if s not in open_symbols and risk_manager.check_news(s)]
+
+            # Run Strategy (whole universe in one vectorized pass)
+            signals = strategy.get_signals(candidates)
+
+            for symbol in candidates:
+                signal_data = signals.get(symbol)
                 
                 if signal_data and signal_data['signal']:
-                    logger.info(f"SIGNAL FOUND: {symbol} {signal_data['signal']}")
+                    # Closed-bar mode hands the memoized signal back on every pass over its bar:
+                    # journal it once, retry it until it opens trades, then leave it alone
+                    once_per_bar = Config.SIGNAL_MODE == 'closed'
+                    seen = strategy.signal_bars.get(symbol) if once_per_bar else None
+                    if seen and seen[0] == signal_data['time']:
+                        if seen[2]:
+                            continue
+                        signal_id = seen[1]
+                    else:
+                        logger.info(f"SIGNAL FOUND: {symbol} {signal_data['signal']}")
+                        signal_id = trade_journal.record_signal(symbol, signal_data)
+                        if once_per_bar:
+                            strategy.signal_bars[symbol] = [signal_data['time'], signal_id, False]
                     
                     # Calculate position size
                     volume = risk_manager.calculate_lot_size(symbol, signal_data['sl_pips'])
@@ -113,21 +187,31 @@ async def trading_loop():
                         logger.warning(f"Calculated volume 0 for {symbol}. Skipped.")
                         continue
                         
-                    # Execute 3 times as requested ("3 ta lot")
+                    # Execute 3 times as requested ("3 ta lot"), fewer if the book already
+                    # holds correlated lots in this direction (e.g. EURUSD + GBPUSD longs)
+                    orders = risk_manager.allowed_orders(symbol, signal_data['signal'], volume, 3)
+                    if orders == 0:
+                        logger.info(f"SIGNAL {symbol} skipped: correlated exposure limit {Config.CORR_MAX_EXPOSURE} lots")
+                        continue
                     trades_opened = 0
-                    for i in range(3):
+                    for i in range(orders):
                         result = mt5_interface.place_order(
                             symbol, 
                             signal_data['signal'], 
                             volume, 
                             signal_data['sl'], 
-                            signal_data['tp']
+                            signal_data['tp'],
+                            signal_id=signal_id
                         )
                         if result:
                             trades_opened += 1
                             risk_manager.trades_today += 1
                     
                     if trades_opened > 0:
+                        if once_per_bar:
+                            strategy.signal_bars[symbol][2] = True
+                        # Later signals in this pass must see these lots in the exposure check
+                        position_tracker.update()
                         msg = (
                             f"🚀 *New Trade Executed (x{trades_opened})*\n"
                             f"Symbol: {symbol}\n"
@@ -139,6 +223,9 @@ async def trading_loop():
                         )
                         await telegram_bot.send_message(msg)
 
+            # A slow pass (excluding the sleep below) starts an automatic profiling session
+            sampling_profiler.note_iteration(time.perf_counter() - iteration_start)
+
             # Sleep: Check every candle close? Or every 10 seconds?
             # M5 strategy -> check frequently enough to catch entry.
             await asyncio.sleep(10)
@@ -149,8 +236,46 @@ async def trading_loop():
             await asyncio.sleep(10)
 
 async def main():
+    # Warm start: counters, /on state, report schedule, signal memo and zones from the last run
+    state_store.restore()
+
+    # Optional: one feeder process does the market data polling
+    if Config.DATA_BUS:
+        start_data_bus()
+
     # Start Telegram in background
     tg_task = asyncio.create_task(telegram_bot.run())
+
+    # Watch for blocking calls stalling the shared event loop
+    watchdog_task = asyncio.create_task(loop_watchdog.run(notify=telegram_bot.send_message))
+
+    # Periodic terminal health probe + reconnect
+    probe_task = asyncio.create_task(connection_manager.run())
+
+    # Apply .env / CONFIG_FILE edits without a restart
+    config_watcher.subscribe(risk_manager.on_config_change)
+    config_watcher.subscribe(telegram_bot.on_config_change)
+    config_watcher.subscribe(strategy.on_config_change)
+    config_task = asyncio.create_task(config_watcher.run())
+
+    # Position open / modify / close events
+    position_tracker.subscribe(track_break_even)
+    position_tracker.subscribe(risk_manager.on_position_event)
+    position_tracker.subscribe(trade_journal.on_position_event)
+    position_tracker.subscribe(telegram_bot.on_position_event)
+
+    # SQLite journal: background writer + periodic deal history sync
+    trade_journal.start()
+    journal_task = asyncio.create_task(trade_journal.run())
+
+    # Announces profiling sessions that finish on their own
+    profiler_task = asyncio.create_task(sampling_profiler.run(notify=telegram_bot.send_message))
+
+    # Warm-start snapshot every STATE_SAVE_INTERVAL
+    state_task = asyncio.create_task(state_store.run())
+
+    # Optional scheduled memory snapshots (MEM_SNAPSHOT_INTERVAL)
+    mem_task = asyncio.create_task(memory_monitor.run())
     
     # Start Trading Loop
     try:
@@ -168,5 +293,9 @@ if __name__ == "__main__":
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
+        state_store.save()
         mt5_interface.shutdown()
+        stop_data_bus()
+        execution_stats.flush()
+        trade_journal.stop()
         print("Bot Stopped.")
@@ -0,0 +1,123 @@
+import asyncio
+import selectors
+import time
+from datetime import datetime
+
+class SystemTime:
+    """The real clocks."""
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+
+class SimulatedTime:
+    """Clock that only moves when advance() is called (epoch seconds, like time.time())."""
+
+    def __init__(self, start):
+        self.now = float(start)
+        self.elapsed = 0.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.elapsed
+
+    def advance(self, seconds):
+        self.now += seconds
+        self.elapsed += seconds
+
+
+class _FastForwardSelector(selectors.DefaultSelector):
+    """
+    Polls real I/O without blocking; when nothing is ready, jumps the simulated
+    clock to the next timer instead of waiting for it.
+    """
+
+    def __init__(self, source):
+        super().__init__()
+        self._source = source
+
+    def select(self, timeout=None):
+        if timeout is None:
+            # No timer pending: only real I/O or a worker thread can wake the loop
+            return super().select(None)
+        events = super().select(0)
+        if not events and timeout > 0:
+            self._source.advance(timeout)
+        return events
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop whose time() is a SimulatedTime. asyncio.sleep(), wait_for()
+    and call_later() all run on simulated seconds, so every task on the loop
+    sees the same clock and an idle loop costs no wall time.
+    Work handed to threads (asyncio.to_thread) still takes real time; the
+    simulated clock may run ahead while it is in flight.
+    """
+
+    def __init__(self, source):
+        self._source = source
+        super().__init__(selector=_FastForwardSelector(source))
+
+    def time(self):
+        return self._source.monotonic()
+
+
+class Clock:
+    """
+    The time the bot makes decisions on (session window, report schedule,
+    news blackouts). Real time unless a simulation swaps the source in.
+    Durations that measure the bot's own cost (perf_counter) stay real.
+    """
+
+    def __init__(self):
+        self.source = SystemTime()
+
+    def set_source(self, source=None):
+        """None restores the real clock."""
+        self.source = source or SystemTime()
+
+    @property
+    def simulated(self):
+        return not isinstance(self.source, SystemTime)
+
+    def time(self):
+        return self.source.time()
+
+    def monotonic(self):
+        return self.source.monotonic()
+
+    def utcnow(self):
+        return datetime.utcfromtimestamp(self.source.time())
+
+    def run_simulated(self, coro, source, duration):
+        """
+        Runs coro on a VirtualTimeEventLoop driven by `source` (a SimulatedTime,
+        shared with the stub terminal) for at most `duration` simulated seconds
+        (None: until it returns). Returns coro's result, or None if the time ran
+        out first (trading_loop never returns).
+        """
+        loop = VirtualTimeEventLoop(source)
+        previous = self.source
+        self.set_source(source)
+        try:
+            return loop.run_until_complete(_run_for(coro, duration))
+        finally:
+            self.source = previous
+            loop.close()
+
+
+async def _run_for(coro, duration):
+    if duration is None:
+        return await coro
+    try:
+        return await asyncio.wait_for(coro, duration)
+    except asyncio.TimeoutError:
+        return None
+
+clock = Clock()
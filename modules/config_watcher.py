@@ -0,0 +1,179 @@
+import asyncio
+import json
+import os
+from datetime import time as dtime
+from dotenv import dotenv_values
+try:
+    import yaml
+except ImportError:
+    yaml = None
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+from config import Config, parse_symbols
+from modules.logger import logger
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+def _mode(value):
+    value = str(value).strip().lower()
+    if value not in ("closed", "forming"):
+        raise ValueError(f"SIGNAL_MODE must be 'closed' or 'forming', got {value!r}")
+    return value
+
+def _hhmm(value):
+    value = str(value).strip()
+    dtime.fromisoformat(value)  # raises on bad input
+    return value
+
+# Config attribute -> (.env variable, parser). Only these can change at runtime;
+# credentials, paths and ring sizes still need a restart.
+RELOADABLE = {
+    'SYMBOL_LIST': ('SYMBOL_LIST', parse_symbols),
+    'RISK_PER_TRADE': ('RISK_PERCENT', float),
+    'MAX_DAILY_DD': ('MAX_DAILY_DRAWDOWN', float),
+    'SESSION_START': ('SESSION_START', _hhmm),
+    'SESSION_END': ('SESSION_END', _hhmm),
+    'EMA_FAST': ('EMA_FAST', int),
+    'EMA_SLOW': ('EMA_SLOW', int),
+    'RSI_PERIOD': ('RSI_PERIOD', int),
+    'ATR_PERIOD': ('ATR_PERIOD', int),
+    'SIGNAL_MODE': ('SIGNAL_MODE', _mode),
+    'ORDER_DEVIATION': ('ORDER_DEVIATION', int),
+    'ADAPTIVE_DEVIATION': ('ADAPTIVE_DEVIATION', _bool),
+    'TELEGRAM_CHAT_ID': ('TELEGRAM_CHAT_ID', str),
+    'CORR_THRESHOLD': ('CORR_THRESHOLD', float),
+    'CORR_MAX_EXPOSURE': ('CORR_MAX_EXPOSURE', float),
+}
+
+def validate(values):
+    """Returns a list of problems; empty means the set can be applied."""
+    errors = []
+    if not values['SYMBOL_LIST']:
+        errors.append("SYMBOL_LIST is empty")
+    if not 0 < values['RISK_PER_TRADE'] <= 10:
+        errors.append(f"RISK_PER_TRADE {values['RISK_PER_TRADE']} outside (0, 10]")
+    if not 0 < values['MAX_DAILY_DD'] <= 50:
+        errors.append(f"MAX_DAILY_DD {values['MAX_DAILY_DD']} outside (0, 50]")
+    for key in ('EMA_FAST', 'EMA_SLOW', 'RSI_PERIOD', 'ATR_PERIOD'):
+        if values[key] < 2:
+            errors.append(f"{key} must be >= 2")
+    if values['EMA_FAST'] >= values['EMA_SLOW']:
+        errors.append("EMA_FAST must be smaller than EMA_SLOW")
+    if dtime.fromisoformat(values['SESSION_START']) >= dtime.fromisoformat(values['SESSION_END']):
+        errors.append("SESSION_START must be before SESSION_END")
+    if not 0 <= values['ORDER_DEVIATION'] <= 1000:
+        errors.append("ORDER_DEVIATION outside [0, 1000]")
+    if not 0 < values['CORR_THRESHOLD'] <= 1:
+        errors.append(f"CORR_THRESHOLD {values['CORR_THRESHOLD']} outside (0, 1]")
+    if values['CORR_MAX_EXPOSURE'] < 0:
+        errors.append("CORR_MAX_EXPOSURE must be >= 0")
+    return errors
+
+class ConfigWatcher:
+    """
+    Watches .env and the optional CONFIG_FILE, validates the new settings as a
+    whole and swaps them into Config in one step. Subscribers get only the keys
+    that changed, so they can rebuild just the affected state.
+    """
+
+    def __init__(self):
+        self.subscribers = []
+        self._mtimes = {}
+
+    def subscribe(self, callback):
+        """callback(changed) with changed = {attr: (old, new)}."""
+        self.subscribers.append(callback)
+
+    def _paths(self):
+        return [p for p in (Config.ENV_FILE, Config.CONFIG_FILE) if p]
+
+    def _load_file(self, path):
+        ext = os.path.splitext(path)[1].lower()
+        if ext in ('.yaml', '.yml'):
+            if yaml is None:
+                raise RuntimeError("PyYAML is not installed, cannot read " + path)
+            with open(path, encoding='utf-8') as f:
+                return yaml.safe_load(f) or {}
+        if ext == '.toml':
+            if tomllib is None:
+                raise RuntimeError("TOML needs Python 3.11+ (tomllib)")
+            with open(path, 'rb') as f:
+                return tomllib.load(f)
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def read(self):
+        """Builds the candidate settings. Keys missing from every source keep their current value."""
+        env = dotenv_values(Config.ENV_FILE) if os.path.exists(Config.ENV_FILE) else {}
+        overrides = {}
+        if Config.CONFIG_FILE and os.path.exists(Config.CONFIG_FILE):
+            overrides = {k.upper(): v for k, v in self._load_file(Config.CONFIG_FILE).items()}
+
+        values = {}
+        for attr, (env_key, parse) in RELOADABLE.items():
+            if attr in overrides:
+                raw = overrides[attr]
+            elif env.get(env_key) not in (None, ""):
+                raw = env[env_key]
+            else:
+                values[attr] = getattr(Config, attr)
+                continue
+            values[attr] = parse(raw)
+        return values
+
+    def reload(self):
+        """Reads, validates and applies. Returns the changed keys (empty dict if none / rejected)."""
+        try:
+            values = self.read()
+            errors = validate(values)
+        except Exception as e:
+            logger.error(f"Config reload failed, keeping current settings: {e}")
+            return {}
+        if errors:
+            logger.error(f"Config reload rejected, keeping current settings: {'; '.join(errors)}")
+            return {}
+
+        changed = {k: (getattr(Config, k), v) for k, v in values.items() if getattr(Config, k) != v}
+        if not changed:
+            return {}
+
+        # No await between these assignments: the loop sees either the old or the new set
+        for key, (_, new) in changed.items():
+            setattr(Config, key, new)
+        logger.info("Config reloaded: " + ", ".join(f"{k}={new}" for k, (_, new) in changed.items()))
+
+        for callback in self.subscribers:
+            try:
+                callback(changed)
+            except Exception as e:
+                logger.error(f"Config subscriber {callback} failed: {e}")
+        return changed
+
+    def poll(self):
+        """Reloads if any watched file changed since the last check."""
+        mtimes = {}
+        for path in self._paths():
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                mtimes[path] = None
+        if not self._mtimes:
+            self._mtimes = mtimes
+            return {}
+        if mtimes == self._mtimes:
+            return {}
+        self._mtimes = mtimes
+        return self.reload()
+
+    async def run(self):
+        self.poll()  # remember the starting state
+        while True:
+            await asyncio.sleep(Config.CONFIG_RELOAD_INTERVAL)
+            self.poll()
+
+config_watcher = ConfigWatcher()
@@ -0,0 +1,119 @@
+import asyncio
+import random
+import time
+from collections import deque
+from config import Config
+from modules.logger import logger
+from modules.mt5_interface import mt5_interface
+
+class ConnectionManager:
+    """
+    Keeps the MT5 link up: probes the terminal periodically, reconnects with
+    jittered exponential backoff and keeps uptime / outage statistics.
+    """
+
+    DISCONNECTED = "DISCONNECTED"
+    CONNECTING = "CONNECTING"
+    CONNECTED = "CONNECTED"
+
+    def __init__(self):
+        self.state = self.DISCONNECTED
+        self.started = time.monotonic()
+        self.down_since = None
+        self.connected_since = None
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.downtime = 0.0
+        self.outages = deque(maxlen=20)  # durations of recent outages, seconds
+        self._lock = asyncio.Lock()
+
+    def _mark_up(self):
+        now = time.monotonic()
+        if self.state != self.CONNECTED:
+            if self.connected_since is None:
+                # First connect: uptime is measured from here on
+                self.started = now
+            else:
+                outage = now - self.down_since if self.down_since is not None else 0.0
+                self.reconnects += 1
+                self.outages.append(outage)
+                self.downtime += outage
+                logger.info(f"MT5 reconnected after {outage:.1f}s")
+            self.down_since = None
+            self.connected_since = now
+            self.state = self.CONNECTED
+
+    def _mark_down(self):
+        if self.state == self.CONNECTED:
+            self.down_since = time.monotonic()
+            logger.warning("MT5 connection down, reconnecting")
+        self.state = self.CONNECTING
+
+    async def ensure_connected(self, max_attempts=None):
+        """Returns once MT5 is connected (or max_attempts failed)."""
+        if mt5_interface.connected:
+            self._mark_up()
+            return True
+
+        async with self._lock:
+            # Another task may have reconnected while we waited
+            if mt5_interface.connected:
+                self._mark_up()
+                return True
+
+            self._mark_down()
+            attempt = 0
+            while max_attempts is None or attempt < max_attempts:
+                attempt += 1
+                if mt5_interface.initialize():
+                    self._mark_up()
+                    return True
+
+                self.failed_attempts += 1
+                if max_attempts is not None and attempt >= max_attempts:
+                    break
+                # Full jitter: spread retries, start sub-second, cap at MT5_RECONNECT_MAX
+                cap = min(Config.MT5_RECONNECT_MAX, Config.MT5_RECONNECT_BASE * (2 ** attempt))
+                delay = random.uniform(Config.MT5_RECONNECT_BASE / 2, cap)
+                logger.error(f"MT5 Reconnection failed (attempt {attempt}), retry in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            return False
+
+    async def run(self):
+        """Health probe task."""
+        while True:
+            await asyncio.sleep(Config.MT5_HEALTH_INTERVAL)
+            try:
+                if mt5_interface.connected and not mt5_interface.probe():
+                    self._mark_down()
+                if not mt5_interface.connected:
+                    await self.ensure_connected()
+            except Exception as e:
+                logger.error(f"Connection probe error: {e}")
+
+    def get_stats(self):
+        now = time.monotonic()
+        total = now - self.started
+        downtime = self.downtime + (now - self.down_since if self.down_since is not None else 0.0)
+        return {
+            'state': self.state,
+            'uptime_pct': (total - downtime) / total * 100 if total > 0 else 0.0,
+            'connected_for': now - self.connected_since if self.state == self.CONNECTED else 0.0,
+            'reconnects': self.reconnects,
+            'failed_attempts': self.failed_attempts,
+            'last_outage': self.outages[-1] if self.outages else None,
+            'max_outage': max(self.outages) if self.outages else None,
+        }
+
+    def format_stats(self):
+        s = self.get_stats()
+        last = f"{s['last_outage']:.1f}s" if s['last_outage'] is not None else "-"
+        worst = f"{s['max_outage']:.1f}s" if s['max_outage'] is not None else "-"
+        return (
+            f"🔌 *MT5 Connection*: {s['state']}\n"
+            f"Uptime: {s['uptime_pct']:.2f}% | Connected for: {s['connected_for'] / 60:.0f} min\n"
+            f"Reconnects: {s['reconnects']} | Failed attempts: {s['failed_attempts']}\n"
+            f"Last outage: {last} | Longest: {worst}"
+        )
+
+connection_manager = ConnectionManager()
@@ -0,0 +1,179 @@
+import numpy as np
+from config import Config
+from modules.logger import logger
+from modules.mt5_interface import mt5_interface
+from modules.clock import clock
+from modules.zone_index import TF_SECONDS
+
+class RollingCorrelation:
+    """
+    Pearson correlation of n symbols' returns over the last `window` bars, kept
+    as running sums. A new bar adds its outer product and subtracts the one
+    leaving the window, so each pair costs O(1) per bar (O(n²) for the
+    universe) instead of DataFrame.corr's O(window·n²). The sums are rebuilt
+    from the ring buffer once per window to stop float drift accumulating.
+    """
+
+    def __init__(self, symbols, window):
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.window = window
+        n = len(self.symbols)
+        self.buffer = np.zeros((window, n))
+        self.count = 0
+        self.pos = 0
+        self.pushes = 0
+        self.sums = np.zeros(n)
+        self.products = np.zeros((n, n))
+
+    def push(self, returns):
+        r = np.asarray(returns, dtype=np.float64)
+        if self.count == self.window:
+            old = self.buffer[self.pos]
+            self.sums -= old
+            self.products -= np.outer(old, old)
+        else:
+            self.count += 1
+        self.buffer[self.pos] = r
+        self.sums += r
+        self.products += np.outer(r, r)
+        self.pos = (self.pos + 1) % self.window
+        self.pushes += 1
+        if self.pushes % self.window == 0:
+            self._resync()
+
+    def _resync(self):
+        rows = self.buffer[:self.count]
+        self.sums = rows.sum(axis=0)
+        self.products = rows.T @ rows
+
+    def _stats(self):
+        mean = self.sums / self.count
+        var = np.diag(self.products) / self.count - mean ** 2
+        return mean, np.sqrt(np.maximum(var, 0.0))
+
+    def row(self, symbol):
+        """Correlation of symbol with every symbol (array, 0 where undefined), or None."""
+        i = self.index.get(symbol)
+        if i is None or self.count < 2:
+            return None
+        mean, std = self._stats()
+        cov = self.products[i] / self.count - mean[i] * mean
+        denom = std[i] * std
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rho = np.where(denom > 0, cov / denom, 0.0)
+        rho[i] = 1.0
+        return np.clip(rho, -1.0, 1.0)
+
+    def matrix(self):
+        if self.count < 2:
+            return None
+        mean, std = self._stats()
+        cov = self.products / self.count - np.outer(mean, mean)
+        denom = np.outer(std, std)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rho = np.where(denom > 0, cov / denom, 0.0)
+        np.fill_diagonal(rho, 1.0)
+        return np.clip(rho, -1.0, 1.0)
+
+
+class CorrelationMonitor:
+    """
+    Feeds RollingCorrelation with log returns of closed CORR_TIMEFRAME bars for
+    Config.SYMBOL_LIST. update() is called every loop pass but only asks the
+    terminal for new bars every CORR_CHECK_INTERVAL; a symbol without a bar at
+    the new time (market closed, no ticks) gets a zero return.
+    """
+
+    def __init__(self, data_source=None):
+        # Anything with get_rates(symbol, tf, n_bars): mt5_interface or a MarketDataBus reader
+        self.data_source = data_source or mt5_interface
+        self.rolling = None
+        self.last_time = None   # open time of the newest closed bar folded in
+        self.last_close = {}    # symbol -> close of its newest bar seen
+        self._last_check = None
+
+    def reset(self):
+        self.rolling = None
+        self.last_time = None
+        self.last_close = {}
+        self._last_check = None
+
+    def _closed(self, symbol, n_bars):
+        # The last row from the terminal is the bar still forming
+        rates = self.data_source.get_rates(symbol, Config.CORR_TIMEFRAME, n_bars + 1)
+        if rates is None or len(rates) < 2:
+            return None
+        return rates[:-1]
+
+    def _warm_up(self, symbols):
+        """Rebuilds the window from history, aligned on bar time with forward-filled closes."""
+        history = {}
+        for symbol in symbols:
+            rates = self._closed(symbol, Config.CORR_WINDOW + 1)
+            if rates is not None:
+                history[symbol] = dict(zip(rates['time'].astype(np.int64).tolist(), rates['close'].tolist()))
+        if not history:
+            return
+        times = sorted(set().union(*history.values()))[-(Config.CORR_WINDOW + 1):]
+        self.rolling = RollingCorrelation(symbols, Config.CORR_WINDOW)
+        self.last_close = {}
+        for t in times:
+            row = []
+            for symbol in symbols:
+                close = history.get(symbol, {}).get(t)
+                prev = self.last_close.get(symbol)
+                row.append(np.log(close / prev) if close and prev else 0.0)
+                if close:
+                    self.last_close[symbol] = close
+            if t != times[0]:
+                self.rolling.push(row)
+        self.last_time = times[-1]
+        logger.info(f"Correlation window warmed up: {len(symbols)} symbols x {self.rolling.count} "
+                    f"{Config.CORR_TIMEFRAME} bars")
+
+    def update(self):
+        symbols = list(Config.SYMBOL_LIST)
+        try:
+            now = clock.monotonic()
+            if self._last_check is not None and now - self._last_check < Config.CORR_CHECK_INTERVAL:
+                return
+            self._last_check = now
+            if self.rolling is None or self.rolling.symbols != symbols:
+                self._warm_up(symbols)
+                return
+
+            latest = {}
+            for symbol in symbols:
+                rates = self._closed(symbol, 1)
+                if rates is not None:
+                    latest[symbol] = (int(rates['time'][-1]), float(rates['close'][-1]))
+            newest = max((t for t, _ in latest.values()), default=None)
+            if newest is None or newest <= self.last_time:
+                return
+            if newest - self.last_time > TF_SECONDS.get(Config.CORR_TIMEFRAME, 3600):
+                # Missed bars (paused, disconnected, weekend): cheaper to refetch than to patch
+                self._warm_up(symbols)
+                return
+
+            row = []
+            for symbol in symbols:
+                t, close = latest.get(symbol, (None, None))
+                prev = self.last_close.get(symbol)
+                fresh = t == newest and close and prev
+                row.append(np.log(close / prev) if fresh else 0.0)
+                if t == newest and close:
+                    self.last_close[symbol] = close
+            self.rolling.push(row)
+            self.last_time = newest
+        except Exception as e:
+            logger.error(f"Correlation update failed: {e}")
+
+    def correlations(self, symbol):
+        """{other symbol: correlation} for symbol, empty until warmed up."""
+        row = self.rolling.row(symbol) if self.rolling is not None else None
+        if row is None:
+            return {}
+        return dict(zip(self.rolling.symbols, row.tolist()))
+
+correlation_monitor = CorrelationMonitor()
@@ -0,0 +1,363 @@
+import sys
+import time
+import multiprocessing as mp
+from collections import namedtuple
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+import pandas as pd
+from config import Config
+from modules.logger import logger
+
+# Fixed layouts so every process agrees on the segment format
+BAR_DTYPE = np.dtype([
+    ('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+    ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')
+])
+TICK_DTYPE = np.dtype([
+    ('time', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('last', '<f8'), ('volume', '<u8'),
+    ('time_msc', '<i8'), ('flags', '<u4'), ('volume_real', '<f8')
+])
+# Static symbol metadata, one record per symbol (what strategies need from symbol_info)
+INFO_DTYPE = np.dtype([('point', '<f8'), ('digits', '<i4'), ('trade_contract_size', '<f8')])
+SymbolMeta = namedtuple('SymbolMeta', 'name point digits trade_contract_size')
+
+# Header slots (int64 each)
+SEQ, COUNT, HEAD, CAPACITY, LAST_KEY = range(5)
+HEADER_SLOTS = 8
+HEADER_BYTES = HEADER_SLOTS * 8
+
+
+def segment_name(symbol, stream):
+    """Shared memory name for a symbol stream ("M1", "H1", ..., "TICKS" or "INFO")."""
+    return f"{Config.DATA_BUS_NAME}_{symbol}_{stream}"
+
+
+def _attach(name):
+    """
+    Opens an existing segment without handing it to the resource tracker,
+    otherwise a reader exiting would unlink the feeder's segment (POSIX).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedRing:
+    """
+    Ring buffer of fixed-dtype records in a shared memory segment.
+
+    One writer, any number of readers. Consistency uses a sequence lock:
+    the writer makes SEQ odd while writing and even when done, readers copy
+    the rows they need and retry if SEQ moved underneath them.
+
+    Reads return a copy of just the requested rows, not a view: a seqlock can
+    only vouch for data copied out before SEQ is re-checked, and a view would
+    keep changing under the caller as the feeder writes. The copy is a single
+    memcpy of n rows (300 M1 bars ~ 17 KB); what the bus removes is the
+    terminal IPC and the per-call DataFrame construction in the terminal
+    process, not that memcpy.
+    """
+
+    def __init__(self, name, dtype, capacity=None, create=False):
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self.owner = create
+
+        if create:
+            size = HEADER_BYTES + self.dtype.itemsize * capacity
+            try:
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                # Stale segment from a crashed feeder
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=self.shm.buf)
+            self.header[:] = 0
+            self.header[CAPACITY] = capacity
+        else:
+            self.shm = _attach(name)
+            self.header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=self.shm.buf)
+
+        self.capacity = int(self.header[CAPACITY])
+        self.data = np.ndarray((self.capacity,), dtype=self.dtype, buffer=self.shm.buf, offset=HEADER_BYTES)
+
+    @property
+    def seq(self):
+        """Sequence number. Unchanged seq means unchanged data."""
+        return int(self.header[SEQ])
+
+    def __len__(self):
+        return int(min(self.header[COUNT], self.capacity))
+
+    # --- Writer side ---
+
+    def _put(self, slot, row):
+        for field in self.dtype.names:
+            self.data[field][slot] = row[field]
+
+    def _append(self, row):
+        head = int(self.header[HEAD])
+        self._put(head, row)
+        self.header[HEAD] = (head + 1) % self.capacity
+        self.header[COUNT] += 1
+
+    def write_bars(self, rates):
+        """
+        Merges the latest bars from the terminal into the ring.
+        The forming bar is overwritten in place, newer bars are appended.
+        """
+        if rates is None or len(rates) == 0:
+            return 0
+
+        last_time = int(self.header[LAST_KEY])
+        times = rates['time']
+        start = int(np.searchsorted(times, last_time, side='left'))
+        if self.header[COUNT] == 0:
+            start = max(0, len(rates) - self.capacity)
+
+        self.header[SEQ] += 1
+        try:
+            written = 0
+            for i in range(start, len(rates)):
+                t = int(times[i])
+                if t == last_time and self.header[COUNT] > 0:
+                    self._put((int(self.header[HEAD]) - 1) % self.capacity, rates[i])
+                elif t > last_time or self.header[COUNT] == 0:
+                    self._append(rates[i])
+                    last_time = t
+                written += 1
+            self.header[LAST_KEY] = last_time
+        finally:
+            self.header[SEQ] += 1
+        return written
+
+    def write_record(self, row):
+        """Appends one record ({field: value} for every dtype field)."""
+        self.header[SEQ] += 1
+        try:
+            self._append(row)
+        finally:
+            self.header[SEQ] += 1
+
+    def write_tick(self, tick):
+        """Appends a tick if it is newer than the last one stored."""
+        if tick is None or tick.time_msc <= self.header[LAST_KEY]:
+            return False
+
+        row = {field: getattr(tick, field) for field in self.dtype.names}
+        self.header[SEQ] += 1
+        try:
+            self._append(row)
+            self.header[LAST_KEY] = tick.time_msc
+        finally:
+            self.header[SEQ] += 1
+        return True
+
+    # --- Reader side ---
+
+    def read(self, n=None, retries=100):
+        """Returns the newest n records (oldest first) as a consistent copy (see class docstring)."""
+        for attempt in range(retries):
+            seq_before = self.seq
+            if seq_before & 1:
+                # Writer is mid-update
+                time.sleep(0 if attempt < 10 else 0.0005)
+                continue
+
+            count = len(self)
+            take = count if n is None else min(n, count)
+            head = int(self.header[HEAD])
+            start = head - take
+            if start >= 0:
+                out = self.data[start:head].copy()
+            else:
+                out = np.concatenate((self.data[start % self.capacity:], self.data[:head]))
+
+            if self.seq == seq_before:
+                return out
+
+        logger.warning(f"Data bus read on {self.name} kept racing the writer")
+        return None
+
+    def close(self):
+        # Drop our views first, otherwise the mmap cannot be released
+        self.header = None
+        self.data = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class MarketDataFeeder:
+    """The only process that talks to the terminal. Publishes bars and ticks to shared memory."""
+
+    def __init__(self, symbols=None, timeframes=None):
+        self.symbols = list(symbols or Config.SYMBOL_LIST)
+        self.timeframes = list(timeframes or Config.DATA_BUS_TIMEFRAMES)
+        self.bar_rings = {}
+        self.tick_rings = {}
+        self.info_rings = {}
+
+    def open(self):
+        for symbol in self.symbols:
+            for tf in self.timeframes:
+                self.bar_rings[(symbol, tf)] = SharedRing(
+                    segment_name(symbol, tf), BAR_DTYPE, Config.DATA_BUS_BARS, create=True)
+            self.tick_rings[symbol] = SharedRing(
+                segment_name(symbol, "TICKS"), TICK_DTYPE, Config.DATA_BUS_TICKS, create=True)
+            self.info_rings[symbol] = SharedRing(segment_name(symbol, "INFO"), INFO_DTYPE, 1, create=True)
+
+    def poll_once(self, source):
+        """One pass over all symbols using `source` (normally mt5_interface)."""
+        for symbol in self.symbols:
+            info_ring = self.info_rings[symbol]
+            if len(info_ring) == 0:
+                # Static metadata: published once so readers never need symbol_info IPC
+                info = source.get_symbol_info(symbol)
+                if info is not None:
+                    info_ring.write_record({field: getattr(info, field) for field in INFO_DTYPE.names})
+            for tf in self.timeframes:
+                rates = source.get_rates(symbol, tf, n_bars=Config.DATA_BUS_BARS)
+                if rates is not None:
+                    self.bar_rings[(symbol, tf)].write_bars(rates)
+            self.tick_rings[symbol].write_tick(source.get_tick(symbol))
+
+    def close(self):
+        for ring in list(self.bar_rings.values()) + list(self.tick_rings.values()) + list(self.info_rings.values()):
+            ring.close()
+        self.bar_rings.clear()
+        self.tick_rings.clear()
+        self.info_rings.clear()
+
+    def run(self, stop_event=None):
+        """Feeder main loop. Intended to run in its own process."""
+        from modules.mt5_interface import mt5_interface
+
+        if not mt5_interface.initialize():
+            logger.error("Data feeder could not connect to MT5")
+            return
+
+        self.open()
+        logger.info(f"Data feeder started for {len(self.symbols)} symbols")
+        try:
+            while stop_event is None or not stop_event.is_set():
+                started = time.perf_counter()
+                try:
+                    self.poll_once(mt5_interface)
+                except Exception as e:
+                    logger.error(f"Data feeder error: {e}")
+                elapsed = time.perf_counter() - started
+                time.sleep(max(0.0, Config.DATA_BUS_INTERVAL - elapsed))
+        finally:
+            self.close()
+            mt5_interface.shutdown()
+
+
+def required_timeframes():
+    """Every timeframe the bot's readers ask for: signals, S/R zones and correlation."""
+    wanted = set(Config.DATA_BUS_TIMEFRAMES) | {Config.TIMEFRAME_HTF, Config.TIMEFRAME_LTF, Config.CORR_TIMEFRAME}
+    return sorted(wanted | set(Config.ZONE_TIMEFRAMES))
+
+
+def _feeder_main(symbols, timeframes, stop_event):
+    MarketDataFeeder(symbols, timeframes).run(stop_event)
+
+
+def start_feeder_process(symbols=None, timeframes=None):
+    """Spawns the feeder. Returns (process, stop_event)."""
+    stop_event = mp.Event()
+    proc = mp.Process(target=_feeder_main, args=(symbols, timeframes, stop_event),
+                      name="RazgonDataFeeder", daemon=True)
+    proc.start()
+    return proc, stop_event
+
+
+class MarketDataBus:
+    """
+    Reader side of the bus. Exposes the same get_data() as MT5Interface,
+    so a strategy worker can use it as a drop-in data source.
+    """
+
+    def __init__(self):
+        self.rings = {}
+
+    def _ring(self, symbol, stream):
+        key = (symbol, stream)
+        ring = self.rings.get(key)
+        if ring is None:
+            dtype = {"TICKS": TICK_DTYPE, "INFO": INFO_DTYPE}.get(stream, BAR_DTYPE)
+            try:
+                ring = SharedRing(segment_name(symbol, stream), dtype)
+            except FileNotFoundError:
+                logger.error(f"Data bus segment for {symbol} {stream} not found (feeder running?)")
+                return None
+            self.rings[key] = ring
+        return ring
+
+    def get_sequence(self, symbol, timeframe_str):
+        """Cheap change check: compare with the previous value before recomputing."""
+        ring = self._ring(symbol, timeframe_str)
+        return ring.seq if ring else None
+
+    def get_rates(self, symbol, timeframe_str, n_bars=500):
+        ring = self._ring(symbol, timeframe_str)
+        if ring is None:
+            return None
+        rates = ring.read(n_bars)
+        if rates is None or len(rates) == 0:
+            return None
+        return rates
+
+    def get_data(self, symbol, timeframe_str, n_bars=500):
+        """Historical data as DataFrame, same shape as MT5Interface.get_data."""
+        rates = self.get_rates(symbol, timeframe_str, n_bars)
+        if rates is None:
+            return None
+        df = pd.DataFrame(rates)
+        df['time'] = pd.to_datetime(df['time'], unit='s')
+        return df
+
+    def get_symbol_info(self, symbol):
+        """Static metadata published by the feeder (point, digits, contract size), or None."""
+        ring = self._ring(symbol, "INFO")
+        rows = ring.read(1) if ring else None
+        if rows is None or len(rows) == 0:
+            return None
+        row = rows[0]
+        return SymbolMeta(symbol, float(row['point']), int(row['digits']), float(row['trade_contract_size']))
+
+    def get_ticks(self, symbol, n=None):
+        ring = self._ring(symbol, "TICKS")
+        return ring.read(n) if ring else None
+
+    def close(self):
+        for ring in self.rings.values():
+            ring.close()
+        self.rings.clear()
+
+market_data_bus = MarketDataBus()
+
+
+def main():
+    # python -m modules.data_bus - the feeder process strategy workers read from (Ctrl+C stops it)
+    try:
+        MarketDataFeeder().run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import csv
+import math
+import os
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+import numpy as np
+from config import Config
+from modules.logger import logger
+
+# MT5 retcodes that mean "price moved, try again"
+REQUOTE_RETCODES = {10004, 10020, 10021}  # REQUOTE, PRICE_CHANGED, PRICE_OFF
+RETCODE_DONE = 10009
+
+FIELDS = ['ts', 'symbol', 'session', 'type', 'request_price', 'fill_price',
+          'slippage_pts', 'latency_ms', 'retcode', 'deviation']
+
+def trading_session(ts):
+    """UTC session label used to bucket execution quality."""
+    hour = datetime.utcfromtimestamp(ts).hour
+    if 13 <= hour < 17:
+        return "LDN-NY"
+    if 8 <= hour < 13:
+        return "LONDON"
+    if 17 <= hour < 22:
+        return "NY"
+    return "ASIA"
+
+class ExecutionStats:
+    """In-memory time series of order round trips with periodic CSV flushes."""
+
+    def __init__(self):
+        self.window = defaultdict(lambda: deque(maxlen=Config.EXEC_STATS_WINDOW))
+        self.pending = []
+        self.last_flush = time.time()
+        self.path = os.path.join(Config.LOG_DIR, "executions.csv")
+
+    def record(self, symbol, order_type, request_price, fill_price, point,
+               sent_at, acked_at, retcode, deviation):
+        """Stores one order round trip. Slippage is in points, positive = against us."""
+        slippage = 0.0
+        if fill_price and request_price and point:
+            diff = fill_price - request_price if order_type == "BUY" else request_price - fill_price
+            slippage = round(diff / point, 1)
+
+        row = {
+            'ts': sent_at,
+            'symbol': symbol,
+            'session': trading_session(sent_at),
+            'type': order_type,
+            'request_price': request_price,
+            'fill_price': fill_price,
+            'slippage_pts': slippage,
+            'latency_ms': round((acked_at - sent_at) * 1000, 2),
+            'retcode': retcode,
+            'deviation': deviation,
+        }
+        self.window[symbol].append(row)
+        self.pending.append(row)
+
+        if (len(self.pending) >= Config.EXEC_FLUSH_BATCH or
+                time.time() - self.last_flush > Config.EXEC_FLUSH_INTERVAL):
+            self.flush()
+        return row
+
+    def flush(self):
+        """Appends pending rows to logs/executions.csv."""
+        if not self.pending:
+            return
+        try:
+            new_file = not os.path.exists(self.path)
+            with open(self.path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                if new_file:
+                    writer.writeheader()
+                writer.writerows(self.pending)
+            self.pending = []
+        except Exception as e:
+            logger.error(f"Failed to flush execution stats: {e}")
+        self.last_flush = time.time()
+
+    def get_stats(self, symbol, session=None):
+        rows = [r for r in self.window.get(symbol, ()) if session is None or r['session'] == session]
+        if not rows:
+            return None
+        latency = np.array([r['latency_ms'] for r in rows])
+        filled = np.array([r['slippage_pts'] for r in rows if r['retcode'] == RETCODE_DONE])
+        requotes = sum(1 for r in rows if r['retcode'] in REQUOTE_RETCODES)
+        stats = {
+            'orders': len(rows),
+            'requote_rate': requotes / len(rows) * 100,
+            'latency_p50': float(np.percentile(latency, 50)),
+            'latency_p90': float(np.percentile(latency, 90)),
+            'latency_p99': float(np.percentile(latency, 99)),
+            'slip_p50': None, 'slip_p90': None, 'slip_p99': None,
+        }
+        if len(filled):
+            stats['slip_p50'], stats['slip_p90'], stats['slip_p99'] = (
+                float(v) for v in np.percentile(filled, [50, 90, 99]))
+        return stats
+
+    def get_deviation(self, symbol, default):
+        """
+        Adaptive deviation (points). Covers the observed adverse slippage tail
+        with some headroom, widened further when requotes show up.
+        """
+        if not Config.ADAPTIVE_DEVIATION:
+            return default
+        stats = self.get_stats(symbol)
+        if not stats or stats['orders'] < Config.DEVIATION_MIN_SAMPLES or stats['slip_p90'] is None:
+            return default
+
+        deviation = max(stats['slip_p99'], 0.0) * 1.5
+        if stats['requote_rate'] > 10:
+            deviation *= 1.5
+        return int(min(max(math.ceil(deviation), Config.DEVIATION_MIN), Config.DEVIATION_MAX))
+
+    def format_report(self):
+        lines = ["⚡ *Execution Quality*"]
+        for symbol in sorted(self.window):
+            s = self.get_stats(symbol)
+            if not s:
+                continue
+            slip = (f"{s['slip_p50']:.1f}/{s['slip_p90']:.1f}/{s['slip_p99']:.1f} pts"
+                    if s['slip_p50'] is not None else "n/a")
+            lines.append(
+                f"\n*{symbol}* ({s['orders']} orders)\n"
+                f"Latency p50/p90/p99: {s['latency_p50']:.0f}/{s['latency_p90']:.0f}/{s['latency_p99']:.0f} ms\n"
+                f"Slippage p50/p90/p99: {slip}\n"
+                f"Requotes: {s['requote_rate']:.1f}% | Deviation: {self.get_deviation(symbol, Config.ORDER_DEVIATION)}"
+            )
+        if len(lines) == 1:
+            lines.append("No orders recorded yet.")
+        return "\n".join(lines)
+
+execution_stats = ExecutionStats()
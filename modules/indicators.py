@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+# Indicator kernels on float64 arrays.
+# Same results as the pandas versions the bot used before (ewm with adjust=False,
+# Wilder smoothing via com=period-1), without the intermediate Series.
+# Every kernel accepts an optional preallocated `out` array.
+
+# Above this length ewm hands the recursion to pandas' compiled kernel; below it
+# the Series overhead costs more than the Python loop (break-even ~600 bars)
+EWM_LOOP_MAX = 512
+
+def _out(n, out):
+    if out is None:
+        return np.empty(n, dtype=np.float64)
+    return out
+
+def ewm(values, alpha, min_periods=0, out=None):
+    """
+    Recursive exponential mean, y[t] = ((1-a)*y[t-1] + a*x[t]) / ((1-a) + a).
+    Mirrors pandas ewm(adjust=False) step by step, so results match bit for bit.
+    Long series (backtests) go through pandas itself, which runs the same recursion in Cython.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    res = _out(n, out)
+    if n == 0:
+        return res
+    if n > EWM_LOOP_MAX:
+        # ignore_na: like the loop, a NaN gap does not decay the previous value
+        res[:] = pd.Series(x, copy=False).ewm(alpha=alpha, min_periods=min_periods, adjust=False,
+                                              ignore_na=True).mean().to_numpy()
+        return res
+
+    old_wt_factor = 1.0 - alpha
+    denom = old_wt_factor + alpha
+    xs = x.tolist()  # Python floats are doubles; much faster to iterate than numpy scalars
+    ys = [0.0] * n
+
+    weighted = xs[0]
+    nobs = 0 if weighted != weighted else 1
+    ys[0] = weighted if nobs >= max(min_periods, 1) else np.nan
+    for i in range(1, n):
+        cur = xs[i]
+        if cur == cur:
+            nobs += 1
+            if weighted != weighted:
+                weighted = cur
+            elif weighted != cur:
+                weighted = (old_wt_factor * weighted + alpha * cur) / denom
+        ys[i] = weighted if nobs >= min_periods and nobs > 0 else np.nan
+
+    res[:] = ys
+    return res
+
+def ema(values, span, out=None):
+    """pandas: s.ewm(span=span, adjust=False).mean()"""
+    return ewm(values, 2.0 / (span + 1.0), 0, out)
+
+def wilder(values, period, out=None):
+    """Wilder smoothing. pandas: s.ewm(com=period-1, min_periods=period, adjust=False).mean()"""
+    return ewm(values, 1.0 / period, period, out)
+
+def rsi(close, period, out=None):
+    """Wilder RSI (0-100). NaN during warm-up."""
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    res = _out(n, out)
+    if n == 0:
+        return res
+
+    delta = np.empty(n)
+    delta[0] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = -np.where(delta < 0, delta, 0.0)
+
+    avg_gain = wilder(gain, period)
+    avg_loss = wilder(loss, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(avg_gain, avg_loss, out=res)
+        res += 1.0
+        np.divide(100.0, res, out=res)
+        np.subtract(100.0, res, out=res)
+    return res
+
+def true_range(high, low, close, out=None):
+    """max(high-low, |high-prev_close|, |low-prev_close|); first bar is high-low."""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    res = _out(n, out)
+    if n == 0:
+        return res
+
+    np.subtract(high, low, out=res)
+    prev_close = close[:-1]
+    np.fmax(res[1:], np.abs(high[1:] - prev_close), out=res[1:])
+    np.fmax(res[1:], np.abs(low[1:] - prev_close), out=res[1:])
+    return res
+
+def atr(high, low, close, period, out=None):
+    """Wilder ATR."""
+    res = true_range(high, low, close, out)
+    return wilder(res, period, out=res)
+
+def _rolling(values, window, reducer, out):
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    res = _out(n, out)
+    res[:min(window - 1, n)] = np.nan
+    if n >= window:
+        reducer(np.lib.stride_tricks.sliding_window_view(x, window), axis=1, out=res[window - 1:])
+    return res
+
+def rolling_max(values, window, out=None):
+    """pandas: s.rolling(window).max() (NaN until the window is full)."""
+    return _rolling(values, window, np.max, out)
+
+def rolling_min(values, window, out=None):
+    """pandas: s.rolling(window).min()"""
+    return _rolling(values, window, np.min, out)
+
+def pivots(high, low, lookback):
+    """
+    Swing highs/lows: bar i is a resistance (support) pivot when its high (low)
+    beats the lookback-1 bars on each side. Returns (is_res, is_sup) bool arrays;
+    the first and last `lookback` bars are never pivots (not confirmed yet).
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    n = len(high)
+    is_res = np.zeros(n, dtype=bool)
+    is_sup = np.zeros(n, dtype=bool)
+    idx = np.arange(lookback, n - lookback)
+    if len(idx) == 0:
+        return is_res, is_sup
+
+    w = lookback - 1
+    if w > 0:
+        hi_max = rolling_max(high, w)
+        lo_min = rolling_min(low, w)
+        # [i-w, i-1] ends at i-1, [i+1, i+w] ends at i+w
+        is_res[idx] = (high[idx] > hi_max[idx - 1]) & (high[idx] > hi_max[idx + w])
+        is_sup[idx] = (low[idx] < lo_min[idx - 1]) & (low[idx] < lo_min[idx + w])
+    else:
+        is_res[idx] = is_sup[idx] = True
+    return is_res, is_sup
@@ -2,11 +2,13 @@ import pandas as pd
 import numpy as np
 from config import Config
 from modules.logger import logger
+from modules import indicators
 from modules.mt5_interface import mt5_interface
+from modules.zone_index import zone_index
 
 class MarketAnalyzer:
     def __init__(self):
-        pass
+        self.last_report_time = 0  # clock time of the last scheduled report round
 
     def identify_trend(self, df):
         """
@@ -44,16 +46,15 @@ class MarketAnalyzer:
             return levels
 
         # Minimal implementation of fractals/swings
-        for i in range(lookback, len(df) - lookback):
-            # Pivot High
-            if all(df['high'].iloc[i] > df['high'].iloc[i-k] for k in range(1, lookback)) and \
-               all(df['high'].iloc[i] > df['high'].iloc[i+k] for k in range(1, lookback)):
-                levels.append({'type': 'RESISTANCE', 'price': df['high'].iloc[i]})
-            
-            # Pivot Low
-            if all(df['low'].iloc[i] < df['low'].iloc[i-k] for k in range(1, lookback)) and \
-               all(df['low'].iloc[i] < df['low'].iloc[i+k] for k in range(1, lookback)):
-                levels.append({'type': 'SUPPORT', 'price': df['low'].iloc[i]})
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        is_res, is_sup = indicators.pivots(high, low, lookback)
+
+        for i in np.flatnonzero(is_res | is_sup):
+            if is_res[i]:
+                levels.append({'type': 'RESISTANCE', 'price': high[i]})
+            if is_sup[i]:
+                levels.append({'type': 'SUPPORT', 'price': low[i]})
         
         # Filter levels close to each other? (Optional optimization)
         return levels
@@ -69,11 +70,12 @@ class MarketAnalyzer:
                 return None
             
             # Re-calculate indicators
-            df['EMA_Fast'] = df['close'].ewm(span=Config.EMA_FAST, adjust=False).mean()
-            df['EMA_Slow'] = df['close'].ewm(span=Config.EMA_SLOW, adjust=False).mean()
+            close = df['close'].to_numpy(dtype=np.float64)
+            df['EMA_Fast'] = indicators.ema(close, Config.EMA_FAST)
+            df['EMA_Slow'] = indicators.ema(close, Config.EMA_SLOW)
 
             trend = self.identify_trend(df)
-            levels = self.find_levels(df)
+            zones = zone_index.get(symbol)
             
             current_price = df['close'].iloc[-1]
             
@@ -89,27 +91,29 @@ class MarketAnalyzer:
             nearby_msg = "✅ Hozircha zona yo'q, yo'l ochiq."
             advice = ""
             
-            closest_dist = float('inf')
             closest_level = None
-            
-            for lvl in levels:
-                dist = abs(current_price - lvl['price'])
-                if dist < closest_dist:
-                    closest_dist = dist
-                    closest_level = lvl
-            
-            # Define "Nearby" as roughly 10-15 pips (0.00100 for forex pairs roughly) or purely relative
-            # For simplicity let's assume if it is logically 'close' contextually
-            # We will just report the nearest one found
-            
+            if zones is not None:
+                below, above = zones.nearest(current_price)
+                if below is not None:
+                    below['type'] = 'SUPPORT'
+                if above is not None:
+                    above['type'] = 'RESISTANCE'
+                found = [z for z in (below, above) if z is not None]
+                if found:
+                    closest_level = min(found, key=lambda z: z['distance'])
+
             if closest_level:
+                closest_dist = closest_level['distance']
+                # "Near" scales with volatility instead of a fixed 20 pips
+                near_dist = Config.ZONE_NEAR_ATR * zones.atr
                 lvl_type = "Tepada Kuchli Zona (Qarshilik)" if closest_level['type'] == 'RESISTANCE' else "Pastda Kuchli Zona (Podderjka)"
-                nearby_msg = f"⚠️ {lvl_type}: {closest_level['price']:.5f}"
+                nearby_msg = (f"⚠️ {lvl_type}: {closest_level['low']:.5f} - {closest_level['high']:.5f} "
+                              f"({closest_level['touches']}x, {'/'.join(closest_level['timeframes'])})")
                 
                 # Context Logic
-                if "UPTREND" in trend and closest_level['type'] == 'RESISTANCE' and closest_dist < 0.0020:
+                if "UPTREND" in trend and closest_level['type'] == 'RESISTANCE' and closest_dist < near_dist:
                     advice = "💡 Maslahat: Narx o'smoqda lekin kuchli zonaga yaqin. Sotib olish xavfli bo'lishi mumkin."
-                elif "DOWNTREND" in trend and closest_level['type'] == 'SUPPORT' and closest_dist < 0.0020:
+                elif "DOWNTREND" in trend and closest_level['type'] == 'SUPPORT' and closest_dist < near_dist:
                     advice = "💡 Maslahat: Narx tushmoqda lekin pastdagi zonaga yaqin. Sotishga shoshilmang."
                 elif "UPTREND" in trend:
                     advice = "💡 Maslahat: Trend tepaga. Qulay vaziyatda sotib olish (BUY) izlash mumkin."
@@ -0,0 +1,149 @@
+import asyncio
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+from datetime import datetime
+try:
+    import psutil
+except ImportError:
+    psutil = None
+from config import Config
+from modules.logger import logger
+
+def get_rss_mb():
+    """Current resident set size in MB (None if it cannot be determined)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+        except (OSError, ValueError):
+            return None
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize / 1024 / 1024
+        except Exception:
+            return None
+    return None
+
+def _short(filename):
+    # "pandas/core/frame.py" is more useful than "frame.py" or the full path
+    parts = filename.replace("\\", "/").split("/")
+    return "/".join(parts[-2:])
+
+class MemoryMonitor:
+    """
+    tracemalloc snapshots on demand (/mem) or on a schedule.
+    Tracing is off unless MEM_TRACE is set or /mem start is used, so the
+    normal cost is zero.
+    """
+
+    def __init__(self):
+        self.previous = None
+        self.rss_start = get_rss_mb()
+        self._lock = threading.Lock()  # reports run in worker threads; one diff at a time
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not self.tracing:
+            tracemalloc.start(Config.MEM_TRACE_FRAMES)
+            self.previous = None
+            logger.info("tracemalloc started")
+
+    def stop(self):
+        if self.tracing:
+            tracemalloc.stop()
+            self.previous = None
+            logger.info("tracemalloc stopped")
+
+    def _snapshot(self):
+        snap = tracemalloc.take_snapshot()
+        return snap.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def report(self, top_n=None):
+        """Builds the text report; with tracing on it also diffs against the previous snapshot.
+        Blocking (snapshot + compare): call it via asyncio.to_thread from the loop."""
+        with self._lock:
+            return self._report(top_n)
+
+    def _report(self, top_n):
+        top_n = top_n or Config.MEM_TOP_N
+        rss = get_rss_mb()
+        counts = gc.get_count()
+        collections = [s['collections'] for s in gc.get_stats()]
+        lines = [
+            f"🧠 Memory report {datetime.now():%Y-%m-%d %H:%M:%S}",
+            f"RSS: {rss:.1f} MB (start {self.rss_start:.1f} MB)" if rss and self.rss_start else f"RSS: {rss}",
+            f"GC pending: {counts} | collections: {collections} | garbage: {len(gc.garbage)}",
+        ]
+
+        if not self.tracing:
+            lines.append("tracemalloc is off (/mem start to enable)")
+            return "\n".join(lines)
+
+        snap = self._snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append(f"Traced: {current / 1024 / 1024:.1f} MB (peak {peak / 1024 / 1024:.1f} MB)")
+
+        lines.append(f"\nTop {top_n} allocation sites:")
+        for stat in snap.statistics('lineno')[:top_n]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size / 1024:8.1f} KB {stat.count:7d} blk  {_short(frame.filename)}:{frame.lineno}")
+
+        if self.previous is not None:
+            lines.append("\nGrowth since last snapshot:")
+            for stat in snap.compare_to(self.previous, 'lineno')[:top_n]:
+                frame = stat.traceback[0]
+                lines.append(f"{stat.size_diff / 1024:+8.1f} KB {stat.count_diff:+7d} blk  {_short(frame.filename)}:{frame.lineno}")
+        self.previous = snap
+        return "\n".join(lines)
+
+    def write_report(self, text):
+        path = os.path.join(Config.LOG_DIR, f"mem_{datetime.now():%Y%m%d_%H%M%S}.txt")
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        except OSError as e:
+            logger.error(f"Failed to write memory report: {e}")
+            return None
+        return path
+
+    async def run(self):
+        """Scheduled snapshots every MEM_SNAPSHOT_INTERVAL seconds (0 = only on demand)."""
+        if Config.MEM_TRACE:
+            self.start()
+        if not Config.MEM_SNAPSHOT_INTERVAL:
+            return
+        while True:
+            await asyncio.sleep(Config.MEM_SNAPSHOT_INTERVAL)
+            try:
+                path = await asyncio.to_thread(lambda: self.write_report(self.report()))
+                logger.info(f"Memory report written to {path} (RSS {get_rss_mb()} MB)")
+            except Exception as e:
+                logger.error(f"Memory report failed: {e}")
+
+memory_monitor = MemoryMonitor()
@@ -1,4 +1,5 @@
 import sys
+import time
 try:
     import MetaTrader5 as mt5
 except ImportError:
@@ -7,13 +8,69 @@ import pandas as pd
 from datetime import datetime
 from config import Config
 from modules.logger import logger
+from modules.clock import clock
+from modules.execution_stats import execution_stats
+from modules.trade_journal import trade_journal
+
+# last_error() codes meaning the IPC link to the terminal is gone
+IPC_ERRORS = {-10001, -10002, -10003, -10004, -10005}
+# last_error() codes blaming the request itself (bad symbol, bad arguments), not the link
+REQUEST_ERRORS = {-2, -4}
+# Trade servers run whole or half hours off UTC; a quote this close to that grid is fresh
+SERVER_OFFSET_STEP = 1800
+SERVER_OFFSET_TOLERANCE = 120
 
 class MT5Interface:
     def __init__(self):
         self.connected = False
+        self.consecutive_failures = 0
+        self.server_offset = 0  # terminal clock (quote and deal times) minus UTC, seconds
+
+    def _track_server_offset(self, quote_time):
+        """Learns the server clock offset from a quote's time. Stale quotes (market closed) are ignored."""
+        if not quote_time:
+            return
+        raw = quote_time - clock.time()
+        offset = round(raw / SERVER_OFFSET_STEP) * SERVER_OFFSET_STEP
+        if abs(raw - offset) <= SERVER_OFFSET_TOLERANCE and offset != self.server_offset:
+            logger.info(f"MT5 server clock is UTC{offset / 3600:+g}h")
+            self.server_offset = offset
+
+    def server_time(self):
+        """Now, on the clock MT5 stamps deals and bars with."""
+        return clock.time() + self.server_offset
+
+    def _note_failure(self, error=None):
+        """Called when the terminal returns nothing. Flags a dropped connection."""
+        if error is None:
+            try:
+                error = mt5.last_error()
+            except Exception:
+                error = None
+        code = error[0] if error else None
+        if code in REQUEST_ERRORS:
+            # e.g. an unknown symbol: the terminal answered, so the link is fine
+            return
+        self.consecutive_failures += 1
+        if self.connected and (code in IPC_ERRORS or
+                               self.consecutive_failures >= Config.MT5_MAX_EMPTY_RESULTS):
+            logger.warning(f"MT5 connection lost (last_error={error}, empty results={self.consecutive_failures})")
+            self.connected = False
+
+    def _note_success(self):
+        self.consecutive_failures = 0
+
+    def set_backend(self, backend):
+        """Swaps the terminal module (e.g. session recorder or replay)."""
+        global mt5
+        mt5 = backend
 
     def initialize(self):
         """Initializes connection to MT5 terminal."""
+        if Config.MT5_RECORD_PATH and mt5 is not None and not hasattr(mt5, '_terminal'):
+            from modules.mt5_recorder import RecordingTerminal
+            self.set_backend(RecordingTerminal(mt5, Config.MT5_RECORD_PATH))
+
         if mt5 is None:
             logger.critical("MetaTrader5 library is NOT installed. Note: This library ONLY works on Windows.")
             return False
@@ -34,11 +91,14 @@ class MT5Interface:
                 return False
         
         self.connected = True
+        self.consecutive_failures = 0
         logger.info(f"Connected to MT5: {mt5.terminal_info()}")
         return True
 
     def shutdown(self):
         mt5.shutdown()
+        if hasattr(mt5, '_terminal'):
+            mt5.close()  # session recorder: close its file
         self.connected = False
         logger.info("MT5 connection closed")
 
@@ -47,15 +107,18 @@ class MT5Interface:
         info = mt5.symbol_info(symbol)
         if not info:
             logger.error(f"Symbol {symbol} not found")
+            self._note_failure()
             return None
+        self._note_success()
+        self._track_server_offset(getattr(info, 'time', None))
         if not info.visible:
             if not mt5.symbol_select(symbol, True):
                 logger.error(f"Symbol {symbol} select failed")
                 return None
         return info
 
-    def get_data(self, symbol, timeframe_str, n_bars=500):
-        """Fetch historical data as DataFrame."""
+    def get_rates(self, symbol, timeframe_str, n_bars=500):
+        """Fetch raw rates (numpy structured array) straight from the terminal."""
         tf_map = {
             "M1": mt5.TIMEFRAME_M1, "M5": mt5.TIMEFRAME_M5, "M15": mt5.TIMEFRAME_M15,
             "M30": mt5.TIMEFRAME_M30, "H1": mt5.TIMEFRAME_H1, "H4": mt5.TIMEFRAME_H4,
@@ -65,27 +128,53 @@ class MT5Interface:
         
         rates = mt5.copy_rates_from_pos(symbol, tf, 0, n_bars)
         if rates is None or len(rates) == 0:
-            logger.error(f"Failed to get data for {symbol} (Error: {mt5.last_error()})")
+            error = mt5.last_error()
+            logger.error(f"Failed to get data for {symbol} (Error: {error})")
+            self._note_failure(error)
+            return None
+        self._note_success()
+        return rates
+
+    def get_data(self, symbol, timeframe_str, n_bars=500):
+        """Fetch historical data as DataFrame."""
+        rates = self.get_rates(symbol, timeframe_str, n_bars)
+        if rates is None:
             return None
             
         df = pd.DataFrame(rates)
         df['time'] = pd.to_datetime(df['time'], unit='s')
         return df
 
+    def get_tick(self, symbol):
+        """Get the last tick (bid/ask) for a symbol."""
+        tick = mt5.symbol_info_tick(symbol)
+        if not tick:
+            logger.error(f"Failed to get tick for {symbol}")
+            self._note_failure()
+            return None
+        self._note_success()
+        self._track_server_offset(getattr(tick, 'time', None))
+        return tick
+
     def get_account_info(self):
         """Get account balance, equity, margin."""
         info = mt5.account_info()
         if not info:
             logger.error("Failed to get account info")
+            self._note_failure()
             return None
+        self._note_success()
         return info._asdict()
 
-    def place_order(self, symbol, order_type, volume, sl=0.0, tp=0.0, deviation=20):
-        """Places a market order."""
+    def place_order(self, symbol, order_type, volume, sl=0.0, tp=0.0, deviation=None, signal_id=None):
+        """Places a market order. signal_id links it to the journaled signal."""
         symbol_info = self.get_symbol_info(symbol)
         if not symbol_info:
             return None
 
+        if deviation is None:
+            deviation = execution_stats.get_deviation(symbol, Config.ORDER_DEVIATION)
+
         action_type = mt5.ORDER_TYPE_BUY if order_type == "BUY" else mt5.ORDER_TYPE_SELL
         price = symbol_info.ask if order_type == "BUY" else symbol_info.bid
         
@@ -118,11 +207,31 @@ class MT5Interface:
             "type_filling": filling_type,
         }
         
+        sent_at = time.time()
+        started = time.perf_counter()
         result = mt5.order_send(request)
+        acked_at = sent_at + (time.perf_counter() - started)
+
+        retcode = result.retcode if result is not None else -1
+        fill_price = getattr(result, 'price', 0.0) if result is not None else 0.0
+        execution = execution_stats.record(symbol, order_type, price, fill_price, symbol_info.point,
+                                           sent_at, acked_at, retcode, deviation)
+        trade_journal.record_order(symbol, order_type, volume, price, sl, tp, deviation, retcode,
+                                   getattr(result, 'order', None), execution['latency_ms'],
+                                   getattr(result, 'comment', None), signal_id)
+
+        if result is None:
+            error = mt5.last_error()
+            logger.error(f"Order failed: order_send returned None ({error})")
+            self._note_failure(error)
+            return None
+        self._note_success()
         if result.retcode != mt5.TRADE_RETCODE_DONE:
             logger.error(f"Order failed: {result.comment}, retcode={result.retcode}")
             return None
             
+        trade_journal.record_fill(symbol, order_type, result.order, getattr(result, 'deal', None),
+                                  getattr(result, 'volume', volume), fill_price, execution['slippage_pts'])
         logger.info(f"Order placed: {order_type} {volume} {symbol} @ {price}")
         return result
 
@@ -130,11 +239,41 @@ class MT5Interface:
         """Get current open positions."""
         positions = mt5.positions_get()
         if positions is None:
+            self._note_failure()
             return []
-        
+        self._note_success()
+
         # Return as list of dicts
         return [p._asdict() for p in positions if p.magic == Config.MAGIC_NUMBER]
 
+    def get_deals(self, date_from, date_to):
+        """Bot deals (in and out) from the terminal's history, as dicts. None on failure."""
+        deals = mt5.history_deals_get(date_from, date_to)
+        if deals is None:
+            logger.error(f"Failed to get deal history (Error: {mt5.last_error()})")
+            self._note_failure()
+            return None
+        self._note_success()
+        return [d._asdict() for d in deals if d.magic == Config.MAGIC_NUMBER]
+
+    def get_position_snapshot(self):
+        """Bot positions as the terminal's own structs (no dict conversion). None on failure, unlike get_positions."""
+        positions = mt5.positions_get()
+        if positions is None:
+            self._note_failure()
+            return None
+        self._note_success()
+        return [p for p in positions if p.magic == Config.MAGIC_NUMBER]
+
+    def get_position_deals(self, ticket):
+        """All deals (open and close) of one position, as dicts. None on failure."""
+        deals = mt5.history_deals_get(position=ticket)
+        if deals is None:
+            logger.error(f"Failed to get deals of position {ticket} (Error: {mt5.last_error()})")
+            return None
+        self._note_success()
+        return [d._asdict() for d in deals]
+
     def modify_position(self, ticket, sl, tp):
         """Modify SL/TP of a position."""
         request = {
@@ -144,9 +283,31 @@ class MT5Interface:
             "tp": float(tp)
         }
         result = mt5.order_send(request)
+        if result is None:
+             logger.error(f"Modify failed for ticket {ticket}: order_send returned None")
+             self._note_failure()
+             return False
+        self._note_success()
         if result.retcode != mt5.TRADE_RETCODE_DONE:
              logger.error(f"Modify failed for ticket {ticket}: {result.comment}")
              return False
         return True
 
+    def probe(self):
+        """Cheap health check: is the terminal alive and connected to the trade server?"""
+        try:
+            info = mt5.terminal_info()
+        except Exception as e:
+            logger.error(f"MT5 probe failed: {e}")
+            info = None
+        if info is None or not getattr(info, 'connected', True):
+            self._note_failure()
+            # A dead terminal is a dead connection, no need to wait for more empty results
+            if self.connected:
+                logger.warning("MT5 health probe failed")
+                self.connected = False
+            return False
+        self._note_success()
+        return True
+
 mt5_interface = MT5Interface()
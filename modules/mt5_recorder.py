@@ -0,0 +1,232 @@
+import asyncio
+import pickle
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+from datetime import date
+from modules.logger import logger
+from modules.clock import clock, SimulatedTime
+
+RECORD_VERSION = 1
+
+# Terminal functions whose arguments are not part of the replay lookup key
+# (requests carry prices/credentials that legitimately differ between runs)
+_NAME_ONLY = {"initialize", "login", "shutdown", "last_error", "terminal_info", "order_send"}
+
+
+def _to_portable(obj):
+    """MT5 structs -> plain tuples, so a session recorded on Windows loads anywhere."""
+    if hasattr(obj, '_asdict'):
+        return ('__nt__', type(obj).__name__, {k: _to_portable(v) for k, v in obj._asdict().items()})
+    if isinstance(obj, tuple):
+        return tuple(_to_portable(v) for v in obj)
+    if isinstance(obj, list):
+        return [_to_portable(v) for v in obj]
+    if isinstance(obj, dict):
+        return {k: _to_portable(v) for k, v in obj.items()}
+    return obj
+
+
+_nt_cache = {}
+
+def _from_portable(obj):
+    if isinstance(obj, tuple):
+        if len(obj) == 3 and obj[0] == '__nt__':
+            name, fields = obj[1], obj[2]
+            cls = _nt_cache.get((name, tuple(fields)))
+            if cls is None:
+                cls = namedtuple(name, list(fields))
+                _nt_cache[(name, tuple(fields))] = cls
+            return cls(**{k: _from_portable(v) for k, v in fields.items()})
+        return tuple(_from_portable(v) for v in obj)
+    if isinstance(obj, list):
+        return [_from_portable(v) for v in obj]
+    if isinstance(obj, dict):
+        return {k: _from_portable(v) for k, v in obj.items()}
+    return obj
+
+
+_KEY_TYPES = (str, int, float, date)  # date covers datetime (history ranges)
+
+def _call_key(name, args, kwargs=None):
+    """
+    Function + scalar args + sorted scalar kwargs, so history_deals_get(position=1)
+    and history_deals_get(position=2), or two date ranges, are separate queues.
+    """
+    if name in _NAME_ONLY:
+        return (name,)
+    key = (name,) + tuple(a for a in args if isinstance(a, _KEY_TYPES))
+    if kwargs:
+        key += tuple((k, v) for k, v in sorted(kwargs.items()) if isinstance(v, _KEY_TYPES))
+    return key
+
+
+def read_session(path):
+    """Yields records from a session file: ('header', dict) then ('call', name, args, kwargs, result, t_wall, duration)."""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+            except pickle.UnpicklingError:
+                # Truncated last record (process killed mid-write)
+                logger.warning(f"Session file {path} ends with a partial record")
+                return
+
+
+class RecordingTerminal:
+    """
+    Drop-in for the MetaTrader5 module that forwards every call to the real
+    terminal and appends (call, args, result, timing) to an append-only file.
+    """
+
+    def __init__(self, terminal, path):
+        self._terminal = terminal
+        self._path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        constants = {k: getattr(terminal, k) for k in dir(terminal)
+                     if k.isupper() and isinstance(getattr(terminal, k), (int, float, str))}
+        self._write(('header', {'version': RECORD_VERSION, 'started': time.time(), 'constants': constants}))
+        logger.info(f"Recording MT5 session to {path}")
+
+    def _write(self, record):
+        data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+
+    def __getattr__(self, name):
+        attr = getattr(self._terminal, name)
+        if not callable(attr):
+            return attr
+
+        def recorded(*args, **kwargs):
+            t_wall = time.time()
+            started = time.perf_counter()
+            result = attr(*args, **kwargs)
+            duration = time.perf_counter() - started
+            try:
+                self._write(('call', name, _to_portable(args), _to_portable(kwargs),
+                             _to_portable(result), t_wall, duration))
+            except Exception as e:
+                logger.error(f"Session recording failed for {name}: {e}")
+            return result
+
+        return recorded
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class ReplayTerminal:
+    """
+    Plays a recorded session back as if it were the MetaTrader5 module.
+
+    Responses are matched per call key (function + scalar args and kwargs) in recorded order.
+    speed=1.0 reproduces the recorded terminal latency, speed=None returns instantly.
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.speed = speed
+        self.finished = False
+        self.calls_served = 0
+        self._queues = defaultdict(deque)
+        self._last = {}
+        self._constants = {}
+        self.started = None  # wall time the recording began
+
+        for record in read_session(path):
+            if record[0] == 'header':
+                self._constants.update(record[1]['constants'])
+                if self.started is None:
+                    self.started = record[1].get('started')
+            elif record[0] == 'call':
+                _, name, args, kwargs, result, t_wall, duration = record
+                self._queues[_call_key(name, args, _from_portable(kwargs))].append((result, duration))
+        self.total_calls = sum(len(q) for q in self._queues.values())
+        logger.info(f"Loaded MT5 session {path}: {self.total_calls} calls")
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in self._constants:
+            return self._constants[name]
+
+        def replayed(*args, **kwargs):
+            key = _call_key(name, args, kwargs)
+            queue = self._queues.get(key)
+            if queue:
+                result, duration = queue.popleft()
+                self._last[key] = (result, duration)
+            elif key in self._last:
+                # Session ran out for this call: keep answering with the last response
+                self.finished = True
+                result, duration = self._last[key]
+            else:
+                logger.debug(f"Replay: no recorded response for {key}")
+                return None
+
+            if self.speed:
+                time.sleep(duration / self.speed)
+            self.calls_served += 1
+            return _from_portable(result)
+
+        return replayed
+
+
+async def _drive(terminal):
+    """Runs trading_loop until the session runs out."""
+    import main
+    started = time.perf_counter()
+    task = asyncio.create_task(main.trading_loop())
+    try:
+        while not terminal.finished and not task.done():
+            await asyncio.sleep(1)
+    finally:
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    elapsed = time.perf_counter() - started
+    logger.info(f"Replay finished: {terminal.calls_served}/{terminal.total_calls} calls in {elapsed:.2f}s")
+    return terminal
+
+
+def replay_session(path, speed=1.0, fast=False, ignore_session_hours=True):
+    """
+    Runs the unmodified trading_loop against a recorded session.
+
+    fast: no recorded latency, and the loop runs on a VirtualTimeEventLoop
+    starting at the recording's start time, so its sleeps cost no wall time
+    and clock-based rules (session window, report schedule) see recorded time.
+    ignore_session_hours: the recording was made in trading hours, replay may not be.
+    """
+    from modules.mt5_interface import mt5_interface
+    from modules.risk_manager import risk_manager
+    from modules.telegram_bot import telegram_bot
+
+    terminal = ReplayTerminal(path, speed=None if fast else speed)
+    mt5_interface.set_backend(terminal)
+    saved = (telegram_bot.trading_enabled, risk_manager._is_trading_session)
+    telegram_bot.trading_enabled = True
+    if ignore_session_hours:
+        risk_manager._is_trading_session = lambda: True
+
+    try:
+        if fast:
+            return clock.run_simulated(_drive(terminal), SimulatedTime(terminal.started or time.time()), None)
+        return asyncio.run(_drive(terminal))
+    finally:
+        telegram_bot.trading_enabled, risk_manager._is_trading_session = saved
+
+
+if __name__ == "__main__":
+    # python -m modules.mt5_recorder session.rec [--fast]
+    # Profile it with: python -m cProfile -o replay.prof -m modules.mt5_recorder session.rec --fast
+    import sys
+    fast = "--fast" in sys.argv
+    replay_session(sys.argv[1], fast=fast)
@@ -0,0 +1,144 @@
+import csv
+import json
+import os
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timezone
+from config import Config
+from modules.logger import logger
+from modules.clock import clock
+
+IMPACT_LEVELS = {"LOW": 1, "MEDIUM": 2, "HIGH": 3}
+
+def symbol_currencies(symbol):
+    """EURUSD -> ("EUR", "USD"). Config.SYMBOL_CURRENCIES overrides odd names (indices, suffixes)."""
+    if symbol in Config.SYMBOL_CURRENCIES:
+        return tuple(Config.SYMBOL_CURRENCIES[symbol])
+    return (symbol[:3].upper(), symbol[3:6].upper())
+
+def _parse_time(value):
+    dt = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)  # calendar times are UTC
+    return dt.timestamp()
+
+class NewsCalendar:
+    """
+    Economic news blackout windows kept as merged, sorted intervals per currency,
+    so "is this symbol blocked now" is two bisects.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.events = {}          # currency -> set of (ts, impact, title)
+        self.starts = {}          # currency -> [start, ...] (sorted, non-overlapping)
+        self.ends = {}            # currency -> [end, ...]
+        self.titles = {}          # currency -> [title of the interval, ...]
+        self._mtime = None
+        self._last_check = 0.0
+
+    @property
+    def file(self):
+        return self.path or Config.NEWS_FILE
+
+    def _read(self):
+        path = self.file
+        if path.lower().endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                rows = json.load(f)
+        else:
+            with open(path, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+
+        events = defaultdict(set)
+        min_level = IMPACT_LEVELS.get(Config.NEWS_MIN_IMPACT.upper(), 3)
+        for row in rows:
+            try:
+                impact = str(row.get("impact", "HIGH")).strip().upper()
+                if IMPACT_LEVELS.get(impact, 0) < min_level:
+                    continue
+                events[str(row["currency"]).strip().upper()].add(
+                    (_parse_time(row["time"]), impact, str(row.get("title", "")).strip()))
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Skipping bad news row {row}: {e}")
+        return events
+
+    def _build(self, currency):
+        """Blackout intervals for one currency, overlapping windows merged."""
+        intervals = []
+        for ts, impact, title in self.events.get(currency, ()):
+            before, after = Config.NEWS_BLACKOUT_MINUTES.get(impact, (0, 0))
+            intervals.append((ts - before * 60, ts + after * 60, title))
+        intervals.sort()
+
+        starts, ends, titles = [], [], []
+        for start, end, title in intervals:
+            if ends and start <= ends[-1]:
+                if end > ends[-1]:
+                    ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+                titles.append(title)
+        if starts:
+            self.starts[currency], self.ends[currency], self.titles[currency] = starts, ends, titles
+        else:
+            for index in (self.starts, self.ends, self.titles):
+                index.pop(currency, None)
+
+    def reload(self):
+        """(Re)reads the file; only currencies whose events changed are re-indexed."""
+        try:
+            new_events = self._read()
+        except FileNotFoundError:
+            new_events = {}
+        except Exception as e:
+            logger.error(f"Failed to load news calendar {self.file}: {e}")
+            return []
+
+        changed = [c for c in set(self.events) | set(new_events)
+                   if self.events.get(c, set()) != new_events.get(c, set())]
+        self.events = dict(new_events)
+        for currency in changed:
+            self._build(currency)
+        if changed:
+            total = sum(len(v) for v in self.events.values())
+            logger.info(f"News calendar loaded: {total} events, re-indexed {', '.join(sorted(changed))}")
+        return changed
+
+    def poll(self):
+        """Reloads when the file's mtime changed (checked at most every NEWS_RELOAD_INTERVAL)."""
+        now = time.monotonic()
+        if self._mtime is not None and now - self._last_check < Config.NEWS_RELOAD_INTERVAL:
+            return
+        self._last_check = now
+        try:
+            mtime = os.stat(self.file).st_mtime_ns
+        except FileNotFoundError:
+            mtime = 0
+        if mtime != self._mtime:
+            self._mtime = mtime
+            self.reload()
+
+    def blackout(self, currency, ts):
+        """Title of the event blocking `currency` at ts, or None."""
+        starts = self.starts.get(currency)
+        if not starts:
+            return None
+        i = bisect_right(starts, ts) - 1
+        if i >= 0 and ts < self.ends[currency][i]:
+            return self.titles[currency][i] or "news"
+        return None
+
+    def is_blocked(self, symbol, ts=None):
+        """(blocked, reason) for a symbol at ts (default: now)."""
+        self.poll()
+        ts = clock.time() if ts is None else ts
+        for currency in symbol_currencies(symbol):
+            title = self.blackout(currency, ts)
+            if title:
+                return True, f"{currency}: {title}"
+        return False, None
+
+news_calendar = NewsCalendar()
@@ -0,0 +1,100 @@
+from collections import namedtuple
+from modules.logger import logger
+from modules.mt5_interface import mt5_interface
+
+# kind: 'opened' | 'modified' | 'closed'. position/previous are the terminal's structs;
+# close (closed only): {'price', 'profit' (net of commission/swap), 'reason', 'time', 'deals'} or None
+PositionEvent = namedtuple('PositionEvent', 'kind ticket symbol position previous close')
+
+# MT5 DEAL_REASON_* values for the closing deal
+CLOSE_REASONS = {0: "MANUAL", 1: "MOBILE", 2: "WEB", 3: "BOT", 4: "SL", 5: "TP", 6: "STOP_OUT"}
+
+class PositionTracker:
+    """
+    The bot's open positions keyed by ticket, with a per-symbol index.
+    Each update() diffs the terminal snapshot against the previous one and
+    emits opened / modified (SL, TP or volume changed) / closed events;
+    positions that did not change cost one tuple comparison. Positions found
+    by the first update after startup are reported as opened.
+    """
+
+    def __init__(self):
+        self.positions = {}   # ticket -> latest position struct
+        self.by_symbol = {}   # symbol -> set of tickets
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        """callback(event: PositionEvent). Called synchronously from update()."""
+        self.subscribers.append(callback)
+
+    @staticmethod
+    def _key(p):
+        return (p.sl, p.tp, p.volume)
+
+    def symbols(self):
+        return set(self.by_symbol)
+
+    def _close_info(self, ticket):
+        deals = mt5_interface.get_position_deals(ticket)
+        if not deals:
+            return None
+        out = [d for d in deals if d['entry'] == 1]  # DEAL_ENTRY_OUT
+        if not out:
+            return None
+        last = max(out, key=lambda d: d['time'])
+        return {
+            'price': last['price'],
+            'profit': sum(d['profit'] + d['commission'] + d['swap'] for d in deals),
+            'reason': CLOSE_REASONS.get(last['reason'], str(last['reason'])),
+            'time': last['time'],
+            'deals': deals,
+        }
+
+    def update(self, snapshot=None):
+        """
+        Applies a snapshot (default: fetched from the terminal). Returns the events.
+        A failed fetch changes nothing, so a terminal hiccup never looks like
+        every position closing.
+        """
+        if snapshot is None:
+            snapshot = mt5_interface.get_position_snapshot()
+            if snapshot is None:
+                return []
+
+        events = []
+        seen = set()
+        for p in snapshot:
+            ticket = p.ticket
+            seen.add(ticket)
+            previous = self.positions.get(ticket)
+            self.positions[ticket] = p
+            if previous is None:
+                self.by_symbol.setdefault(p.symbol, set()).add(ticket)
+                events.append(PositionEvent('opened', ticket, p.symbol, p, None, None))
+            elif self._key(p) != self._key(previous):
+                events.append(PositionEvent('modified', ticket, p.symbol, p, previous, None))
+
+        for ticket in [t for t in self.positions if t not in seen]:
+            p = self.positions.pop(ticket)
+            tickets = self.by_symbol.get(p.symbol)
+            if tickets is not None:
+                tickets.discard(ticket)
+                if not tickets:
+                    del self.by_symbol[p.symbol]
+            try:
+                close = self._close_info(ticket)
+            except Exception as e:
+                logger.error(f"Close details for position {ticket} unavailable: {e}")
+                close = None
+            events.append(PositionEvent('closed', ticket, p.symbol, p, p, close))
+
+        for event in events:
+            logger.info(f"Position {event.kind}: {event.symbol} #{event.ticket}")
+            for callback in self.subscribers:
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.error(f"Position subscriber {callback} failed: {e}")
+        return events
+
+position_tracker = PositionTracker()
@@ -1,25 +1,85 @@
-from datetime import datetime, time
+from datetime import time
 import pytz
 from config import Config
 from modules.logger import logger
 from modules.mt5_interface import mt5_interface
+from modules.news_calendar import news_calendar
+from modules.clock import clock
+from modules.position_tracker import position_tracker
+from modules.correlation import correlation_monitor
 
 class RiskManager:
     def __init__(self):
         self.daily_start_balance = 0.0
         self.trades_today = 0
         self.max_trades_per_day = 15 # Updated Limit
+        self.closed_today = 0
+        self.realized_pnl_today = 0.0
+        self.day = None  # UTC date the daily counters belong to
+        self._news_logged = set()
         
         # Define session times (UTC)
         # London: 08:00 - 17:00, NY: 13:00 - 22:00. Combined: 08:00 - 22:00
-        self.session_start = time(8, 0)
-        self.session_end = time(22, 0)
+        self.set_session(Config.SESSION_START, Config.SESSION_END)
+
+    def set_session(self, start, end):
+        """Session window from "HH:MM" strings (UTC)."""
+        self.session_start = time.fromisoformat(start)
+        self.session_end = time.fromisoformat(end)
+
+    def on_config_change(self, changed):
+        if 'SESSION_START' in changed or 'SESSION_END' in changed:
+            self.set_session(Config.SESSION_START, Config.SESSION_END)
+            logger.info(f"Trading session updated: {Config.SESSION_START} - {Config.SESSION_END} UTC")
+
+    def on_position_event(self, event):
+        """Position tracker subscriber: keeps realized P&L of closed trades."""
+        if event.kind == 'closed' and event.close:
+            self.closed_today += 1
+            self.realized_pnl_today += event.close['profit']
 
     def set_daily_start_balance(self, balance):
         """Must be called at start of day or bot restart."""
         self.daily_start_balance = balance
         logger.info(f"Daily start balance set to: {self.daily_start_balance}")
 
+    def roll_day(self):
+        """Resets the daily counters and start balance once the UTC date changes."""
+        today = clock.utcnow().date()
+        if self.day == today:
+            return
+        if self.day is not None:
+            account = mt5_interface.get_account_info()
+            if not account:
+                return  # retry next pass
+            logger.info(f"New trading day {today}: {self.trades_today} trades, "
+                        f"realized {self.realized_pnl_today:.2f} yesterday")
+            self.trades_today = 0
+            self.closed_today = 0
+            self.realized_pnl_today = 0.0
+            self.set_daily_start_balance(account['balance'])
+        self.day = today
+
+    def export_state(self):
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'daily_start_balance': self.daily_start_balance,
+            'trades_today': self.trades_today,
+            'closed_today': self.closed_today,
+            'realized_pnl_today': self.realized_pnl_today,
+        }
+
+    def load_state(self, state):
+        """Restores the daily counters if they belong to the current UTC day. Returns True if restored."""
+        if state.get('day') != clock.utcnow().date().isoformat():
+            return False
+        self.day = clock.utcnow().date()
+        self.daily_start_balance = state['daily_start_balance']
+        self.trades_today = state['trades_today']
+        self.closed_today = state['closed_today']
+        self.realized_pnl_today = state['realized_pnl_today']
+        return True
+
     def calculate_lot_size(self, symbol, sl_pips):
         """
         Calculates lot size. 
@@ -44,13 +104,45 @@ class RiskManager:
 
     def _is_trading_session(self):
         """Checks if current time is within allowed trading hours (London/NY)."""
-        now = datetime.utcnow().time()
+        now = clock.utcnow().time()
         if self.session_start <= now <= self.session_end:
             return True
         return False
 
-    def can_trade(self):
-        """Master check for allowing new trades."""
+    def check_news(self, symbol):
+        """Returns False while a news blackout covers one of the symbol's currencies."""
+        blocked, reason = news_calendar.is_blocked(symbol)
+        if blocked:
+            if (symbol, reason) not in self._news_logged:
+                self._news_logged.add((symbol, reason))
+                logger.info(f"News blackout for {symbol}: {reason}")
+            return False
+        return True
+
+    def correlated_exposure(self, symbol, direction):
+        """
+        Open lots that are effectively the same bet as `direction` on `symbol`:
+        each position with |correlation| >= CORR_THRESHOLD counts correlation x
+        its signed volume (the symbol itself counts fully). Negative = hedged.
+        """
+        rho = correlation_monitor.correlations(symbol)
+        sign = 1 if direction == 'BUY' else -1
+        exposure = 0.0
+        for p in position_tracker.positions.values():
+            r = 1.0 if p.symbol == symbol else rho.get(p.symbol, 0.0)
+            if abs(r) >= Config.CORR_THRESHOLD:
+                exposure += r * (1 if p.type == 0 else -1) * p.volume
+        return sign * exposure
+
+    def allowed_orders(self, symbol, direction, volume, count=1):
+        """How many of `count` orders of `volume` fit under CORR_MAX_EXPOSURE (0 = limit off)."""
+        if not Config.CORR_MAX_EXPOSURE or volume <= 0:
+            return count
+        headroom = Config.CORR_MAX_EXPOSURE - self.correlated_exposure(symbol, direction)
+        return max(0, min(count, int(headroom / volume + 1e-9)))
+
+    def can_trade(self, symbol=None, direction=None, volume=None):
+        """Master check for allowing new trades (news needs a symbol, the exposure gate a direction and volume)."""
         if not self._is_trading_session():
             return False, "Outside Trading Session"
             
@@ -60,8 +152,12 @@ class RiskManager:
         if self.trades_today >= self.max_trades_per_day:
             return False, "Max Daily Trades Reached"
             
-        # TODO: Add specific news check here
-        
+        if symbol and not self.check_news(symbol):
+            return False, "News Blackout"
+
+        if symbol and direction and volume and not self.allowed_orders(symbol, direction, volume):
+            return False, "Correlated Exposure Limit"
+
         return True, "OK"
 
 risk_manager = RiskManager()
@@ -0,0 +1,278 @@
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from config import Config
+from modules.logger import logger
+from modules import indicators
+from modules.strategy import Strategy, SIGNAL_FEATURES
+
+# Compact trade record. r = result in risk multiples (+0.7 at TP, -1 at SL)
+TRADE_DTYPE = np.dtype([
+    ('entry_time', '<i8'), ('exit_time', '<i8'), ('direction', 'i1'),
+    ('entry', '<f8'), ('exit', '<f8'), ('r', '<f8')
+])
+
+_strategy = Strategy()
+_worker_df = None
+
+
+def _epoch_seconds(times):
+    return np.asarray(pd.to_datetime(times).values.astype('datetime64[s]').astype(np.int64))
+
+
+def _h1_trend(times, close, ema_fast, ema_slow):
+    """
+    H1 EMA trend (1/-1/0) for every LTF bar. Only completed hours are used,
+    so the backtest never sees the future (live uses the forming H1 bar).
+    """
+    hours = times // 3600
+    last_in_hour = np.flatnonzero(np.diff(hours, append=hours[-1] + 1))
+    h1_close = close[last_in_hour]
+    fast = indicators.ema(h1_close, ema_fast)
+    slow = indicators.ema(h1_close, ema_slow)
+    h1_sign = np.sign(fast - slow)
+
+    # Hour h is complete from (h + 1) * 3600 onwards
+    available_from = (hours[last_in_hour] + 1) * 3600
+    idx = np.searchsorted(available_from, times, side='right') - 1
+    trend = np.zeros(len(times))
+    ok = idx >= 0
+    trend[ok] = h1_sign[idx[ok]]
+    return trend
+
+
+def _first_exit(hit_sl_fn, hit_tp_fn, start, n, chunk=512):
+    """Index of the first bar >= start where SL or TP is touched, scanned in chunks."""
+    while start < n:
+        end = min(start + chunk, n)
+        hit_sl = hit_sl_fn(start, end)
+        hit_tp = hit_tp_fn(start, end)
+        hit = hit_sl | hit_tp
+        if hit.any():
+            k = int(np.argmax(hit))
+            return start + k, bool(hit_sl[k])
+        start = end
+        chunk *= 2
+    return None, False
+
+
+def backtest(df, ema_fast=None, ema_slow=None, sl_mult=2.0):
+    """
+    Runs the Razgon entry rules over LTF bar history (one position at a time,
+    entry at the signal bar close, SL assumed first when both levels are hit in one bar).
+    Returns a TRADE_DTYPE array.
+    """
+    ema_fast = ema_fast or Config.EMA_FAST
+    ema_slow = ema_slow or Config.EMA_SLOW
+    if len(df) < max(ema_slow, Config.RSI_PERIOD) + 2:
+        return np.zeros(0, dtype=TRADE_DTYPE)
+
+    ind = _strategy.calculate_indicators(df[['time', 'open', 'high', 'low', 'close']].copy(), ema_fast, ema_slow)
+    feats = ind[list(SIGNAL_FEATURES)].to_numpy(dtype=np.float64)
+    times = _epoch_seconds(ind['time'])
+    high = feats[:, SIGNAL_FEATURES.index('high')]
+    low = feats[:, SIGNAL_FEATURES.index('low')]
+    close = feats[:, SIGNAL_FEATURES.index('close')]
+
+    trend = _h1_trend(times, close, ema_fast, ema_slow)
+    direction, sl, tp, _ = _strategy.evaluate_batch(
+        feats[1:], feats[:-1], trend[1:], np.full(len(feats) - 1, sl_mult))
+    valid = ~(np.isnan(ind['EMA_Slow'].to_numpy()) | np.isnan(ind['RSI'].to_numpy()))
+    direction[~valid[1:]] = 0
+
+    n = len(feats)
+    trades = []
+    next_free = 0
+    for k in np.flatnonzero(direction):
+        i = k + 1  # bar index of the signal
+        if i < next_free:
+            continue
+        d, stop, target, entry = int(direction[k]), sl[k], tp[k], close[i]
+        if d > 0:
+            j, stopped = _first_exit(lambda a, b: low[a:b] <= stop, lambda a, b: high[a:b] >= target, i + 1, n)
+        else:
+            j, stopped = _first_exit(lambda a, b: high[a:b] >= stop, lambda a, b: low[a:b] <= target, i + 1, n)
+        if j is None:
+            break  # still open at the end of history
+
+        exit_price = stop if stopped else target
+        risk = abs(entry - stop)
+        r = d * (exit_price - entry) / risk if risk > 0 else 0.0
+        trades.append((times[i], times[j], d, entry, exit_price, r))
+        next_free = j + 1
+
+    return np.array(trades, dtype=TRADE_DTYPE)
+
+
+def summarize(trades):
+    """Basic stats of a trade array (R based)."""
+    r = trades['r'] if trades.dtype.names else np.asarray(trades, dtype=np.float64)
+    if len(r) == 0:
+        return {'trades': 0, 'win_rate': 0.0, 'total_r': 0.0, 'expectancy': 0.0,
+                'profit_factor': 0.0, 'max_dd_r': 0.0}
+    equity = np.cumsum(r)
+    peak = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:]
+    gains = r[r > 0].sum()
+    losses = -r[r < 0].sum()
+    return {
+        'trades': int(len(r)),
+        'win_rate': float((r > 0).mean() * 100),
+        'total_r': float(r.sum()),
+        'expectancy': float(r.mean()),
+        'profit_factor': float(gains / losses) if losses > 0 else float('inf'),
+        'max_dd_r': float((peak - equity).max()),
+    }
+
+
+def expand_grid(param_grid):
+    """{'ema_fast': [5, 9], 'sl_mult': [2, 3]} -> list of param dicts."""
+    keys = list(param_grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(param_grid[k] for k in keys))]
+
+
+# --- Process pool plumbing (functions must be module level to pickle) ---
+
+def _init_worker(df):
+    global _worker_df
+    _worker_df = df
+
+
+def _run_slice(task):
+    start, end, params = task
+    trades = backtest(_worker_df.iloc[start:end], **params)
+    return trades
+
+
+def _map(tasks, df, workers):
+    if workers == 1:
+        _init_worker(df)
+        return [_run_slice(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(df,)) as pool:
+        return list(pool.map(_run_slice, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+def walk_forward(df, param_grid, train_bars, test_bars, step=None, metric='total_r', workers=None,
+                 warmup_bars=None):
+    """
+    Rolls train/test windows over the history. Every window re-optimizes the
+    params on its train part and is scored out-of-sample on the following test part.
+    warmup_bars: bars before each test window fed in to settle indicators
+    (default covers the H1 slow EMA on M1 data).
+    """
+    step = step or test_bars
+    workers = workers or os.cpu_count() or 1
+    grid = expand_grid(param_grid)
+
+    windows = []
+    start = 0
+    while start + train_bars + test_bars <= len(df):
+        windows.append((start, start + train_bars, start + train_bars + test_bars))
+        start += step
+    if not windows:
+        logger.warning("Walk-forward: history shorter than one train+test window")
+        return {'windows': [], 'trades': np.zeros(0, dtype=TRADE_DTYPE), 'summary': summarize(np.zeros(0, dtype=TRADE_DTYPE))}
+
+    # 1. Optimize: every (window, params) pair on its train slice
+    train_tasks = [(w[0], w[1], p) for w in windows for p in grid]
+    train_results = _map(train_tasks, df, workers)
+
+    best = []
+    for w_idx in range(len(windows)):
+        scores = [summarize(t)[metric] for t in train_results[w_idx * len(grid):(w_idx + 1) * len(grid)]]
+        b = int(np.argmax(scores))
+        best.append((grid[b], scores[b]))
+
+    # 2. Validate: best params on the unseen test slice
+    # Warm-up bars from the train part are included so indicators are settled
+    warmup = warmup_bars
+    if warmup is None:
+        warmup = 3 * 60 * max(p.get('ema_slow') or Config.EMA_SLOW for p in grid)
+    test_tasks = [(max(0, w[1] - warmup), w[2], b[0]) for w, b in zip(windows, best)]
+    test_results = _map(test_tasks, df, workers)
+
+    report = []
+    oos = []
+    test_start_times = _epoch_seconds(df['time'].iloc[[w[1] for w in windows]])
+    for w, (params, score), trades, t0 in zip(windows, best, test_results, test_start_times):
+        trades = trades[trades['entry_time'] >= t0]
+        oos.append(trades)
+        report.append({
+            'train_range': (w[0], w[1]), 'test_range': (w[1], w[2]),
+            'params': params, 'train_score': score, 'test': summarize(trades)
+        })
+
+    all_trades = np.concatenate(oos) if oos else np.zeros(0, dtype=TRADE_DTYPE)
+    return {'windows': report, 'trades': all_trades, 'summary': summarize(all_trades)}
+
+
+def _mc_chunk(args):
+    r, n_sims, method, risk_frac, ruin_frac, seed = args
+    rng = np.random.default_rng(seed)
+    if method == 'shuffle':
+        samples = rng.permuted(np.tile(r, (n_sims, 1)), axis=1)
+    else:
+        samples = r[rng.integers(0, len(r), size=(n_sims, len(r)))]
+
+    equity = np.cumprod(1.0 + samples * risk_frac, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+    max_dd = (1.0 - equity / peak).max(axis=1)
+    ruined = equity.min(axis=1) <= (1.0 - ruin_frac)
+    return max_dd, ruined, equity[:, -1]
+
+
+def monte_carlo(trades, n_sims=10000, method='shuffle', risk_per_trade=None, ruin_pct=50.0,
+                workers=None, seed=None, chunk_size=1000):
+    """
+    Resamples the trade sequence to get drawdown / ruin distributions.
+
+    method: 'shuffle' (reorder the same trades) or 'bootstrap' (draw with replacement).
+    risk_per_trade: % of equity risked per 1R (default Config.RISK_PER_TRADE).
+    ruin_pct: equity loss in % that counts as ruin.
+    """
+    r = trades['r'] if getattr(trades, 'dtype', None) is not None and trades.dtype.names else np.asarray(trades, dtype=np.float64)
+    r = np.ascontiguousarray(r, dtype=np.float64)
+    if len(r) == 0:
+        return None
+    if method not in ('shuffle', 'bootstrap'):
+        raise ValueError(f"Unknown Monte Carlo method: {method}")
+
+    risk_frac = (risk_per_trade if risk_per_trade is not None else Config.RISK_PER_TRADE) / 100.0
+    workers = workers or os.cpu_count() or 1
+
+    sizes = [chunk_size] * (n_sims // chunk_size)
+    if n_sims % chunk_size:
+        sizes.append(n_sims % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(r, n, method, risk_frac, ruin_pct / 100.0, s) for n, s in zip(sizes, seeds)]
+
+    if workers == 1:
+        results = [_mc_chunk(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_mc_chunk, tasks))
+
+    max_dd = np.concatenate([x[0] for x in results]) * 100
+    ruined = np.concatenate([x[1] for x in results])
+    final = (np.concatenate([x[2] for x in results]) - 1.0) * 100
+    pct = (50, 90, 95, 99)
+    return {
+        'simulations': int(len(max_dd)),
+        'method': method,
+        'max_dd_pct': {p: float(v) for p, v in zip(pct, np.percentile(max_dd, pct))},
+        'return_pct': {p: float(v) for p, v in zip((5, 50, 95), np.percentile(final, (5, 50, 95)))},
+        'ruin_probability': float(ruined.mean()),
+    }
+
+
+if __name__ == "__main__":
+    # Offline usage: python -m modules.robustness history.csv  (time,open,high,low,close)
+    import sys
+    history = pd.read_csv(sys.argv[1], parse_dates=['time'])
+    grid = {'ema_fast': [5, 9, 13], 'ema_slow': [21, 34], 'sl_mult': [1.5, 2.0, 3.0]}
+    wf = walk_forward(history, grid, train_bars=20000, test_bars=5000)
+    for w in wf['windows']:
+        print(w['test_range'], w['params'], w['test'])
+    print("Out-of-sample:", wf['summary'])
+    print("Monte Carlo:", monte_carlo(wf['trades']))
@@ -0,0 +1,156 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from config import Config
+from modules.logger import logger
+
+def _label(code):
+    # "strategy.py:get_signals" - no spaces or ';' so the collapsed format stays parseable
+    name = os.path.basename(code.co_filename).replace(" ", "_")
+    return f"{name}:{code.co_name}"
+
+class SamplingProfiler:
+    """
+    Statistical profiler for the running bot. A side thread reads the event loop
+    thread's current stack every PROFILE_INTERVAL (sys._current_frames, no
+    tracing hooks), so the trading loop and the Telegram handlers are sampled
+    at near-zero cost. Results are written in collapsed-stack format
+    ("a;b;c count" per line) for flamegraph.pl / speedscope.
+    """
+
+    def __init__(self):
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.auto = False
+        self.last_auto = None
+        self.last_result = None   # (path, summary) of the last finished session
+        self._pending = []        # finished automatic sessions waiting to be announced
+        self._thread = None
+        self._stop = threading.Event()
+        self._target = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration=None, auto=False, thread_id=None):
+        """Samples thread_id (default: the calling thread, i.e. the event loop) for up to duration seconds."""
+        if self.running:
+            return False
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = time.monotonic()
+        self.auto = auto
+        self._target = thread_id or threading.get_ident()
+        self._stop.clear()
+        duration = min(duration or Config.PROFILE_MAX_DURATION, Config.PROFILE_MAX_DURATION)
+        self._thread = threading.Thread(target=self._sample, args=(duration,), name="SamplingProfiler", daemon=True)
+        self._thread.start()
+        logger.info(f"Profiler started ({'auto' if auto else 'manual'}, up to {duration:.0f}s)")
+        return True
+
+    def stop(self):
+        """Stops sampling and writes the result. Returns (path, summary) or None if not running."""
+        if not self.running:
+            return None
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        with self._lock:
+            if self._pending:
+                # Hit its time limit just before we got here; already written
+                return self._pending.pop()
+        return self._finish()
+
+    def _sample(self, duration):
+        deadline = time.monotonic() + duration
+        while not self._stop.wait(Config.PROFILE_INTERVAL):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    stack.append(_label(frame.f_code))
+                    frame = frame.f_back
+                with self._lock:
+                    self.stacks[";".join(reversed(stack))] += 1
+                    self.samples += 1
+            if time.monotonic() >= deadline:
+                break
+        if not self._stop.is_set():
+            # Ran out of time on its own: hand the result to run() for announcing
+            result = self._finish()
+            with self._lock:
+                self._pending.append(result)
+
+    def _finish(self):
+        elapsed = time.monotonic() - self.started_at
+        path = self.write_collapsed()
+        summary = self.summary(elapsed)
+        self.last_result = (path, summary)
+        logger.info(f"Profiler stopped: {self.samples} samples in {elapsed:.1f}s -> {path}")
+        return path, summary
+
+    def write_collapsed(self):
+        path = os.path.join(Config.LOG_DIR, f"profile_{datetime.now():%Y%m%d_%H%M%S}.folded")
+        try:
+            with self._lock:
+                lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.error(f"Failed to write profile: {e}")
+            return None
+        return path
+
+    def top_functions(self, top_n=None):
+        """[(function, self_samples, total_samples)] ordered by self time."""
+        own, total = Counter(), Counter()
+        with self._lock:
+            for stack, count in self.stacks.items():
+                frames = stack.split(";")
+                own[frames[-1]] += count
+                for name in set(frames):
+                    total[name] += count
+        return [(name, n, total[name]) for name, n in own.most_common(top_n or Config.PROFILE_TOP_N)]
+
+    def summary(self, elapsed=None):
+        n = self.samples or 1
+        head = f"🔥 Profile: {self.samples} samples"
+        if elapsed is not None:
+            head += f" over {elapsed:.1f}s"
+        lines = [head, "self%  total%  function"]
+        for name, own, total in self.top_functions():
+            lines.append(f"{own / n * 100:5.1f}  {total / n * 100:6.1f}  {name}")
+        if not self.samples:
+            lines.append("(no samples)")
+        return "\n".join(lines)
+
+    def note_iteration(self, seconds):
+        """Called by the trading loop after each pass; starts an automatic session on a slow one."""
+        if not Config.PROFILE_AUTO_THRESHOLD or seconds < Config.PROFILE_AUTO_THRESHOLD or self.running:
+            return
+        now = time.monotonic()
+        if self.last_auto is not None and now - self.last_auto < Config.PROFILE_AUTO_COOLDOWN:
+            return
+        self.last_auto = now
+        logger.warning(f"Loop iteration took {seconds:.1f}s (threshold {Config.PROFILE_AUTO_THRESHOLD}s), profiling")
+        self.start(duration=Config.PROFILE_AUTO_DURATION, auto=True)
+
+    async def run(self, notify=None):
+        """Announces sessions that ended on their own (automatic ones and manual timeouts)."""
+        while True:
+            await asyncio.sleep(1)
+            with self._lock:
+                finished, self._pending = self._pending, []
+            for path, summary in finished:
+                if notify:
+                    # Code block: function names are full of Markdown characters
+                    await notify(f"```\n{summary}\n```\nSaved: {path}")
+
+sampling_profiler = SamplingProfiler()
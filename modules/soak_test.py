@@ -0,0 +1,496 @@
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from types import SimpleNamespace
+import numpy as np
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None
+from config import Config
+from modules.logger import logger
+from modules.mem_profiler import get_rss_mb
+from modules.clock import clock, SimulatedTime
+
+# Same values as the MetaTrader5 package
+TF_CONSTANTS = {"M1": 1, "M5": 5, "M15": 15, "M30": 30, "H1": 16385, "H4": 16388, "D1": 16408}
+TF_SECONDS = {1: 60, 5: 300, 15: 900, 30: 1800, 16385: 3600, 16388: 14400, 16408: 86400}
+HISTORY_BARS = 600  # bars of history before the simulated start, per timeframe
+
+RATE_DTYPE = np.dtype([('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+                       ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')])
+
+SymbolInfo = namedtuple('SymbolInfo', 'name point digits spread ask bid filling_mode visible trade_contract_size')
+Tick = namedtuple('Tick', 'time bid ask last volume')
+Position = namedtuple('Position', 'ticket time symbol type volume price_open price_current sl tp profit magic comment')
+OrderResult = namedtuple('OrderResult', 'retcode deal order volume price bid ask comment request_id')
+AccountInfo = namedtuple('AccountInfo', 'login balance equity margin margin_free leverage currency')
+TerminalInfo = namedtuple('TerminalInfo', 'connected trade_allowed name')
+Deal = namedtuple('Deal', 'ticket order time type entry magic position_id reason volume price '
+                          'commission swap profit symbol comment')
+
+# Pass/fail budget per run (any N); override from the command line
+DEFAULT_BUDGET = {
+    'iter_p95_ms': 2000.0,     # a full pass must fit comfortably in the 10 s loop interval
+    'latency_p95_ms': 1000.0,  # M1 data fetched -> order sent for that symbol
+    'lag_p99_ms': 1000.0,      # how long Telegram handlers can be stuck behind the loop
+    'rss_growth_mb': 100.0,    # start -> end of the run
+}
+
+
+class SyntheticTerminal:
+    """
+    Stand-in for the MetaTrader5 module serving random-walk bars for any
+    number of symbols on a simulated clock. Orders open positions that close
+    when the M1 bar touches SL or TP.
+    """
+
+    def __init__(self, symbols, start, sim_seconds, seed=0):
+        for name, value in TF_CONSTANTS.items():
+            setattr(self, f"TIMEFRAME_{name}", value)
+        self.ORDER_TYPE_BUY, self.ORDER_TYPE_SELL = 0, 1
+        self.ORDER_FILLING_FOK, self.ORDER_FILLING_IOC = 0, 1
+        self.TRADE_ACTION_DEAL, self.TRADE_ACTION_SLTP = 1, 6
+        self.ORDER_TIME_GTC = 0
+        self.TRADE_RETCODE_DONE = 10009
+
+        self.symbols = list(symbols)
+        self.start = start - start % 86400
+        self.clock = SimulatedTime(self.start)
+        self.end = self.start + sim_seconds
+        self.seed = seed
+        self.balance = 10000.0
+        self.positions = {}
+        self.deals = {}         # position ticket -> [Deal] (in and out)
+        self.next_ticket = 1
+        self.series = {}        # (symbol, tf) -> rates covering history + the whole run
+        self.m1_fetched = {}    # symbol -> perf_counter of the last M1 fetch
+        self.order_latency = []  # seconds from M1 fetch to order_send, per order
+        self.calls = 0
+
+    # --- clock ---
+
+    @property
+    def now(self):
+        return self.clock.now
+
+    def time(self):
+        return self.clock.time()
+
+    def advance(self, seconds):
+        self.clock.advance(seconds)
+
+    # --- market data ---
+
+    def _series(self, symbol, tf):
+        key = (symbol, tf)
+        rates = self.series.get(key)
+        if rates is None:
+            step = TF_SECONDS[tf]
+            n = HISTORY_BARS + int(math.ceil((self.end - self.start) / step)) + 2
+            rng = np.random.default_rng([self.seed, self.symbols.index(symbol) if symbol in self.symbols else 0, tf])
+            base = 1.0 + rng.random()
+            vol = 0.0002 * math.sqrt(step / 60)
+            # Slow drift regimes so the EMAs actually trend and cross
+            drift = np.repeat(rng.normal(0, vol * 0.3, n // 50 + 1), 50)[:n]
+            close = base + np.cumsum(rng.normal(0, vol, n) + drift)
+            rates = np.zeros(n, dtype=RATE_DTYPE)
+            rates['time'] = self.start - HISTORY_BARS * step + np.arange(n) * step
+            rates['open'] = np.r_[close[0], close[:-1]]
+            rates['close'] = close
+            wick = np.abs(rng.normal(0, vol * 0.5, (2, n)))
+            rates['high'] = np.maximum(rates['open'], close) + wick[0]
+            rates['low'] = np.minimum(rates['open'], close) - wick[1]
+            rates['tick_volume'] = rng.integers(10, 500, n)
+            rates['spread'] = 10
+            self.series[key] = rates
+        return rates
+
+    def _visible(self, symbol, tf):
+        """Index one past the bar that contains `now`."""
+        rates = self._series(symbol, tf)
+        return min(int((self.now - rates['time'][0]) // TF_SECONDS[tf]) + 1, len(rates))
+
+    def _bar(self, symbol):
+        rates = self._series(symbol, self.TIMEFRAME_M1)
+        return rates[self._visible(symbol, self.TIMEFRAME_M1) - 1]
+
+    def copy_rates_from_pos(self, symbol, tf, start_pos, count):
+        self.calls += 1
+        if tf == self.TIMEFRAME_M1:
+            self.m1_fetched[symbol] = time.perf_counter()
+        end = self._visible(symbol, tf) - start_pos
+        return self._series(symbol, tf)[max(0, end - count):end].copy()
+
+    def symbol_info(self, symbol):
+        self.calls += 1
+        bid = float(self._bar(symbol)['close'])
+        return SymbolInfo(symbol, 0.00001, 5, 10, bid + 0.0001, bid, 2, True, 100000)
+
+    def symbol_info_tick(self, symbol):
+        bid = float(self._bar(symbol)['close'])
+        return Tick(int(self.now), bid, bid + 0.0001, bid, 1)
+
+    def symbol_select(self, symbol, enable=True):
+        return True
+
+    # --- trading ---
+
+    def _mark(self):
+        """Revalues positions on the current M1 bar and closes the ones that hit SL/TP."""
+        for ticket, p in list(self.positions.items()):
+            bar = self._bar(p['symbol'])
+            buy = p['type'] == 0
+            hit = None
+            if p['sl'] and ((buy and bar['low'] <= p['sl']) or (not buy and bar['high'] >= p['sl'])):
+                hit = p['sl']
+            elif p['tp'] and ((buy and bar['high'] >= p['tp']) or (not buy and bar['low'] <= p['tp'])):
+                hit = p['tp']
+            price = hit if hit is not None else float(bar['close'])
+            p['price_current'] = price
+            p['profit'] = (price - p['price_open']) * (1 if buy else -1) * p['volume'] * 100000
+            if hit is not None:
+                self.balance += p['profit']
+                del self.positions[ticket]
+                self.deals[ticket].append(Deal(
+                    ticket * 2 + 1, ticket, int(self.now), 1 - p['type'], 1, p['magic'], ticket,
+                    4 if hit == p['sl'] else 5, p['volume'], hit, 0.0, 0.0, p['profit'], p['symbol'], ""))
+
+    def positions_get(self, *args, **kwargs):
+        self.calls += 1
+        self._mark()
+        return tuple(Position(**p) for p in self.positions.values())
+
+    def order_send(self, request):
+        self.calls += 1
+        symbol = request.get('symbol')
+        if request['action'] == self.TRADE_ACTION_SLTP:
+            p = self.positions.get(request['position'])
+            if p is None:
+                return OrderResult(10013, 0, 0, 0.0, 0.0, 0.0, 0.0, "Invalid request", 0)
+            p['sl'], p['tp'] = request['sl'], request['tp']
+            return OrderResult(self.TRADE_RETCODE_DONE, 0, 0, 0.0, 0.0, 0.0, 0.0, "Done", 0)
+
+        if symbol in self.m1_fetched:
+            self.order_latency.append(time.perf_counter() - self.m1_fetched[symbol])
+        ticket = self.next_ticket
+        self.next_ticket += 1
+        self.positions[ticket] = {
+            'ticket': ticket, 'time': int(self.now), 'symbol': symbol, 'type': request['type'],
+            'volume': request['volume'], 'price_open': request['price'], 'price_current': request['price'],
+            'sl': request['sl'], 'tp': request['tp'], 'profit': 0.0, 'magic': request['magic'],
+            'comment': request.get('comment', ''),
+        }
+        self.deals[ticket] = [Deal(ticket * 2, ticket, int(self.now), request['type'], 0, request['magic'],
+                                   ticket, 3, request['volume'], request['price'], 0.0, 0.0, 0.0, symbol, "")]
+        return OrderResult(self.TRADE_RETCODE_DONE, ticket, ticket, request['volume'], request['price'],
+                           request['price'], request['price'], "Done", 0)
+
+    def account_info(self):
+        self.calls += 1
+        self._mark()
+        equity = self.balance + sum(p['profit'] for p in self.positions.values())
+        return AccountInfo(1, self.balance, equity, 0.0, equity, 100, "USD")
+
+    def history_deals_get(self, *args, position=None, **kwargs):
+        if position is not None:
+            return tuple(self.deals.get(position, ()))
+        return tuple(d for deals in self.deals.values() for d in deals)
+
+    # --- session ---
+
+    def initialize(self, *args, **kwargs):
+        return True
+
+    def login(self, *args, **kwargs):
+        return True
+
+    def shutdown(self):
+        pass
+
+    def last_error(self):
+        return (1, "Success")
+
+    def terminal_info(self):
+        return TerminalInfo(True, True, "Synthetic")
+
+
+def _percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else 0.0
+
+
+def _install(terminal):
+    """Points the bot's singletons at `terminal` with fresh state. Returns what _restore() needs."""
+    import main
+    from modules.mt5_interface import mt5_interface
+    from modules.risk_manager import risk_manager
+    from modules.telegram_bot import telegram_bot
+    from modules.execution_stats import execution_stats
+    from modules.zone_index import zone_index
+    from modules.position_tracker import position_tracker
+    from modules.strategy import strategy
+    from modules.market_analysis import market_analyzer
+    from modules.correlation import correlation_monitor
+
+    saved = (Config.SYMBOL_LIST, main.asyncio, clock.source, risk_manager.max_trades_per_day,
+             risk_manager._is_trading_session, execution_stats.path)
+    Config.SYMBOL_LIST = terminal.symbols
+    mt5_interface.set_backend(terminal)
+    mt5_interface.connected = False
+    telegram_bot.trading_enabled = True
+    risk_manager.trades_today = risk_manager.closed_today = 0
+    risk_manager.realized_pnl_today = risk_manager.daily_start_balance = 0.0
+    risk_manager.day = None
+    market_analyzer.last_report_time = 0
+    correlation_monitor.reset()
+    execution_stats.path = os.devnull
+    for cache in (zone_index.zones, zone_index._last_bar, zone_index._last_check, strategy._memo,
+                  position_tracker.positions, position_tracker.by_symbol, main.break_even_pending,
+                  strategy.signal_bars):
+        cache.clear()
+    for callback in (main.track_break_even, risk_manager.on_position_event):
+        if callback not in position_tracker.subscribers:
+            position_tracker.subscribe(callback)
+    return saved
+
+
+def _restore(saved):
+    import main
+    from modules.risk_manager import risk_manager
+    from modules.execution_stats import execution_stats
+    (Config.SYMBOL_LIST, main.asyncio, clock.source, risk_manager.max_trades_per_day,
+     risk_manager._is_trading_session, execution_stats.path) = saved
+
+
+async def run_soak(n_symbols, sim_hours, seed=0):
+    """
+    Runs the unmodified trading_loop (Strategy, MarketAnalyzer, RiskManager,
+    zone index) against n_symbols synthetic instruments for sim_hours of
+    simulated time, as fast as the code allows. Returns a metrics dict.
+    """
+    import main
+    from modules.risk_manager import risk_manager
+
+    symbols = [f"SYN{i:03d}" for i in range(n_symbols)]
+    terminal = SyntheticTerminal(symbols, time.time(), sim_hours * 3600, seed)
+    saved = _install(terminal)
+    risk_manager.max_trades_per_day = 10 ** 9  # measure the loop, not the daily cap
+    risk_manager._is_trading_session = lambda: True
+
+    iterations = []
+    lag = []
+    real_sleep = asyncio.sleep
+    last_wake = [time.perf_counter()]
+
+    async def sim_sleep(delay, result=None):
+        # Every sleep in trading_loop ends a pass: record it, then jump the clock
+        iterations.append(time.perf_counter() - last_wake[0])
+        terminal.advance(delay)
+        await real_sleep(0)
+        last_wake[0] = time.perf_counter()
+        return result
+
+    # The bot decides on the simulated clock; trading_loop's sleeps are hooked to
+    # time each pass, everything else on the loop (the lag probe) keeps real time
+    clock.set_source(terminal.clock)
+    main.asyncio = SimpleNamespace(sleep=sim_sleep)
+
+    async def lag_probe():
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + 0.01
+            await real_sleep(0.01)
+            lag.append(max(0.0, loop.time() - expected))
+
+    rss_start = get_rss_mb()
+    rss_peak = rss_start or 0.0
+    started = time.perf_counter()
+    task = asyncio.create_task(main.trading_loop())
+    probe = asyncio.create_task(lag_probe())
+    try:
+        while terminal.now < terminal.end and not task.done():
+            await real_sleep(0.05)
+            rss_peak = max(rss_peak, get_rss_mb() or 0.0)
+    finally:
+        for t in (task, probe):
+            t.cancel()
+        for t in (task, probe):
+            try:
+                await t
+            except (asyncio.CancelledError, Exception):
+                pass
+        _restore(saved)
+
+    rss_end = get_rss_mb()
+    iter_ms = np.array(iterations[1:] or iterations) * 1000  # first pass includes warm-up
+    latency_ms = np.array(terminal.order_latency) * 1000
+    lag_ms = np.array(lag) * 1000
+    return {
+        'symbols': n_symbols,
+        'sim_hours': sim_hours,
+        'wall_s': round(time.perf_counter() - started, 2),
+        'iterations': len(iterations),
+        'iter_p50_ms': _percentile(iter_ms, 50),
+        'iter_p95_ms': _percentile(iter_ms, 95),
+        'iter_max_ms': float(iter_ms.max()) if len(iter_ms) else 0.0,
+        'orders': len(terminal.order_latency),
+        'latency_p50_ms': _percentile(latency_ms, 50),
+        'latency_p95_ms': _percentile(latency_ms, 95),
+        'lag_p99_ms': _percentile(lag_ms, 99),
+        'lag_max_ms': float(lag_ms.max()) if len(lag_ms) else 0.0,
+        'rss_start_mb': rss_start,
+        'rss_end_mb': rss_end,
+        'rss_peak_mb': rss_peak,
+        'rss_growth_mb': (rss_end - rss_start) if rss_start and rss_end else 0.0,
+        'terminal_calls': terminal.calls,
+    }
+
+
+def run_fast_forward(n_symbols, days, seed=0):
+    """
+    Runs the unmodified trading_loop for `days` of simulated time on a
+    VirtualTimeEventLoop sharing the terminal's clock. Every sleep jumps the
+    clock, so only the bot's own work costs wall time, and the session window,
+    daily limits and report schedule apply exactly as they would live.
+    Returns a summary dict.
+    """
+    import main
+    from modules.risk_manager import risk_manager
+    from modules.position_tracker import position_tracker
+
+    symbols = [f"SYN{i:03d}" for i in range(n_symbols)]
+    terminal = SyntheticTerminal(symbols, time.time(), days * 86400, seed)
+    saved = _install(terminal)
+    closed = []
+
+    def on_close(event):
+        if event.kind == 'closed' and event.close:
+            closed.append(event.close['profit'])
+
+    position_tracker.subscribe(on_close)
+    started = time.perf_counter()
+    try:
+        clock.run_simulated(main.trading_loop(), terminal.clock, days * 86400)
+    finally:
+        position_tracker.subscribers.remove(on_close)
+        _restore(saved)
+
+    return {
+        'symbols': n_symbols,
+        'sim_days': days,
+        'wall_s': round(time.perf_counter() - started, 2),
+        'orders': terminal.next_ticket - 1,
+        'closed': len(closed),
+        'wins': sum(p > 0 for p in closed),
+        'net': round(sum(closed), 2),
+        'balance': round(terminal.balance, 2),
+        'open': len(terminal.positions),
+        'trades_today': risk_manager.trades_today,
+        'terminal_calls': terminal.calls,
+    }
+
+
+def check_budget(result, budget):
+    """Names of the budget lines this run broke (empty = pass)."""
+    return [f"{key} {result[key]:.1f} > {limit:.1f}" for key, limit in budget.items() if result[key] > limit]
+
+
+def write_outputs(results, budget, out_dir):
+    """CSV of all runs plus a scaling chart (PNG if matplotlib is installed). Returns the paths."""
+    csv_path = os.path.join(out_dir, "soak_scaling.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0]) + ['passed'])
+        writer.writeheader()
+        for r in results:
+            writer.writerow({**r, 'passed': not check_budget(r, budget)})
+    paths = [csv_path]
+
+    if plt is not None:
+        n = [r['symbols'] for r in results]
+        fig, axes = plt.subplots(2, 2, figsize=(10, 7))
+        for ax, key, title in zip(axes.flat,
+                                  ('iter_p95_ms', 'latency_p95_ms', 'lag_p99_ms', 'rss_growth_mb'),
+                                  ('Iteration p95 (ms)', 'Signal->order p95 (ms)', 'Loop lag p99 (ms)', 'RSS growth (MB)')):
+            ax.plot(n, [r[key] for r in results], marker='o')
+            ax.axhline(budget[key], color='red', linestyle='--', label='budget')
+            ax.set_xscale('log')
+            ax.set_xlabel('symbols')
+            ax.set_title(title)
+            ax.legend()
+        fig.tight_layout()
+        png_path = os.path.join(out_dir, "soak_scaling.png")
+        fig.savefig(png_path)
+        plt.close(fig)
+        paths.append(png_path)
+    return paths
+
+
+def format_table(results, budget):
+    lines = [f"{'N':>5} {'iters':>6} {'iter p50/p95 ms':>17} {'sig->ord p95':>12} {'lag p99':>8} {'RSS +MB':>8}  result"]
+    for r in results:
+        failures = check_budget(r, budget)
+        lines.append(f"{r['symbols']:>5} {r['iterations']:>6} {r['iter_p50_ms']:>8.0f}/{r['iter_p95_ms']:<8.0f}"
+                     f"{r['latency_p95_ms']:>12.0f} {r['lag_p99_ms']:>8.0f} {r['rss_growth_mb']:>8.1f}  "
+                     + ("PASS" if not failures else "FAIL: " + "; ".join(failures)))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    # python -m modules.soak_test --symbols 10,50,200 --hours 4
+    parser = argparse.ArgumentParser(description="Synthetic-universe scaling soak test")
+    parser.add_argument("--symbols", default="10,50,200", help="comma separated universe sizes")
+    parser.add_argument("--hours", type=float, default=4.0, help="simulated hours per run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=Config.LOG_DIR)
+    parser.add_argument("--verbose", action="store_true", help="keep INFO logging (slower, fills bot.log)")
+    parser.add_argument("--fast-forward", type=float, metavar="DAYS",
+                        help="instead of the scaling runs: simulate DAYS of live trading (first --symbols size)")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)  # child process: one N, JSON on stdout
+    for key, value in DEFAULT_BUDGET.items():
+        parser.add_argument(f"--max-{key.replace('_', '-')}", dest=key, type=float, default=value)
+    args = parser.parse_args(argv)
+    budget = {key: getattr(args, key) for key in DEFAULT_BUDGET}
+
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+
+    if args.fast_forward:
+        n = int(args.symbols.split(",")[0])
+        print(json.dumps(run_fast_forward(n, args.fast_forward, args.seed), indent=2))
+        return 0
+
+    if args.single:
+        print(json.dumps(asyncio.run(run_soak(args.single, args.hours, args.seed))))
+        return 0
+
+    # One process per N, so RSS and caches of one run don't leak into the next
+    results = []
+    for n in (int(s) for s in args.symbols.split(",")):
+        cmd = [sys.executable, "-m", "modules.soak_test", "--single", str(n),
+               "--hours", str(args.hours), "--seed", str(args.seed)] + (["--verbose"] if args.verbose else [])
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            return 2
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        print(format_table(results[-1:], budget).splitlines()[-1], flush=True)
+
+    os.makedirs(args.out, exist_ok=True)
+    paths = write_outputs(results, budget, args.out)
+    print("\n" + format_table(results, budget))
+    print("\nWritten: " + ", ".join(paths) + ("" if plt else " (install matplotlib for the PNG chart)"))
+    return 0 if all(not check_budget(r, budget) for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+from config import Config
+from modules.logger import logger
+from modules.clock import clock
+
+STATE_VERSION = 2
+
+def market_fingerprint():
+    """Settings the signal memo and zones were computed with; a change invalidates them.
+    Lists only, so it compares equal after a JSON round trip."""
+    return {
+        'symbols': list(Config.SYMBOL_LIST),
+        'ltf': Config.TIMEFRAME_LTF,
+        'htf': Config.TIMEFRAME_HTF,
+        'signal_mode': Config.SIGNAL_MODE,
+        'indicators': [Config.EMA_FAST, Config.EMA_SLOW, Config.RSI_PERIOD, Config.ATR_PERIOD],
+        'zones': [[[tf, n] for tf, n in sorted(Config.ZONE_TIMEFRAMES.items())],
+                  Config.ZONE_PIVOT_LOOKBACK, Config.ZONE_WIDTH_ATR],
+    }
+
+
+class StateStore:
+    """
+    Warm-start snapshot: risk counters, the trading toggle, the report schedule,
+    the strategy's closed-bar memo (with which bars were already journaled and
+    traded) and the S/R zone index, written as versioned
+    JSON every STATE_SAVE_INTERVAL and on shutdown, and restored at boot so the
+    bot does not start the day over or rebuild zones from scratch.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or Config.STATE_PATH
+        self.last_saved = None
+
+    def collect(self):
+        from modules.risk_manager import risk_manager
+        from modules.telegram_bot import telegram_bot
+        from modules.market_analysis import market_analyzer
+        from modules.strategy import strategy
+        from modules.zone_index import zone_index
+        return {
+            'version': STATE_VERSION,
+            'saved_at': clock.time(),
+            'fingerprint': market_fingerprint(),
+            'trading_enabled': telegram_bot.trading_enabled,
+            'last_report_time': market_analyzer.last_report_time,
+            'risk': risk_manager.export_state(),
+            'signal_memo': strategy.export_state(),
+            'zones': zone_index.export_state(),
+        }
+
+    def write(self, state):
+        """Atomic replace, so a crash mid-write leaves the previous snapshot intact."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def save(self):
+        try:
+            self.write(self.collect())
+        except Exception as e:
+            logger.error(f"State snapshot failed: {e}")
+            return False
+        self.last_saved = clock.time()
+        return True
+
+    def load(self):
+        """The snapshot if it exists, parses, has this version and is recent enough; else None."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"State snapshot unreadable, starting cold: {e}")
+            return None
+        if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+            logger.warning(f"State snapshot version {state.get('version') if isinstance(state, dict) else '?'} "
+                           f"!= {STATE_VERSION}, starting cold")
+            return None
+        age = clock.time() - state.get('saved_at', 0)
+        if age > Config.STATE_MAX_AGE:
+            logger.info(f"State snapshot is {age / 3600:.1f}h old, starting cold")
+            return None
+        return state
+
+    def restore(self):
+        """Applies the snapshot to the live singletons. Returns the restored section names."""
+        from modules.risk_manager import risk_manager
+        from modules.telegram_bot import telegram_bot
+        from modules.market_analysis import market_analyzer
+        from modules.strategy import strategy
+        from modules.zone_index import zone_index
+
+        state = self.load()
+        if state is None:
+            return []
+        restored = []
+        try:
+            telegram_bot.trading_enabled = bool(state['trading_enabled'])
+            market_analyzer.last_report_time = state['last_report_time']
+            restored.append('toggles')
+            if risk_manager.load_state(state['risk']):
+                restored.append('risk')
+            # Memo and zones are only valid for the settings they were computed with
+            if state['fingerprint'] == market_fingerprint():
+                strategy.load_state(state['signal_memo'])
+                zone_index.load_state(state['zones'])
+                restored += ['signal_memo', 'zones']
+            else:
+                logger.info("Symbols or indicator settings changed since the snapshot; signals and zones start cold")
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"State snapshot invalid ({e}), partially restored: {', '.join(restored) or 'nothing'}")
+            return restored
+        logger.info(f"Warm start from {self.path}: {', '.join(restored)}")
+        return restored
+
+    async def run(self):
+        """Periodic snapshot. Collected on the loop (consistent), written off it."""
+        while True:
+            await asyncio.sleep(Config.STATE_SAVE_INTERVAL)
+            try:
+                await asyncio.to_thread(self.write, self.collect())
+                self.last_saved = clock.time()
+            except Exception as e:
+                logger.error(f"State snapshot failed: {e}")
+
+state_store = StateStore()
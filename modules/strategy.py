@@ -2,144 +2,285 @@ import pandas as pd
 import numpy as np
 from config import Config
 from modules.logger import logger
+from modules import indicators
 from modules.mt5_interface import mt5_interface
+from modules.zone_index import zone_index
+
+# Columns stacked into the symbol x feature matrix for batch evaluation
+SIGNAL_FEATURES = ('open', 'high', 'low', 'close', 'EMA_Fast', 'EMA_Slow', 'RSI', 'ATR')
+# Settings the memoized signals were computed with
+INDICATOR_SETTINGS = ('EMA_FAST', 'EMA_SLOW', 'RSI_PERIOD', 'ATR_PERIOD')
 
 class Strategy:
-    def __init__(self):
-        pass
-
-    def calculate_indicators(self, df):
-        """Adds technical indicators to the DataFrame using pure pandas."""
-        close = df['close']
-        high = df['high']
-        low = df['low']
+    def __init__(self, data_source=None):
+        # Anything with get_data/get_rates(symbol, tf, n_bars) and get_symbol_info(symbol):
+        # mt5_interface or a MarketDataBus reader
+        self.data_source = data_source or mt5_interface
+        # Closed-bar mode: symbol -> (bar time, signal dict or None) of the last evaluated bar
+        self._memo = {}
+        # Kept by the trading loop in closed-bar mode: symbol -> [bar time, signal id, traded]
+        # of the signal it journaled for that bar
+        self.signal_bars = {}
+        self.evaluations = 0
+        self.memo_hits = 0
+
+    def export_state(self):
+        """Closed-bar memo and the loop's per-bar record as plain JSON types:
+        memo: symbol -> [bar time, signal or None], signal_bars: symbol -> [bar time, signal id, traded]."""
+        memo = {}
+        for symbol, (bar_time, signal) in self._memo.items():
+            if signal is not None:
+                signal = {**signal, 'time': str(signal['time']),
+                          'indicators': {k: float(v) for k, v in signal['indicators'].items()}}
+                signal.update({k: float(signal[k]) for k in ('sl', 'tp', 'sl_pips', 'price')})
+            memo[symbol] = [bar_time, signal]
+        signal_bars = {symbol: [str(bar), signal_id, traded]
+                       for symbol, (bar, signal_id, traded) in self.signal_bars.items()}
+        return {'memo': memo, 'signal_bars': signal_bars}
+
+    def load_state(self, state):
+        memo = {}
+        for symbol, (bar_time, signal) in state['memo'].items():
+            if signal is not None:
+                signal['time'] = pd.Timestamp(signal['time'])
+                signal['indicators']['h1_trend'] = int(signal['indicators']['h1_trend'])
+            memo[symbol] = (int(bar_time), signal)
+        # Without the record a restart inside a bar would journal and trade the restored signal again
+        signal_bars = {symbol: [pd.Timestamp(bar), signal_id, bool(traded)]
+                       for symbol, (bar, signal_id, traded) in state['signal_bars'].items()}
+        self._memo = memo
+        self.signal_bars = signal_bars
+
+    def on_config_change(self, changed):
+        if self._memo and any(name in changed for name in INDICATOR_SETTINGS):
+            self._memo = {}
+            logger.info("Indicator settings changed, closed-bar signals will be re-evaluated")
+
+    def calculate_indicators(self, df, ema_fast=None, ema_slow=None):
+        """Adds technical indicators to the DataFrame using the NumPy kernels.
+        EMA periods default to Config, overrides are used by the optimizer."""
+        ema_fast = ema_fast or Config.EMA_FAST
+        ema_slow = ema_slow or Config.EMA_SLOW
+        close = df['close'].to_numpy(dtype=np.float64)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
         
         # 1. EMA
-        df['EMA_Fast'] = close.ewm(span=Config.EMA_FAST, adjust=False).mean()
-        df['EMA_Slow'] = close.ewm(span=Config.EMA_SLOW, adjust=False).mean()
+        df['EMA_Fast'] = indicators.ema(close, ema_fast)
+        df['EMA_Slow'] = indicators.ema(close, ema_slow)
         
         # 2. RSI (Wilder's Smoothing)
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0))
-        loss = (-delta.where(delta < 0, 0))
-        
-        # First regular SMA for initial values (optional but standard usually uses ewm directly or simple sma first)
-        # Using EWM with alpha=1/14 for Wilder's
-        # pandas ewm(com=period-1, adjust=False) is equivalent to Wilder's
-        period = Config.RSI_PERIOD
-        avg_gain = gain.ewm(com=period-1, min_periods=period, adjust=False).mean()
-        avg_loss = loss.ewm(com=period-1, min_periods=period, adjust=False).mean()
-        
-        rs = avg_gain / avg_loss
-        df['RSI'] = 100 - (100 / (1 + rs))
+        df['RSI'] = indicators.rsi(close, Config.RSI_PERIOD)
         
         # 3. ATR (Wilder's Smoothing)
-        prev_close = close.shift(1)
-        tr1 = high - low
-        tr2 = (high - prev_close).abs()
-        tr3 = (low - prev_close).abs()
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        
-        df['ATR'] = tr.ewm(com=Config.ATR_PERIOD-1, min_periods=Config.ATR_PERIOD, adjust=False).mean()
+        df['ATR'] = indicators.atr(high, low, close, Config.ATR_PERIOD)
         
         return df
 
-    def get_signal(self, symbol):
+    def _load_symbol(self, symbol, closed=False):
         """
-        Analyzes the market and returns a signal with MTF filtering.
+        Fetches H1 + LTF data for one symbol.
+        Returns (h1_trend, df) where h1_trend is 1 (up), -1 (down) or 0, or None if not ready.
+        closed=True drops the forming bar of both timeframes, so df ends at the last closed LTF bar.
         """
-        try:
-            # 1. Fetch HTF Data (H1) for trend confirmation
-            df_h1 = mt5_interface.get_data(symbol, "H1", n_bars=100)
-            if df_h1 is None or len(df_h1) < 50:
-                return None
-            
-            ema_h1_fast = df_h1['close'].ewm(span=Config.EMA_FAST, adjust=False).mean()
-            ema_h1_slow = df_h1['close'].ewm(span=Config.EMA_SLOW, adjust=False).mean()
-            h1_uptrend = ema_h1_fast.iloc[-1] > ema_h1_slow.iloc[-1]
-            h1_downtrend = ema_h1_fast.iloc[-1] < ema_h1_slow.iloc[-1]
-
-            # 2. Fetch LTF Data (M1)
-            df = mt5_interface.get_data(symbol, Config.TIMEFRAME_LTF, n_bars=300)
-            if df is None:
-                return None
-
-            df = self.calculate_indicators(df)
-            if df['EMA_Slow'].isnull().iloc[-1] or df['RSI'].isnull().iloc[-1]:
-                return None
-
-            current = df.iloc[-1]
-            prev = df.iloc[-2]
-            
-            signal = None
-            sl_price = 0.0
-            tp_price = 0.0
-            
-            # --- STRATEGY LOGIC ---
-            # LTF Alignment
-            ltf_uptrend = current['close'] > current['EMA_Slow']
-            ltf_downtrend = current['close'] < current['EMA_Slow']
-            
-            # Cross Logic (Fast > Slow)
-            fast_cross_up = (prev['EMA_Fast'] <= prev['EMA_Slow']) and (current['EMA_Fast'] > current['EMA_Slow'])
-            fast_cross_down = (prev['EMA_Fast'] >= prev['EMA_Slow']) and (current['EMA_Fast'] < current['EMA_Slow'])
-            
-            # Trend Strength Filter: EMA gap should be widening or at least significant
-            curr_gap = abs(current['EMA_Fast'] - current['EMA_Slow'])
-            prev_gap = abs(prev['EMA_Fast'] - prev['EMA_Slow'])
-            is_trending_strong = curr_gap > prev_gap # Gap is widening
-
-            # Overextension Filter: Don't buy/sell if price is too far from EMA_Slow
-            atr = current['ATR']
-            dist_from_ema = abs(current['close'] - current['EMA_Slow'])
-            is_overextended = dist_from_ema > (2.0 * atr)
-
-            # Candle Confirmation
-            is_bullish_candle = current['close'] > current['open']
-            is_bearish_candle = current['close'] < current['open']
-            
-            # Symbol-Specific SL Multiplier
-            # GBPUSD needs more room due to volatility
-            sl_mult = 3.5 if symbol == "GBPUSD" else 2.0
-            
-            # BUY SIGNAL
-            if (h1_uptrend and ltf_uptrend and fast_cross_up and is_trending_strong and
-                not is_overextended and is_bullish_candle and 
-                current['RSI'] > 50 and current['RSI'] < 75):
-                signal = 'BUY'
-                sl_price = current['low'] - (sl_mult * atr) 
-                risk_dist = current['close'] - sl_price
-                tp_price = current['close'] + (risk_dist * 0.7) # Faster TP for GBPUSD
-
-            # SELL SIGNAL
-            elif (h1_downtrend and ltf_downtrend and fast_cross_down and is_trending_strong and
-                  not is_overextended and is_bearish_candle and 
-                  current['RSI'] < 50 and current['RSI'] > 25):
-                signal = 'SELL'
-                sl_price = current['high'] + (sl_mult * atr)
-                risk_dist = sl_price - current['close']
-                tp_price = current['close'] - (risk_dist * 0.7) # Faster TP for GBPUSD
-
-            if signal:
-                sl_dist = abs(current['close'] - sl_price)
-                sym_info = mt5_interface.get_symbol_info(symbol)
-                point = sym_info.point if sym_info else 0.0001
-                sl_pips = sl_dist / (point * 10) 
-
-                logger.info(f"SIGNAL {signal} for {symbol} confirmed. Dist: {dist_from_ema:.5f}, ATR: {atr:.5f}, SL_Mult: {sl_mult}")
-                return {
-                    'signal': signal,
-                    'sl': sl_price,
-                    'tp': tp_price,
-                    'sl_pips': sl_pips,
-                    'price': current['close'],
-                    'time': current['time']
-                }
+        extra = 1 if closed else 0
 
+        # 1. Fetch HTF Data (H1) for trend confirmation
+        df_h1 = self.data_source.get_data(symbol, "H1", n_bars=100 + extra)
+        if df_h1 is None or len(df_h1) < 50 + extra:
             return None
+        
+        h1_close = df_h1['close'].to_numpy(dtype=np.float64)
+        if closed:
+            h1_close = h1_close[:-1]
+        ema_h1_fast = indicators.ema(h1_close, Config.EMA_FAST)
+        ema_h1_slow = indicators.ema(h1_close, Config.EMA_SLOW)
+        h1_trend = int(np.sign(ema_h1_fast[-1] - ema_h1_slow[-1]))
 
-        except Exception as e:
-            logger.error(f"Strategy Error for {symbol}: {e}")
+        # 2. Fetch LTF Data (M1)
+        df = self.data_source.get_data(symbol, Config.TIMEFRAME_LTF, n_bars=300 + extra)
+        if df is None:
             return None
+        if closed:
+            df = df.iloc[:-1].copy()
+
+        df = self.calculate_indicators(df)
+        if df['EMA_Slow'].isnull().iloc[-1] or df['RSI'].isnull().iloc[-1]:
+            return None
+        return h1_trend, df
+
+    def _last_closed_bar(self, symbol):
+        """Open time (epoch seconds) of the last closed LTF bar, from a 2-bar fetch. None if unknown."""
+        rates = self.data_source.get_rates(symbol, Config.TIMEFRAME_LTF, 2)
+        if rates is None or len(rates) < 2:
+            return None
+        return int(rates['time'][-2])
+
+    @staticmethod
+    def sl_multiplier(symbol):
+        # Symbol-Specific SL Multiplier
+        # GBPUSD needs more room due to volatility
+        return 3.5 if symbol == "GBPUSD" else 2.0
+
+    @staticmethod
+    def evaluate_batch(curr, prev, h1_trend, sl_mult):
+        """
+        Vectorized Razgon rules over a symbol x feature matrix.
+
+        curr/prev: arrays of shape (n_symbols, len(SIGNAL_FEATURES)) holding the
+        last and previous LTF rows; h1_trend: (n,) of 1/-1/0; sl_mult: (n,).
+        Returns (direction, sl, tp, dist_from_ema) arrays, direction 1=BUY, -1=SELL, 0=none.
+        """
+        c = {name: curr[:, i] for i, name in enumerate(SIGNAL_FEATURES)}
+        p = {name: prev[:, i] for i, name in enumerate(SIGNAL_FEATURES)}
+
+        # LTF Alignment
+        ltf_uptrend = c['close'] > c['EMA_Slow']
+        ltf_downtrend = c['close'] < c['EMA_Slow']
+
+        # Cross Logic (Fast > Slow)
+        fast_cross_up = (p['EMA_Fast'] <= p['EMA_Slow']) & (c['EMA_Fast'] > c['EMA_Slow'])
+        fast_cross_down = (p['EMA_Fast'] >= p['EMA_Slow']) & (c['EMA_Fast'] < c['EMA_Slow'])
+
+        # Trend Strength Filter: EMA gap should be widening
+        is_trending_strong = np.abs(c['EMA_Fast'] - c['EMA_Slow']) > np.abs(p['EMA_Fast'] - p['EMA_Slow'])
+
+        # Overextension Filter: Don't buy/sell if price is too far from EMA_Slow
+        atr = c['ATR']
+        dist_from_ema = np.abs(c['close'] - c['EMA_Slow'])
+        is_overextended = dist_from_ema > (2.0 * atr)
+
+        # Candle Confirmation
+        is_bullish_candle = c['close'] > c['open']
+        is_bearish_candle = c['close'] < c['open']
+
+        rsi = c['RSI']
+        common = is_trending_strong & ~is_overextended
+        buy = ((h1_trend > 0) & ltf_uptrend & fast_cross_up & common &
+               is_bullish_candle & (rsi > 50) & (rsi < 75))
+        sell = (~buy & (h1_trend < 0) & ltf_downtrend & fast_cross_down & common &
+                is_bearish_candle & (rsi < 50) & (rsi > 25))
+
+        direction = buy.astype(np.int8) - sell.astype(np.int8)
+
+        sl = np.where(buy, c['low'] - sl_mult * atr, np.where(sell, c['high'] + sl_mult * atr, 0.0))
+        risk_dist = np.where(buy, c['close'] - sl, sl - c['close'])
+        tp = np.where(buy, c['close'] + risk_dist * 0.7, np.where(sell, c['close'] - risk_dist * 0.7, 0.0))
+        return direction, sl, tp, dist_from_ema
+
+    def get_signals(self, symbols):
+        """
+        Evaluates the whole universe in one vectorized pass.
+        Returns {symbol: signal_dict} for symbols that produced a signal.
+
+        SIGNAL_MODE "closed" evaluates the last closed LTF bar once and replays the
+        memoized result until the next bar closes; "forming" re-evaluates the
+        still-forming bar on every call.
+        """
+        if Config.SIGNAL_MODE != "closed":
+            return self._evaluate(symbols)[0]
+
+        signals, stale = {}, []
+        for symbol in symbols:
+            try:
+                bar_time = self._last_closed_bar(symbol)
+            except Exception as e:
+                logger.error(f"Strategy Error for {symbol}: {e}")
+                continue
+            memo = self._memo.get(symbol)
+            if bar_time is not None and memo is not None and memo[0] == bar_time:
+                self.memo_hits += 1
+                if memo[1] is not None:
+                    signals[symbol] = memo[1]
+            else:
+                stale.append(symbol)
+
+        fresh, bar_times = self._evaluate(stale, closed=True)
+        for symbol, bar_time in bar_times.items():
+            self._memo[symbol] = (bar_time, fresh.get(symbol))
+        signals.update(fresh)
+        return signals
+
+    def _evaluate(self, symbols, closed=False):
+        """
+        Loads and evaluates symbols. Returns (signals, bar_times) where bar_times
+        maps every symbol that was evaluated to the open time of its last bar.
+        """
+        names, frames, trends = [], [], []
+        for symbol in symbols:
+            try:
+                loaded = self._load_symbol(symbol, closed)
+            except Exception as e:
+                logger.error(f"Strategy Error for {symbol}: {e}")
+                continue
+            if loaded is None:
+                continue
+            names.append(symbol)
+            trends.append(loaded[0])
+            frames.append(loaded[1])
+
+        if not names:
+            return {}, {}
+        self.evaluations += len(names)
+        bar_times = {symbol: int(df['time'].iloc[-1].timestamp()) for symbol, df in zip(names, frames)}
+
+        try:
+            # symbol x 2 x feature
+            stacked = np.stack([df[list(SIGNAL_FEATURES)].to_numpy(dtype=np.float64)[-2:] for df in frames])
+            sl_mult = np.array([self.sl_multiplier(s) for s in names])
+            direction, sl, tp, dist = self.evaluate_batch(
+                stacked[:, 1], stacked[:, 0], np.array(trends), sl_mult)
+        except Exception as e:
+            logger.error(f"Strategy batch evaluation error: {e}")
+            return {}, {}
+
+        signals = {}
+        close_idx = SIGNAL_FEATURES.index('close')
+        atr_idx = SIGNAL_FEATURES.index('ATR')
+        for i in np.flatnonzero(direction):
+            symbol = names[i]
+            signal = 'BUY' if direction[i] > 0 else 'SELL'
+            price = stacked[i, 1, close_idx]
+            atr = stacked[i, 1, atr_idx]
+
+            if Config.ZONE_FILTER:
+                zones = zone_index.get(symbol)
+                if zones is not None and zones.blocks(signal, price):
+                    logger.info(f"SIGNAL {signal} for {symbol} skipped: S/R zone within {Config.ZONE_NEAR_ATR} ATR")
+                    continue
+
+            sl_dist = abs(price - sl[i])
+            try:
+                sym_info = self.data_source.get_symbol_info(symbol)
+            except Exception as e:
+                logger.error(f"Symbol info for {symbol} unavailable: {e}")
+                sym_info = None
+            point = sym_info.point if sym_info else 0.0001
+            sl_pips = sl_dist / (point * 10) 
+
+            logger.info(f"SIGNAL {signal} for {symbol} confirmed. Dist: {dist[i]:.5f}, ATR: {atr:.5f}, SL_Mult: {sl_mult[i]}")
+            signals[symbol] = {
+                'signal': signal,
+                'sl': sl[i],
+                'tp': tp[i],
+                'sl_pips': sl_pips,
+                'price': price,
+                'time': frames[i]['time'].iloc[-1],
+                # Snapshot for the trade journal
+                'indicators': {
+                    'ema_fast': stacked[i, 1, SIGNAL_FEATURES.index('EMA_Fast')],
+                    'ema_slow': stacked[i, 1, SIGNAL_FEATURES.index('EMA_Slow')],
+                    'rsi': stacked[i, 1, SIGNAL_FEATURES.index('RSI')],
+                    'atr': atr,
+                    'h1_trend': int(trends[i]),
+                },
+            }
+        return signals, bar_times
+
+    def get_signal(self, symbol):
+        """
+        Analyzes the market and returns a signal with MTF filtering.
+        """
+        return self.get_signals([symbol]).get(symbol)
 
 strategy = Strategy()
@@ -5,6 +5,7 @@ from config import Config
 from modules.logger import logger
 from modules.risk_manager import risk_manager
 from modules.mt5_interface import mt5_interface
+from modules.webhook_server import WebhookServer
 
 class TelegramBot:
     def __init__(self):
@@ -12,6 +13,30 @@ class TelegramBot:
         self.bot_running = False
         self.trading_enabled = False # Controlled via /on /off
         self.chat_id = Config.TELEGRAM_CHAT_ID
+        self.webhook_server = None
+
+    def on_config_change(self, changed):
+        if 'TELEGRAM_CHAT_ID' in changed:
+            self.chat_id = Config.TELEGRAM_CHAT_ID
+
+    def on_position_event(self, event):
+        """Position tracker subscriber: reports closed trades (TP, SL, manual...)."""
+        if event.kind != 'closed':
+            return
+        p = event.position
+        side = "BUY" if p.type == 0 else "SELL"
+        if event.close:
+            icon = "✅" if event.close['profit'] >= 0 else "❌"
+            text = (f"{icon} *Trade Closed ({event.close['reason']})*\n"
+                    f"Symbol: {event.symbol} {side} {p.volume}\n"
+                    f"Open: {p.price_open} → Close: {event.close['price']}\n"
+                    f"Profit: {event.close['profit']:.2f}")
+        else:
+            text = f"ℹ️ *Trade Closed*\nSymbol: {event.symbol} {side} {p.volume} (#{event.ticket})"
+        try:
+            asyncio.get_running_loop().create_task(self.send_message(text))
+        except RuntimeError:
+            logger.info(f"Not sending close notification outside the event loop: {event.symbol} #{event.ticket}")
 
     async def get_main_menu(self):
         keyboard = [
@@ -49,12 +74,12 @@ class TelegramBot:
         text = ""
         
         if data == 'cmd_on':
-            self.trading_enabled = True
+            self.set_trading(True)
             logger.info("User enabled trading via UI")
             text = "✅ Bot Ishga tushdi (Trading Enabled)"
             
         elif data == 'cmd_off':
-            self.trading_enabled = False
+            self.set_trading(False)
             logger.info("User disabled trading via UI")
             text = "⛔ Bot To'xtatildi (Trading Disabled)"
 
@@ -94,12 +119,18 @@ class TelegramBot:
                 logger.error(f"Button Callback Error: {e}")
                 await query.answer("Xatolik bo'ldi")
 
+    def set_trading(self, enabled):
+        """Global switch; snapshotted right away so a crash cannot undo an /off."""
+        from modules.state_store import state_store
+        self.trading_enabled = enabled
+        state_store.save()
+
     async def on_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        self.trading_enabled = True
+        self.set_trading(True)
         await update.message.reply_text("✅ Trading ENABLED")
 
     async def off_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        self.trading_enabled = False
+        self.set_trading(False)
         await update.message.reply_text("⛔ Trading DISABLED")
 
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -112,7 +143,8 @@ class TelegramBot:
             f"📊 *Status*: {status}\n"
             f"💰 *Balance*: {bal}\n"
             f"📉 *Equity*: {eq}\n"
-            f"🎲 *Trades Today*: {risk_manager.trades_today}/{risk_manager.max_trades_per_day}",
+            f"🎲 *Trades Today*: {risk_manager.trades_today}/{risk_manager.max_trades_per_day}\n"
+            f"🏁 *Closed Today*: {risk_manager.closed_today} ({risk_manager.realized_pnl_today:+.2f})",
             parse_mode='Markdown'
         )
 
@@ -164,6 +196,87 @@ class TelegramBot:
         else:
             await update.message.reply_text("❌ Analysis failed or no data.")
 
+    async def lag_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Event loop lag percentiles from the watchdog."""
+        from modules.watchdog import loop_watchdog
+        await update.message.reply_text(loop_watchdog.format_stats(), parse_mode='Markdown')
+
+    async def exec_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Per-symbol order latency / slippage percentiles."""
+        from modules.execution_stats import execution_stats
+        await update.message.reply_text(execution_stats.format_report(), parse_mode='Markdown')
+
+    async def conn_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """MT5 connection uptime and reconnect statistics."""
+        from modules.connection_manager import connection_manager
+        await update.message.reply_text(connection_manager.format_stats(), parse_mode='Markdown')
+
+    async def mem_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """/mem [start|stop] - memory report (RSS, GC, top allocation sites, diff)."""
+        from modules.mem_profiler import memory_monitor
+        action = context.args[0].lower() if context.args else ""
+        if action == "start":
+            memory_monitor.start()
+        elif action == "stop":
+            memory_monitor.stop()
+            await update.message.reply_text("🧠 tracemalloc stopped")
+            return
+
+        # Snapshot and diff take seconds on a big heap: keep them off the event loop
+        text = await asyncio.to_thread(memory_monitor.report)
+        path = await asyncio.to_thread(memory_monitor.write_report, text)
+        # Plain text: file names and code locations are full of Markdown characters
+        await update.message.reply_text(f"{text[:3800]}\n\nSaved: {path}")
+
+    async def profile_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """/profile start [SECONDS] | stop - sampling profiler over the event loop."""
+        from modules.sampling_profiler import sampling_profiler
+        action = context.args[0].lower() if context.args else ""
+        if action == "start":
+            try:
+                seconds = float(context.args[1]) if len(context.args) > 1 else None
+                if seconds is not None and seconds <= 0:
+                    raise ValueError
+            except ValueError:
+                await update.message.reply_text("Usage: /profile start [SECONDS] | stop")
+                return
+            if sampling_profiler.start(duration=seconds):
+                await update.message.reply_text("🔥 Profiler started. /profile stop for the summary.")
+            else:
+                await update.message.reply_text("🔥 Profiler is already running.")
+            return
+        if action == "stop":
+            result = sampling_profiler.stop()
+            if result is None:
+                await update.message.reply_text("🔥 Profiler is not running.")
+                return
+            path, summary = result
+            # Plain text: function names are full of Markdown characters
+            await update.message.reply_text(f"{summary[:3800]}\n\nSaved: {path}")
+            return
+
+        state = "running" if sampling_profiler.running else "idle"
+        await update.message.reply_text(f"🔥 Profiler {state}. Usage: /profile start [SECONDS] | stop")
+
+    async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """/stats [SYMBOL] [DAYS] - win rate / net / profit factor from the trade journal."""
+        from modules.trade_journal import trade_journal
+        symbol, days = None, 7
+        for arg in context.args or []:
+            if arg.isdigit():
+                days = int(arg)
+            else:
+                symbol = arg.upper()
+        text = await asyncio.to_thread(trade_journal.format_stats, symbol, days)
+        await update.message.reply_text(text, parse_mode='Markdown')
+
+    async def trades_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """/trades [N] - last N closed positions from the trade journal."""
+        from modules.trade_journal import trade_journal
+        limit = int(context.args[0]) if context.args and context.args[0].isdigit() else 10
+        text = await asyncio.to_thread(trade_journal.format_recent, min(limit, 50))
+        await update.message.reply_text(text, parse_mode='Markdown')
+
     async def send_message(self, text):
         """Sends a message to the configured chat ID."""
         if not self.application:
@@ -179,13 +292,52 @@ class TelegramBot:
         except Exception as e:
             logger.error(f"Failed to send Telegram msg: {e}")
 
+    async def _enqueue_update(self, data):
+        """Webhook payload -> the same queue polling feeds."""
+        update = Update.de_json(data, self.application.bot)
+        await self.application.update_queue.put(update)
+
+    async def _start_webhook(self):
+        """Starts the local listener and registers it with Telegram. False means use polling."""
+        if not Config.TELEGRAM_WEBHOOK_URL:
+            logger.warning("TELEGRAM_MODE=webhook but TELEGRAM_WEBHOOK_URL is not set, using polling")
+            return False
+        if not Config.TELEGRAM_WEBHOOK_SECRET:
+            # Without it anyone who finds the URL could post forged /buy or /on updates
+            logger.warning("TELEGRAM_MODE=webhook but TELEGRAM_WEBHOOK_SECRET is not set, using polling")
+            return False
+
+        path = "/" + Config.TELEGRAM_WEBHOOK_PATH.lstrip("/")
+        self.webhook_server = WebhookServer(
+            Config.TELEGRAM_WEBHOOK_HOST, Config.TELEGRAM_WEBHOOK_PORT, path,
+            Config.TELEGRAM_WEBHOOK_SECRET, self._enqueue_update)
+        try:
+            await self.webhook_server.start()
+            await self.application.bot.set_webhook(
+                url=Config.TELEGRAM_WEBHOOK_URL.rstrip("/") + path,
+                secret_token=Config.TELEGRAM_WEBHOOK_SECRET,
+                allowed_updates=Update.ALL_TYPES,
+            )
+        except Exception as e:
+            logger.error(f"Webhook setup failed, falling back to polling: {e}")
+            await self.webhook_server.stop()
+            self.webhook_server = None
+            return False
+
+        logger.info("Telegram Bot Webhook Started...")
+        return True
+
     async def run(self):
-        """Starts the bot polling."""
+        """Starts the bot (webhook or polling)."""
         if not Config.TELEGRAM_TOKEN:
             logger.error("No Telegram Token provided")
             return
 
-        self.application = ApplicationBuilder().token(Config.TELEGRAM_TOKEN).read_timeout(30).write_timeout(30).connect_timeout(30).build()
+        builder = ApplicationBuilder().token(Config.TELEGRAM_TOKEN).read_timeout(30).write_timeout(30).connect_timeout(30)
+        if Config.TELEGRAM_API_BASE_URL:
+            base = Config.TELEGRAM_API_BASE_URL.rstrip("/")
+            builder = builder.base_url(f"{base}/bot").base_file_url(f"{base}/file/bot")
+        self.application = builder.build()
         
         # Commands
         self.application.add_handler(CommandHandler("start", self.start_command))
@@ -196,30 +348,40 @@ class TelegramBot:
         self.application.add_handler(CommandHandler("buy", self.buy_command))
         self.application.add_handler(CommandHandler("sell", self.sell_command))
         self.application.add_handler(CommandHandler("report", self.report_command))
+        self.application.add_handler(CommandHandler("lag", self.lag_command))
+        self.application.add_handler(CommandHandler("exec", self.exec_command))
+        self.application.add_handler(CommandHandler("conn", self.conn_command))
+        self.application.add_handler(CommandHandler("mem", self.mem_command))
+        self.application.add_handler(CommandHandler("profile", self.profile_command))
+        self.application.add_handler(CommandHandler("stats", self.stats_command))
+        self.application.add_handler(CommandHandler("trades", self.trades_command))
         
         # Callbacks (Buttons)
         self.application.add_handler(CallbackQueryHandler(self.button_callback))
 
-        logger.info("Telegram Bot Polling Started...")
-        
-        # We use clean=True to ignore updates while offline if needed, but not standard in v20
-        # This will block unless we run it in a task. 
-        # Since we want to run this ALONGSIDE the trading loop,
-        # we generally should use `initialize`, `start`, `updater.start_polling` if we want manual control,
-        # or use run_polling() if it's the main entry point.
-        # Since we have a main loop for trading, we should probably run this as a background task.
-        
+        # We run the application manually (initialize/start + updates source) instead of
+        # run_polling(), since the trading loop owns the event loop alongside us.
         await self.application.initialize()
         await self.application.start()
-        await self.application.updater.start_polling()
+
+        # Webhook pushes updates the moment they happen; polling stays as the fallback
+        webhook = Config.TELEGRAM_MODE.lower() == "webhook" and await self._start_webhook()
+        if not webhook:
+            # start_polling also removes any webhook left registered from a previous run
+            await self.application.updater.start_polling()
+            logger.info("Telegram Bot Polling Started...")
         
         # Keep the task alive
         while True:
             await asyncio.sleep(3600)
 
     async def stop(self):
+        if self.webhook_server:
+            await self.webhook_server.stop()
+            self.webhook_server = None
         if self.application:
-            await self.application.updater.stop()
+            if self.application.updater.running:
+                await self.application.updater.stop()
             await self.application.stop()
             await self.application.shutdown()
 
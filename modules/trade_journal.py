@@ -0,0 +1,285 @@
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from config import Config
+from modules.logger import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    symbol TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    price REAL, sl REAL, tp REAL, sl_pips REAL,
+    bar_time TEXT,
+    ema_fast REAL, ema_slow REAL, rsi REAL, atr REAL, h1_trend INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_signals_symbol_ts ON signals (symbol, ts);
+
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    signal_id TEXT,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    volume REAL, request_price REAL, sl REAL, tp REAL,
+    deviation INTEGER, retcode INTEGER, order_ticket INTEGER,
+    latency_ms REAL, comment TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_orders_symbol_ts ON orders (symbol, ts);
+CREATE INDEX IF NOT EXISTS ix_orders_signal ON orders (signal_id);
+
+CREATE TABLE IF NOT EXISTS fills (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    order_ticket INTEGER, deal_ticket INTEGER,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    volume REAL, price REAL, slippage_pts REAL
+);
+CREATE INDEX IF NOT EXISTS ix_fills_order ON fills (order_ticket);
+
+CREATE TABLE IF NOT EXISTS modifications (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    position_id INTEGER NOT NULL,
+    symbol TEXT,
+    reason TEXT,
+    old_sl REAL, new_sl REAL, tp REAL,
+    ok INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_modifications_position ON modifications (position_id);
+
+-- Mirror of the terminal's deal history (entry 0 = in, 1 = out; time on the server clock)
+CREATE TABLE IF NOT EXISTS deals (
+    ticket INTEGER PRIMARY KEY,
+    position_id INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    type INTEGER, entry INTEGER,
+    volume REAL, price REAL,
+    profit REAL, commission REAL, swap REAL,
+    reason INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_deals_position ON deals (position_id);
+CREATE INDEX IF NOT EXISTS ix_deals_entry_time ON deals (entry, time);
+"""
+
+_INSERT = {
+    'signals': "INSERT OR REPLACE INTO signals VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+    'orders': ("INSERT INTO orders (ts, signal_id, symbol, side, volume, request_price, sl, tp, "
+               "deviation, retcode, order_ticket, latency_ms, comment) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)"),
+    'fills': ("INSERT INTO fills (ts, order_ticket, deal_ticket, symbol, side, volume, price, slippage_pts) "
+              "VALUES (?,?,?,?,?,?,?,?)"),
+    'modifications': ("INSERT INTO modifications (ts, position_id, symbol, reason, old_sl, new_sl, tp, ok) "
+                      "VALUES (?,?,?,?,?,?,?,?)"),
+    'deals': "INSERT OR IGNORE INTO deals VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+}
+
+# Closed positions (net of commission and swap) whose closing deal falls in [since, now)
+_CLOSED_POSITIONS = """
+SELECT d.position_id, MAX(d.symbol) AS symbol, MAX(d.time) AS closed,
+       SUM(d.profit + d.commission + d.swap) AS net
+FROM deals d
+WHERE d.position_id IN (SELECT position_id FROM deals WHERE entry = 1 AND time >= ?)
+GROUP BY d.position_id
+"""
+
+class TradeJournal:
+    """
+    SQLite journal of signals, orders, fills, SL/TP modifications and closed deals.
+    The record_* calls only queue a row; one writer thread owns the write
+    connection and commits in batches, so the trading loop never touches disk.
+    Readers open their own connections (WAL lets them run next to the writer).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or Config.JOURNAL_PATH
+        self.queue = queue.Queue()
+        self.thread = None
+        self.rows_written = 0
+        self.last_deal_sync = None
+
+    # --- writer ---
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL + NORMAL survives a bot crash, enough for a journal
+        return conn
+
+    def start(self):
+        if self.thread is not None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+        self.thread = threading.Thread(target=self._writer, name="trade-journal", daemon=True)
+        self.thread.start()
+        logger.info(f"Trade journal: {self.path}")
+
+    def stop(self):
+        """Writes whatever is queued and stops the writer."""
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join(timeout=10)
+        self.thread = None
+
+    def _writer(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + Config.JOURNAL_FLUSH_INTERVAL
+            while len(batch) < Config.JOURNAL_BATCH:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                with conn:
+                    for table, row in batch:
+                        conn.execute(_INSERT[table], row)
+                self.rows_written += len(batch)
+            except sqlite3.Error as e:
+                logger.error(f"Trade journal write failed ({len(batch)} rows dropped): {e}")
+        conn.close()
+
+    def _put(self, table, row):
+        if self.thread is not None:
+            self.queue.put((table, row))
+
+    # --- producers (called from the trading loop, never block) ---
+
+    def record_signal(self, symbol, signal):
+        """Returns the id to pass along with the orders placed for this signal."""
+        signal_id = uuid.uuid4().hex
+        ind = signal.get('indicators', {})
+        self._put('signals', (
+            signal_id, time.time(), symbol, signal['signal'],
+            float(signal['price']), float(signal['sl']), float(signal['tp']), float(signal['sl_pips']),
+            str(signal.get('time', '')),
+            *(float(ind[k]) if k in ind else None for k in ('ema_fast', 'ema_slow', 'rsi', 'atr')),
+            ind.get('h1_trend'),
+        ))
+        return signal_id
+
+    def record_order(self, symbol, side, volume, request_price, sl, tp, deviation,
+                     retcode, order_ticket, latency_ms, comment, signal_id=None):
+        self._put('orders', (time.time(), signal_id, symbol, side, float(volume), request_price,
+                             float(sl), float(tp), deviation, retcode, order_ticket, latency_ms, comment))
+
+    def record_fill(self, symbol, side, order_ticket, deal_ticket, volume, price, slippage_pts):
+        self._put('fills', (time.time(), order_ticket, deal_ticket, symbol, side, volume, price, slippage_pts))
+
+    def record_modification(self, position_id, symbol, reason, old_sl, new_sl, tp, ok):
+        self._put('modifications', (time.time(), position_id, symbol, reason, old_sl, new_sl, tp, int(bool(ok))))
+
+    def record_deals(self, deals):
+        for d in deals:
+            self._put('deals', (d['ticket'], d['position_id'], int(d['time']), d['symbol'], d['type'],
+                                d['entry'], d['volume'], d['price'], d['profit'], d['commission'],
+                                d['swap'], d['reason']))
+
+    def on_position_event(self, event):
+        """Position tracker subscriber: journals a position's deals as soon as it closes."""
+        if event.kind == 'closed' and event.close:
+            self.record_deals(event.close['deals'])
+
+    async def run(self):
+        """Pulls closed deals from the terminal every JOURNAL_DEAL_SYNC_INTERVAL."""
+        from modules.mt5_interface import mt5_interface
+        while True:
+            await asyncio.sleep(Config.JOURNAL_DEAL_SYNC_INTERVAL)
+            if self.thread is None or not mt5_interface.connected:
+                continue
+            now = datetime.now()
+            # Overlap the previous window; duplicate tickets are ignored on insert
+            since = (self.last_deal_sync - timedelta(hours=1) if self.last_deal_sync
+                     else now - timedelta(days=Config.JOURNAL_DEAL_LOOKBACK_DAYS))
+            try:
+                deals = mt5_interface.get_deals(since, now + timedelta(days=1))
+            except Exception as e:
+                logger.error(f"Deal history sync failed: {e}")
+                continue
+            if deals is not None:
+                self.record_deals(deals)
+                self.last_deal_sync = now
+
+    # --- queries (own read connection; call via asyncio.to_thread from handlers) ---
+
+    def _read(self, sql, params=()):
+        if not os.path.exists(self.path):
+            return []
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=10)
+        try:
+            conn.row_factory = sqlite3.Row
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def get_stats(self, symbol=None, days=7):
+        """Closed-position stats per symbol over the last `days`. Deal times are on the
+        terminal's clock, so the window is too."""
+        from modules.mt5_interface import mt5_interface
+        since = int(mt5_interface.server_time() - days * 86400)
+        sql = f"""
+            SELECT symbol, COUNT(*) AS trades, SUM(net > 0) AS wins, SUM(net) AS net,
+                   SUM(CASE WHEN net > 0 THEN net ELSE 0 END) AS gross_win,
+                   SUM(CASE WHEN net < 0 THEN -net ELSE 0 END) AS gross_loss
+            FROM ({_CLOSED_POSITIONS})
+            {"WHERE symbol = ?" if symbol else ""}
+            GROUP BY symbol ORDER BY symbol
+        """
+        rows = self._read(sql, (since, symbol) if symbol else (since,))
+        stats = {}
+        for r in rows:
+            stats[r['symbol']] = {
+                'trades': r['trades'],
+                'wins': r['wins'],
+                'win_rate': r['wins'] / r['trades'] * 100 if r['trades'] else 0.0,
+                'net': r['net'],
+                'profit_factor': r['gross_win'] / r['gross_loss'] if r['gross_loss'] else None,
+            }
+        return stats
+
+    def recent_trades(self, limit=10):
+        return [dict(r) for r in self._read(
+            f"SELECT * FROM ({_CLOSED_POSITIONS}) ORDER BY closed DESC LIMIT ?", (0, limit))]
+
+    def format_stats(self, symbol=None, days=7):
+        stats = self.get_stats(symbol, days)
+        lines = [f"📒 *Journal stats ({days}d)*"]
+        for sym, s in stats.items():
+            pf = f"{s['profit_factor']:.2f}" if s['profit_factor'] is not None else "n/a"
+            lines.append(f"{sym}: {s['trades']} trades | win {s['win_rate']:.0f}% | net {s['net']:.2f} | PF {pf}")
+        if len(lines) == 1:
+            lines.append("No closed trades in this period.")
+        return "\n".join(lines)
+
+    def format_recent(self, limit=10):
+        rows = self.recent_trades(limit)
+        lines = [f"📒 *Last {limit} closed trades*"]
+        for r in rows:
+            closed = datetime.utcfromtimestamp(r['closed']).strftime('%m-%d %H:%M')
+            lines.append(f"{closed} {r['symbol']} #{r['position_id']}: {r['net']:+.2f}")
+        if len(lines) == 1:
+            lines.append("No closed trades yet.")
+        return "\n".join(lines)
+
+trade_journal = TradeJournal()
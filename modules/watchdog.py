@@ -0,0 +1,113 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+import numpy as np
+from config import Config
+from modules.logger import logger
+
+class LoopWatchdog:
+    """
+    Measures asyncio scheduling lag and catches the code that blocks the loop.
+
+    A coroutine ticks every LOOP_LAG_INTERVAL and records how late it woke up.
+    A side thread watches the tick timestamp; when the loop has been silent for
+    longer than LOOP_LAG_THRESHOLD it grabs the loop thread's stack while the
+    blocking call is still running.
+    """
+
+    def __init__(self):
+        self.interval = Config.LOOP_LAG_INTERVAL
+        self.threshold = Config.LOOP_LAG_THRESHOLD
+        self.samples = deque(maxlen=Config.LOOP_LAG_SAMPLES)
+        self.stalls = 0
+        self.max_lag = 0.0
+        self.last_alert = 0.0
+        self._last_beat = time.monotonic()
+        self._loop_thread_id = None
+        self._stall_stack = None
+        self._thread = None
+        self._running = False
+
+    def _monitor(self):
+        """Side thread: capture the loop's stack while it is stuck."""
+        captured_for = None
+        while self._running:
+            time.sleep(self.interval)
+            beat = self._last_beat
+            silent = time.monotonic() - beat
+            if silent > self.threshold and captured_for != beat:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    self._stall_stack = ''.join(traceback.format_stack(frame))
+                    captured_for = beat
+                    logger.warning(f"Event loop blocked for {silent:.2f}s, stack:\n{self._stall_stack}")
+
+    async def run(self, notify=None):
+        """Watchdog task. notify: async callable(text) used for alerts (e.g. telegram_bot.send_message)."""
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._running = True
+        self._thread = threading.Thread(target=self._monitor, name="LoopWatchdog", daemon=True)
+        self._thread.start()
+        logger.info("Event loop watchdog started")
+
+        try:
+            while True:
+                expected = loop.time() + self.interval
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, loop.time() - expected)
+                self._last_beat = time.monotonic()
+                self.samples.append(lag)
+                if lag > self.max_lag:
+                    self.max_lag = lag
+
+                if lag > self.threshold:
+                    self.stalls += 1
+                    stack = self._stall_stack
+                    self._stall_stack = None
+                    logger.warning(f"Event loop lag {lag * 1000:.0f} ms (threshold {self.threshold * 1000:.0f} ms)")
+                    now = time.monotonic()
+                    if notify and now - self.last_alert > Config.LOOP_LAG_ALERT_COOLDOWN:
+                        self.last_alert = now
+                        await notify(self._format_alert(lag, stack))
+        finally:
+            self._running = False
+
+    def _format_alert(self, lag, stack):
+        text = f"⚠️ *Event loop stall*: {lag * 1000:.0f} ms\n"
+        if stack:
+            # Innermost frames are the interesting ones; keep the message short
+            tail = stack.strip().splitlines()[-8:]
+            text += "```\n" + "\n".join(tail).replace('`', "'") + "\n```"
+        return text
+
+    def get_stats(self):
+        """Lag percentiles in milliseconds over the recent sample window."""
+        if not self.samples:
+            return None
+        arr = np.fromiter(self.samples, dtype=np.float64) * 1000
+        p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+        return {
+            'samples': len(arr),
+            'p50_ms': float(p50),
+            'p90_ms': float(p90),
+            'p99_ms': float(p99),
+            'max_ms': float(self.max_lag * 1000),
+            'stalls': self.stalls,
+        }
+
+    def format_stats(self):
+        stats = self.get_stats()
+        if not stats:
+            return "⏱ Loop lag: no data yet"
+        return (
+            f"⏱ *Event Loop Lag* ({stats['samples']} samples)\n"
+            f"p50: {stats['p50_ms']:.1f} ms | p90: {stats['p90_ms']:.1f} ms | p99: {stats['p99_ms']:.1f} ms\n"
+            f"Max: {stats['max_ms']:.0f} ms | Stalls: {stats['stalls']}"
+        )
+
+loop_watchdog = LoopWatchdog()
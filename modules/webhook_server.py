@@ -0,0 +1,87 @@
+import asyncio
+import hmac
+import json
+from modules.logger import logger
+
+MAX_BODY = 1024 * 1024  # Telegram updates are a few KB
+READ_TIMEOUT = 10
+
+class WebhookServer:
+    """
+    Minimal HTTP/1.1 listener for Telegram webhook calls, running on the bot's
+    own asyncio loop. Accepts POST <path> with the configured secret header and
+    hands the decoded JSON to `on_update` without waiting for it to be processed.
+    With no secret configured every call is refused.
+    """
+
+    def __init__(self, host, port, path, secret, on_update):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.secret = secret
+        self.on_update = on_update
+        self.server = None
+        self.updates_received = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Port 0 means "pick one" (tests); report what we actually got
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"Webhook listener on {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _respond(self, writer, status, reason):
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2:
+                return
+
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode('latin-1').partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            method, path = parts[0], parts[1]
+            if method != "POST" or path != self.path:
+                await self._respond(writer, 404, "Not Found")
+                return
+            token = headers.get("x-telegram-bot-api-secret-token", "")
+            if not self.secret or not hmac.compare_digest(token, self.secret):
+                logger.warning(f"Webhook call with bad secret from {writer.get_extra_info('peername')}")
+                await self._respond(writer, 403, "Forbidden")
+                return
+
+            length = int(headers.get("content-length", 0))
+            if length <= 0 or length > MAX_BODY:
+                await self._respond(writer, 413 if length > MAX_BODY else 400, "Bad Request")
+                return
+            body = await asyncio.wait_for(reader.readexactly(length), READ_TIMEOUT)
+            try:
+                data = json.loads(body)
+            except ValueError:
+                await self._respond(writer, 400, "Bad Request")
+                return
+
+            # Ack first so Telegram never waits on our handlers
+            await self._respond(writer, 200, "OK")
+            self.updates_received += 1
+            await self.on_update(data)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        except Exception as e:
+            logger.error(f"Webhook handler error: {e}")
+        finally:
+            writer.close()
@@ -0,0 +1,252 @@
+import numpy as np
+from config import Config
+from modules.logger import logger
+from modules import indicators
+from modules.mt5_interface import mt5_interface
+from modules.clock import clock
+
+TF_SECONDS = {"M1": 60, "M5": 300, "M15": 900, "M30": 1800, "H1": 3600, "H4": 14400, "D1": 86400}
+
+class SymbolZones:
+    """
+    Support/resistance zones of one symbol: pivots from every timeframe
+    clustered into bands no wider than `width`, kept as parallel arrays sorted
+    by center so nearest-above / nearest-below is one searchsorted.
+    """
+
+    def __init__(self, width, atr):
+        self.width = width
+        self.atr = atr
+        self.centers = np.empty(0, dtype=np.float64)
+        self.lows = np.empty(0, dtype=np.float64)
+        self.highs = np.empty(0, dtype=np.float64)
+        self.touches = np.empty(0, dtype=np.int64)
+        self.tf_mask = np.empty(0, dtype=np.int64)  # bit per Config.ZONE_TIMEFRAMES entry
+
+    def __len__(self):
+        return len(self.centers)
+
+    @classmethod
+    def build(cls, prices, tf_bits, width, atr):
+        """Greedy clustering of sorted pivot prices: a zone grows while its span stays <= width."""
+        zones = cls(width, atr)
+        prices = np.asarray(prices, dtype=np.float64)
+        tf_bits = np.asarray(tf_bits, dtype=np.int64)
+        if len(prices) == 0:
+            return zones
+
+        order = np.argsort(prices, kind='stable')
+        prices, tf_bits = prices[order], tf_bits[order]
+        # A new zone starts wherever the price is too far from the current zone's low
+        starts = [0]
+        for i in range(1, len(prices)):
+            if prices[i] - prices[starts[-1]] > width:
+                starts.append(i)
+        starts = np.array(starts)
+
+        counts = np.diff(np.append(starts, len(prices)))
+        zones.centers = np.add.reduceat(prices, starts) / counts
+        zones.lows = prices[starts]
+        zones.highs = np.maximum.reduceat(prices, starts)
+        zones.touches = counts.astype(np.int64)
+        zones.tf_mask = np.bitwise_or.reduceat(tf_bits, starts)
+        return zones
+
+    def to_dict(self):
+        return {'width': self.width, 'atr': self.atr, 'centers': self.centers.tolist(),
+                'lows': self.lows.tolist(), 'highs': self.highs.tolist(),
+                'touches': self.touches.tolist(), 'tf_mask': self.tf_mask.tolist()}
+
+    @classmethod
+    def from_dict(cls, d):
+        zones = cls(d['width'], d['atr'])
+        for name in ('centers', 'lows', 'highs'):
+            setattr(zones, name, np.asarray(d[name], dtype=np.float64))
+        for name in ('touches', 'tf_mask'):
+            setattr(zones, name, np.asarray(d[name], dtype=np.int64))
+        return zones
+
+    def add(self, price, tf_bit):
+        """Folds one new pivot in: merges into a neighbouring zone if it fits, else inserts a zone."""
+        i = int(np.searchsorted(self.centers, price))
+        best = None
+        for j in (i - 1, i):
+            if 0 <= j < len(self.centers):
+                if max(self.highs[j], price) - min(self.lows[j], price) <= self.width:
+                    if best is None or abs(self.centers[j] - price) < abs(self.centers[best] - price):
+                        best = j
+
+        if best is None:
+            self.centers = np.insert(self.centers, i, price)
+            self.lows = np.insert(self.lows, i, price)
+            self.highs = np.insert(self.highs, i, price)
+            self.touches = np.insert(self.touches, i, 1)
+            self.tf_mask = np.insert(self.tf_mask, i, tf_bit)
+            return
+
+        # The center moves toward `price`, which lies between centers[i-1] and centers[i],
+        # so the arrays stay sorted
+        n = self.touches[best]
+        self.centers[best] = (self.centers[best] * n + price) / (n + 1)
+        self.lows[best] = min(self.lows[best], price)
+        self.highs[best] = max(self.highs[best], price)
+        self.touches[best] = n + 1
+        self.tf_mask[best] |= tf_bit
+
+    def zone(self, i):
+        timeframes = [tf for bit, tf in enumerate(Config.ZONE_TIMEFRAMES) if self.tf_mask[i] >> bit & 1]
+        return {'price': float(self.centers[i]), 'low': float(self.lows[i]), 'high': float(self.highs[i]),
+                'touches': int(self.touches[i]), 'timeframes': timeframes}
+
+    def nearest(self, price):
+        """
+        (below, above) zones around price, each a zone dict plus 'distance' to its
+        nearest edge (0 when price is inside), or None.
+        """
+        i = int(np.searchsorted(self.centers, price))
+        below = above = None
+        if i > 0:
+            below = self.zone(i - 1)
+            below['distance'] = max(price - below['high'], 0.0)
+        if i < len(self.centers):
+            above = self.zone(i)
+            above['distance'] = max(above['low'] - price, 0.0)
+        return below, above
+
+    def blocks(self, signal, price):
+        """True when a BUY runs straight into resistance (or a SELL into support) within ZONE_NEAR_ATR."""
+        below, above = self.nearest(price)
+        zone = above if signal == 'BUY' else below
+        return zone is not None and zone['distance'] < Config.ZONE_NEAR_ATR * self.atr
+
+class ZoneIndex:
+    """
+    Per-symbol SymbolZones built from Config.ZONE_TIMEFRAMES pivots.
+    After the first build only newly confirmed pivots are folded in, once per
+    closed bar; a new bar on the slowest timeframe triggers a full rebuild so the
+    ATR-based zone width follows volatility.
+    """
+
+    def __init__(self, data_source=None):
+        # Anything with get_rates(symbol, tf, n_bars): mt5_interface or a MarketDataBus reader
+        self.data_source = data_source or mt5_interface
+        self.zones = {}        # symbol -> SymbolZones
+        self._last_bar = {}    # (symbol, tf) -> open time of the newest closed bar seen
+        self._last_check = {}  # symbol -> monotonic time of the last new-bar check
+
+    def _closed_rates(self, symbol, tf, n_bars):
+        # The last row from the terminal is the bar still forming
+        rates = self.data_source.get_rates(symbol, tf, n_bars + 1)
+        if rates is None or len(rates) < 2:
+            return None
+        return rates[:-1]
+
+    def build(self, symbol):
+        """Full rebuild from history. Returns the new SymbolZones or None without data."""
+        lookback = Config.ZONE_PIVOT_LOOKBACK
+        prices, bits = [], []
+        atr = None
+        for bit, (tf, n_bars) in enumerate(Config.ZONE_TIMEFRAMES.items()):
+            rates = self._closed_rates(symbol, tf, n_bars)
+            if rates is None:
+                continue
+            high = rates['high'].astype(np.float64)
+            low = rates['low'].astype(np.float64)
+            is_res, is_sup = indicators.pivots(high, low, lookback)
+            prices.extend(high[is_res])
+            prices.extend(low[is_sup])
+            bits.extend([1 << bit] * int(is_res.sum() + is_sup.sum()))
+            self._last_bar[(symbol, tf)] = int(rates['time'][-1])
+
+            if tf == Config.TIMEFRAME_HTF:
+                atr_series = indicators.atr(high, low, rates['close'].astype(np.float64), Config.ATR_PERIOD)
+                atr = float(atr_series[-1])
+
+        if atr is None or not atr > 0:
+            logger.warning(f"Zone index: no {Config.TIMEFRAME_HTF} ATR for {symbol}, zones not built")
+            return None
+
+        zones = SymbolZones.build(prices, bits, Config.ZONE_WIDTH_ATR * atr, atr)
+        self.zones[symbol] = zones
+        self._last_check[symbol] = clock.monotonic()
+        logger.info(f"Zone index {symbol}: {len(prices)} pivots -> {len(zones)} zones (ATR {atr:.5f})")
+        return zones
+
+    def _update_tf(self, symbol, zones, bit, tf):
+        """Folds in pivots confirmed by bars that closed since the last check. False = rebuild needed."""
+        last = self._last_bar.get((symbol, tf))
+        head = self._closed_rates(symbol, tf, 1)
+        if head is None or last is None:
+            return True
+        newest = int(head['time'][-1])
+        if newest == last:
+            return True
+
+        lookback = Config.ZONE_PIVOT_LOOKBACK
+        # Upper bound on bars closed since `last` (gaps like weekends only make it larger)
+        estimate = (newest - last) // TF_SECONDS.get(tf, 3600)
+        if estimate > 2 * lookback:
+            return False
+        rates = self._closed_rates(symbol, tf, 2 * lookback + 1 + estimate)
+        if rates is None:
+            return True
+
+        times = rates['time'].astype(np.int64)
+        new_bars = int((times > last).sum())
+        high = rates['high'].astype(np.float64)
+        low = rates['low'].astype(np.float64)
+        is_res, is_sup = indicators.pivots(high, low, lookback)
+        # Bar j is confirmed once `lookback` bars closed after it
+        last_candidate = len(rates) - 1 - lookback
+        for j in range(max(last_candidate - new_bars + 1, 0), last_candidate + 1):
+            if is_res[j]:
+                zones.add(high[j], 1 << bit)
+            if is_sup[j]:
+                zones.add(low[j], 1 << bit)
+        self._last_bar[(symbol, tf)] = int(times[-1])
+        return True
+
+    def update(self, symbol):
+        """Incremental refresh, at most once per ZONE_CHECK_INTERVAL per symbol."""
+        zones = self.zones.get(symbol)
+        if zones is None:
+            return self.build(symbol)
+        now = clock.monotonic()
+        if now - self._last_check.get(symbol, 0.0) < Config.ZONE_CHECK_INTERVAL:
+            return zones
+        self._last_check[symbol] = now
+
+        timeframes = list(Config.ZONE_TIMEFRAMES)
+        slowest = max(timeframes, key=lambda tf: TF_SECONDS.get(tf, 0))
+        for bit, tf in enumerate(timeframes):
+            if tf == slowest:
+                head = self._closed_rates(symbol, tf, 1)
+                if head is not None and int(head['time'][-1]) != self._last_bar.get((symbol, tf)):
+                    return self.build(symbol)
+                continue
+            if not self._update_tf(symbol, zones, bit, tf):
+                return self.build(symbol)
+        return zones
+
+    def export_state(self):
+        return {
+            'zones': {symbol: zones.to_dict() for symbol, zones in self.zones.items()},
+            'last_bar': [[symbol, tf, t] for (symbol, tf), t in self._last_bar.items()],
+        }
+
+    def load_state(self, state):
+        """Restores a snapshot; the first get() per symbol then only folds in bars closed since."""
+        zones = {symbol: SymbolZones.from_dict(d) for symbol, d in state['zones'].items()}
+        last_bar = {(symbol, tf): int(t) for symbol, tf, t in state['last_bar']}
+        self.zones, self._last_bar = zones, last_bar
+        self._last_check.clear()
+
+    def get(self, symbol):
+        """Zones for symbol, built on first use and kept current. None if no data."""
+        try:
+            return self.update(symbol)
+        except Exception as e:
+            logger.error(f"Zone index error for {symbol}: {e}")
+            return self.zones.get(symbol)
+
+zone_index = ZoneIndex()
@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+from modules.strategy import Strategy, SIGNAL_FEATURES
+
+def row(**values):
+    return np.array([values[name] for name in SIGNAL_FEATURES], dtype=np.float64)
+
+class TestBatchSignals(unittest.TestCase):
+
+    def setUp(self):
+        # Fast EMA crossing above slow with a widening gap, bullish candle
+        self.buy_prev = row(open=1.1000, high=1.1010, low=1.0995, close=1.1005,
+                            EMA_Fast=1.0999, EMA_Slow=1.1000, RSI=52, ATR=0.0010)
+        self.buy_curr = row(open=1.1005, high=1.1020, low=1.1004, close=1.1015,
+                            EMA_Fast=1.1003, EMA_Slow=1.1001, RSI=60, ATR=0.0010)
+
+    def test_matches_single_symbol_rules(self):
+        sell_prev = 2 * 1.1 - self.buy_prev
+        sell_curr = 2 * 1.1 - self.buy_curr
+        # Mirror the price features around 1.1, keep RSI/ATR sensible
+        for arr, rsi in ((sell_prev, 48), (sell_curr, 40)):
+            arr[SIGNAL_FEATURES.index('RSI')] = rsi
+            arr[SIGNAL_FEATURES.index('ATR')] = 0.0010
+            hi, lo = SIGNAL_FEATURES.index('high'), SIGNAL_FEATURES.index('low')
+            arr[hi], arr[lo] = arr[lo], arr[hi]
+
+        curr = np.stack([self.buy_curr, sell_curr, self.buy_curr])
+        prev = np.stack([self.buy_prev, sell_prev, self.buy_prev])
+        h1 = np.array([1, -1, -1])  # third symbol: H1 trend disagrees
+        mult = np.array([2.0, 3.5, 2.0])
+
+        direction, sl, tp, _ = Strategy.evaluate_batch(curr, prev, h1, mult)
+        self.assertEqual(list(direction), [1, -1, 0])
+
+        close = self.buy_curr[SIGNAL_FEATURES.index('close')]
+        expected_sl = self.buy_curr[SIGNAL_FEATURES.index('low')] - 2.0 * 0.0010
+        self.assertAlmostEqual(sl[0], expected_sl)
+        self.assertAlmostEqual(tp[0], close + (close - expected_sl) * 0.7)
+        self.assertGreater(sl[1], sell_curr[SIGNAL_FEATURES.index('close')])
+        self.assertEqual(sl[2], 0.0)
+
+    def test_overextension_blocks(self):
+        curr = self.buy_curr.copy()
+        curr[SIGNAL_FEATURES.index('ATR')] = 0.0001
+        direction, _, _, _ = Strategy.evaluate_batch(
+            curr[None, :], self.buy_prev[None, :], np.array([1]), np.array([2.0]))
+        self.assertEqual(direction[0], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import asyncio
+import calendar
+import time
+import unittest
+from unittest import mock
+from modules.clock import clock, SimulatedTime
+from modules.risk_manager import RiskManager
+
+START = 1_760_000_000  # 2025-10-09 08:53:20 UTC
+
+class TestClock(unittest.TestCase):
+
+    def test_virtual_loop_fast_forwards_all_tasks(self):
+        source = SimulatedTime(START)
+        log = []
+
+        async def ticker(name, every):
+            while True:
+                await asyncio.sleep(every)
+                log.append((name, clock.time() - START))
+
+        async def both():
+            asyncio.create_task(ticker("slow", 3600))
+            await ticker("fast", 1500)
+
+        started = time.perf_counter()
+        self.assertIsNone(clock.run_simulated(both(), source, 2 * 86400))
+        self.assertLess(time.perf_counter() - started, 5)
+        self.assertFalse(clock.simulated)
+        self.assertEqual(source.elapsed, 2 * 86400)
+        self.assertEqual([t for name, t in log if name == "slow"], [3600.0 * i for i in range(1, 49)])
+        # Tasks interleave in simulated time order
+        self.assertEqual([t for _, t in log], sorted(t for _, t in log))
+
+    def test_result_before_time_runs_out(self):
+        async def job():
+            await asyncio.sleep(60)
+            return clock.utcnow()
+        now = clock.run_simulated(job(), SimulatedTime(START), 3600)
+        self.assertEqual(calendar.timegm(now.timetuple()), START + 60)
+
+    def test_risk_manager_runs_on_the_clock(self):
+        rm = RiskManager()
+        rm.set_session("08:00", "22:00")
+        source = SimulatedTime(START)
+        account = {'balance': 9000.0, 'equity': 9000.0}
+        clock.set_source(source)
+        try:
+            self.assertTrue(rm._is_trading_session())
+            source.advance(14 * 3600)   # 22:53 UTC
+            self.assertFalse(rm._is_trading_session())
+
+            with mock.patch('modules.risk_manager.mt5_interface.get_account_info', return_value=account):
+                rm.roll_day()
+                rm.trades_today = 15
+                rm.roll_day()
+                self.assertEqual(rm.trades_today, 15)  # same day
+                source.advance(7200)    # 00:53 UTC next day
+                rm.roll_day()
+            self.assertEqual(rm.trades_today, 0)
+            self.assertEqual(rm.daily_start_balance, 9000.0)
+        finally:
+            clock.set_source(None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+from unittest import mock
+import pandas as pd
+from config import Config
+from modules.strategy import Strategy
+from modules.soak_test import SyntheticTerminal, TF_CONSTANTS
+
+class TerminalSource:
+    """Strategy data source over a SyntheticTerminal."""
+
+    def __init__(self, terminal):
+        self.terminal = terminal
+
+    def get_rates(self, symbol, tf, n_bars=500):
+        return self.terminal.copy_rates_from_pos(symbol, TF_CONSTANTS[tf], 0, n_bars)
+
+    def get_data(self, symbol, tf, n_bars=500):
+        df = pd.DataFrame(self.get_rates(symbol, tf, n_bars))
+        df['time'] = pd.to_datetime(df['time'], unit='s')
+        return df
+
+    def get_symbol_info(self, symbol):
+        return self.terminal.symbol_info(symbol)
+
+SYMBOLS = [f"SYN{i:03d}" for i in range(8)]
+
+class TestClosedBarSignals(unittest.TestCase):
+
+    def make(self, offset=0):
+        terminal = SyntheticTerminal(SYMBOLS, 1_760_000_000, 6 * 3600, seed=3)
+        terminal.advance(offset)
+        return terminal, Strategy(TerminalSource(terminal))
+
+    def test_memoized_within_a_bar(self):
+        terminal, strategy = self.make(offset=5)
+        with mock.patch.object(Config, 'SIGNAL_MODE', 'closed'):
+            for _ in range(6):  # 10 s loop: six passes per M1 bar
+                strategy.get_signals(SYMBOLS)
+                terminal.advance(9)
+            self.assertEqual(strategy.evaluations, len(SYMBOLS))
+            self.assertEqual(strategy.memo_hits, 5 * len(SYMBOLS))
+
+            terminal.advance(60)
+            strategy.get_signals(SYMBOLS)
+            self.assertEqual(strategy.evaluations, 2 * len(SYMBOLS))
+
+    def test_closed_bar_matches_forming_evaluation_of_that_bar(self):
+        # Closed mode while bar k is forming == forming mode when bar k-1 was the live bar
+        # (same 300-bar window), i.e. what a bar-by-bar backtest sees.
+        live, closed = self.make(offset=60)
+        past, forming = self.make(offset=0)
+        seen = 0
+        for _ in range(90):
+            with mock.patch.object(Config, 'SIGNAL_MODE', 'closed'):
+                a = closed.get_signals(SYMBOLS)
+            with mock.patch.object(Config, 'SIGNAL_MODE', 'forming'):
+                b = forming.get_signals(SYMBOLS)
+            self.assertEqual(set(a), set(b))
+            for symbol in a:
+                self.assertEqual(a[symbol]['signal'], b[symbol]['signal'])
+                self.assertEqual(a[symbol]['sl'], b[symbol]['sl'])
+                self.assertEqual(a[symbol]['time'], b[symbol]['time'])
+            seen += len(a)
+            live.advance(60)
+            past.advance(60)
+        self.assertGreater(seen, 0)
+
+class TestOncePerBar(unittest.TestCase):
+    """The loop journals a replayed closed-bar signal once and trades it once."""
+
+    def run_loop(self, seconds):
+        import main
+        from modules.clock import clock
+        clock.run_simulated(main.trading_loop(), self.terminal.clock, seconds)
+
+    def test_journaled_once_retried_until_traded(self):
+        import main
+        from modules.risk_manager import risk_manager
+        from modules.soak_test import _install, _restore
+
+        self.terminal = SyntheticTerminal(SYMBOLS[:2], 1_760_000_000, 3600, seed=3)
+        saved = _install(self.terminal)
+        bar = pd.Timestamp(self.terminal.now - self.terminal.now % 60, unit='s')
+        signal = {'signal': 'BUY', 'price': 1.1, 'sl': 1.099, 'tp': 1.1015, 'sl_pips': 10.0, 'time': bar}
+        try:
+            with mock.patch.object(Config, 'SIGNAL_MODE', 'closed'), \
+                    mock.patch.object(main.strategy, 'get_signals', return_value={SYMBOLS[0]: signal}), \
+                    mock.patch.object(main.trade_journal, 'record_signal', return_value="sid") as journaled, \
+                    mock.patch.object(main.mt5_interface, 'place_order', return_value=None) as ordered, \
+                    mock.patch.object(risk_manager, 'calculate_lot_size', return_value=0.01), \
+                    mock.patch.object(risk_manager, 'allowed_orders', return_value=1), \
+                    mock.patch.object(risk_manager, '_is_trading_session', return_value=True):
+                # Two passes (+0 s, +10 s) in one bar, both orders rejected: retried, journaled once
+                self.run_loop(15)
+                self.assertEqual(journaled.call_count, 1)
+                self.assertEqual(ordered.call_count, 2)
+                self.assertEqual(ordered.call_args.kwargs['signal_id'], "sid")
+
+                # Fills on the next pass; the rest of the bar leaves it alone
+                ordered.return_value = mock.Mock(order=1)
+                self.run_loop(25)
+                self.assertEqual(journaled.call_count, 1)
+                self.assertEqual(ordered.call_count, 3)
+
+                signal['time'] = bar + pd.Timedelta(minutes=1)
+                self.run_loop(15)
+                self.assertEqual(journaled.call_count, 2)
+                self.assertEqual(ordered.call_count, 4)
+
+                # Forming mode re-evaluates the live bar and acts on every pass, as before
+                with mock.patch.object(Config, 'SIGNAL_MODE', 'forming'):
+                    self.run_loop(15)
+                self.assertEqual(journaled.call_count, 4)
+                self.assertEqual(ordered.call_count, 6)
+        finally:
+            _restore(saved)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from config import Config, parse_symbols
+from modules.config_watcher import ConfigWatcher, RELOADABLE
+from modules.strategy import Strategy
+
+class TestConfigReload(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = {k: getattr(Config, k) for k in list(RELOADABLE) + ['ENV_FILE', 'CONFIG_FILE']}
+        self.tmp = tempfile.TemporaryDirectory()
+        Config.ENV_FILE = os.path.join(self.tmp.name, ".env")
+        Config.CONFIG_FILE = os.path.join(self.tmp.name, "config.toml")
+        with open(Config.ENV_FILE, 'w') as f:
+            f.write("RISK_PERCENT=1.5\nSYMBOL_LIST=EURUSD,usdjpy\n")
+        with open(Config.CONFIG_FILE, 'w') as f:
+            f.write('EMA_FAST = 5\nSESSION_START = "07:00"\n')
+
+    def tearDown(self):
+        for k, v in self.saved.items():
+            setattr(Config, k, v)
+        self.tmp.cleanup()
+
+    def test_reload_applies_and_reports_changes(self):
+        seen = []
+        watcher = ConfigWatcher()
+        watcher.subscribe(seen.append)
+        changed = watcher.reload()
+
+        self.assertEqual(Config.RISK_PER_TRADE, 1.5)
+        self.assertEqual(Config.SYMBOL_LIST, ["EURUSD", "USDJPY"])
+        self.assertEqual(Config.EMA_FAST, 5)
+        self.assertEqual(Config.SESSION_START, "07:00")
+        self.assertEqual(seen, [changed])
+        self.assertNotIn('EMA_SLOW', changed)
+        # Nothing new on disk -> nothing to do
+        self.assertEqual(watcher.reload(), {})
+
+    def test_invalid_set_is_rejected_as_a_whole(self):
+        with open(Config.CONFIG_FILE, 'w') as f:
+            f.write('EMA_FAST = 30\n')  # not below EMA_SLOW
+        before = {k: getattr(Config, k) for k in RELOADABLE}
+        self.assertEqual(ConfigWatcher().reload(), {})
+        self.assertEqual({k: getattr(Config, k) for k in RELOADABLE}, before)
+
+    def test_symbol_list_normalized_like_the_startup_value(self):
+        self.assertEqual(parse_symbols(" eurusd, GBPUSD ,,xauusd"), ["EURUSD", "GBPUSD", "XAUUSD"])
+        Config.SYMBOL_LIST = parse_symbols("eurusd, usdjpy")
+        with open(Config.CONFIG_FILE, 'w') as f:
+            f.write('')
+        self.assertNotIn('SYMBOL_LIST', ConfigWatcher().reload())
+
+    def test_indicator_change_clears_signal_memo(self):
+        strategy = Strategy()
+        strategy._memo = {"EURUSD": (1_700_000_000, None)}
+        watcher = ConfigWatcher()
+        watcher.subscribe(strategy.on_config_change)
+
+        with open(Config.CONFIG_FILE, 'w') as f:
+            f.write('SESSION_START = "07:00"\n')
+        watcher.reload()
+        self.assertIn("EURUSD", strategy._memo)  # unrelated settings keep it
+
+        with open(Config.CONFIG_FILE, 'w') as f:
+            f.write('EMA_FAST = 5\n')
+        watcher.reload()
+        self.assertEqual(strategy._memo, {})
+
+if __name__ == '__main__':
+    unittest.main()
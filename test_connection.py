@@ -0,0 +1,141 @@
+import asyncio
+import unittest
+from collections import namedtuple
+from unittest import mock
+from config import Config
+from modules.mt5_interface import mt5_interface
+from modules.connection_manager import ConnectionManager
+
+Position = namedtuple('Position', 'ticket symbol magic')
+TerminalInfo = namedtuple('TerminalInfo', 'connected')
+
+class FakeMT5:
+    """Terminal whose answers are scripted: None results come with `error` from last_error()."""
+
+    TIMEFRAME_M1 = 1
+    TIMEFRAME_M5 = 5
+    TIMEFRAME_M15 = 15
+    TIMEFRAME_M30 = 30
+    TIMEFRAME_H1 = 60
+    TIMEFRAME_H4 = 240
+    TIMEFRAME_D1 = 1440
+
+    def __init__(self):
+        self.error = (1, 'Success')
+        self.positions = []
+        self.init_results = []
+
+    def last_error(self):
+        return self.error
+
+    def initialize(self, path=None):
+        return self.init_results.pop(0) if self.init_results else True
+
+    def terminal_info(self):
+        return TerminalInfo(True)
+
+    def symbol_info(self, symbol):
+        return None
+
+    def copy_rates_from_pos(self, symbol, tf, start, count):
+        return None
+
+    def positions_get(self):
+        return self.positions
+
+
+class MT5Case(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeMT5()
+        patcher = mock.patch('modules.mt5_interface.mt5', self.fake)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        saved = (mt5_interface.connected, mt5_interface.consecutive_failures)
+        self.addCleanup(self._restore, saved)
+        mt5_interface.connected = True
+        mt5_interface.consecutive_failures = 0
+
+    def _restore(self, saved):
+        mt5_interface.connected, mt5_interface.consecutive_failures = saved
+
+
+class TestFailureHeuristic(MT5Case):
+
+    def test_unknown_symbol_is_not_a_disconnect(self):
+        self.fake.error = (-4, 'Terminal: Not found')
+        for _ in range(Config.MT5_MAX_EMPTY_RESULTS + 2):
+            self.assertIsNone(mt5_interface.get_rates("NOSUCH", "M1", 10))
+            self.assertIsNone(mt5_interface.get_symbol_info("NOSUCH"))
+        self.assertTrue(mt5_interface.connected)
+        self.assertEqual(mt5_interface.consecutive_failures, 0)
+
+    def test_empty_results_without_error_drop_the_link(self):
+        self.fake.error = (-1, 'Terminal: Call failed')
+        for _ in range(Config.MT5_MAX_EMPTY_RESULTS - 1):
+            mt5_interface.get_rates("EURUSD", "M1", 10)
+        self.assertTrue(mt5_interface.connected)
+        mt5_interface.get_rates("EURUSD", "M1", 10)
+        self.assertFalse(mt5_interface.connected)
+
+    def test_any_success_resets_the_count(self):
+        self.fake.error = (-1, 'Terminal: Call failed')
+        for _ in range(Config.MT5_MAX_EMPTY_RESULTS - 1):
+            mt5_interface.get_rates("EURUSD", "M1", 10)
+        self.assertEqual(mt5_interface.get_positions(), [])
+        self.assertEqual(mt5_interface.consecutive_failures, 0)
+        mt5_interface.get_rates("EURUSD", "M1", 10)
+        self.assertTrue(mt5_interface.connected)
+
+    def test_ipc_error_drops_the_link_at_once(self):
+        self.fake.error = (-10004, 'No IPC connection')
+        mt5_interface.get_rates("EURUSD", "M1", 10)
+        self.assertFalse(mt5_interface.connected)
+
+
+class TestReconnectBackoff(MT5Case):
+
+    def test_jittered_backoff_until_connected(self):
+        manager = ConnectionManager()
+        manager.state = manager.CONNECTED
+        manager.connected_since = 0.0
+        mt5_interface.connected = False
+        self.fake.init_results = [False, False, False, False]
+        delays = []
+
+        async def fake_sleep(delay):
+            delays.append(delay)
+
+        with mock.patch('modules.connection_manager.asyncio.sleep', fake_sleep), \
+                mock.patch.object(Config, 'MT5_RECONNECT_BASE', 1.0), \
+                mock.patch.object(Config, 'MT5_RECONNECT_MAX', 5.0), \
+                mock.patch.object(Config, 'MT5_LOGIN', None):
+            self.assertTrue(asyncio.run(manager.ensure_connected()))
+
+        self.assertEqual(len(delays), 4)
+        caps = [2.0, 4.0, 5.0, 5.0]  # base * 2^attempt, capped at MT5_RECONNECT_MAX
+        for delay, cap in zip(delays, caps):
+            self.assertGreaterEqual(delay, 0.5)
+            self.assertLessEqual(delay, cap)
+        stats = manager.get_stats()
+        self.assertEqual(stats['state'], manager.CONNECTED)
+        self.assertEqual(stats['failed_attempts'], 4)
+        self.assertEqual(stats['reconnects'], 1)
+
+    def test_gives_up_after_max_attempts(self):
+        manager = ConnectionManager()
+        mt5_interface.connected = False
+        self.fake.init_results = [False] * 5
+        delays = []
+
+        async def fake_sleep(delay):
+            delays.append(delay)
+
+        with mock.patch('modules.connection_manager.asyncio.sleep', fake_sleep):
+            self.assertFalse(asyncio.run(manager.ensure_connected(max_attempts=3)))
+        self.assertEqual(len(delays), 2)  # no wait after the last attempt
+        self.assertEqual(manager.failed_attempts, 3)
+        self.assertEqual(manager.state, manager.CONNECTING)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from collections import namedtuple
+from unittest import mock
+import numpy as np
+import pandas as pd
+from config import Config
+from modules.correlation import RollingCorrelation, CorrelationMonitor
+from modules.risk_manager import RiskManager
+
+Pos = namedtuple('Pos', 'ticket symbol type volume')
+RATE = np.dtype([('time', '<i8'), ('close', '<f8')])
+
+class FakeSource:
+    """Closed-bar series for get_rates; `visible` bars are out (the last one forming)."""
+
+    def __init__(self, closes, step=900):
+        self.closes = closes
+        self.step = step
+        self.visible = 120
+
+    def get_rates(self, symbol, tf, n_bars):
+        close = self.closes[symbol][:self.visible]
+        rates = np.zeros(len(close), dtype=RATE)
+        rates['time'] = np.arange(len(close)) * self.step
+        rates['close'] = close
+        return rates[-n_bars:]
+
+class TestRollingCorrelation(unittest.TestCase):
+
+    def test_matches_pandas_rolling_corr(self):
+        rng = np.random.default_rng(7)
+        base = rng.normal(size=(400, 1))
+        returns = base * [1.0, 0.8, -0.5, 0.0, 0.2] + rng.normal(size=(400, 5)) * [0.3, 0.5, 0.5, 1.0, 1.0]
+        rc = RollingCorrelation(list("ABCDE"), 60)
+        for row in returns:
+            rc.push(row)
+        expected = pd.DataFrame(returns[-60:]).corr().to_numpy()
+        np.testing.assert_allclose(rc.matrix(), expected, atol=1e-9)
+        np.testing.assert_allclose(rc.row("C"), expected[2], atol=1e-9)
+        self.assertGreater(rc.matrix()[0, 1], 0.7)
+        self.assertLess(rc.matrix()[0, 2], -0.4)
+
+    def test_flat_symbol_has_zero_correlation(self):
+        rc = RollingCorrelation(["A", "B"], 10)
+        for x in np.linspace(-1, 1, 10):
+            rc.push([x, 0.0])
+        self.assertEqual(rc.row("A").tolist(), [1.0, 0.0])
+
+class TestCorrelationMonitor(unittest.TestCase):
+
+    def test_warm_up_then_one_row_per_closed_bar(self):
+        rng = np.random.default_rng(1)
+        common = np.cumsum(rng.normal(0, 1e-3, 200))
+        closes = {"EURUSD": 1.1 + common + np.cumsum(rng.normal(0, 2e-4, 200)),
+                  "GBPUSD": 1.3 + common + np.cumsum(rng.normal(0, 2e-4, 200)),
+                  "USDJPY": 150 + np.cumsum(rng.normal(0, 0.1, 200))}
+        source = FakeSource(closes)
+        monitor = CorrelationMonitor(source)
+        with mock.patch.object(Config, 'SYMBOL_LIST', list(closes)), \
+                mock.patch.object(Config, 'CORR_WINDOW', 50), \
+                mock.patch.object(Config, 'CORR_CHECK_INTERVAL', 0):
+            monitor.update()
+            self.assertEqual(monitor.rolling.count, 50)
+            self.assertEqual(monitor.last_time, 118 * 900)
+            monitor.update()                 # no new bar closed
+            self.assertEqual(monitor.rolling.pushes, 50)
+            source.visible += 1
+            monitor.update()
+            self.assertEqual(monitor.rolling.pushes, 51)
+            self.assertEqual(monitor.last_time, 119 * 900)
+
+            frame = pd.DataFrame({s: np.log(c[:120]) for s, c in closes.items()}).diff().iloc[-50:]
+            rho = monitor.correlations("EURUSD")
+            self.assertAlmostEqual(rho["GBPUSD"], frame.corr().loc["EURUSD", "GBPUSD"], places=9)
+            self.assertGreater(rho["GBPUSD"], 0.8)
+            self.assertLess(abs(rho["USDJPY"]), 0.5)
+
+class TestExposureGate(unittest.TestCase):
+
+    def setUp(self):
+        self.rm = RiskManager()
+        rho = {"EURUSD": {"EURUSD": 1.0, "GBPUSD": 0.9, "USDCHF": -0.85, "XAUUSD": 0.2}}
+        rho["GBPUSD"] = {"EURUSD": 0.9, "GBPUSD": 1.0}
+        rho["USDCHF"] = {"EURUSD": -0.85, "USDCHF": 1.0}
+        patches = [
+            mock.patch('modules.risk_manager.correlation_monitor.correlations', side_effect=lambda s: rho.get(s, {})),
+            mock.patch('modules.risk_manager.position_tracker.positions',
+                       {1: Pos(1, "EURUSD", 0, 0.01), 2: Pos(2, "EURUSD", 0, 0.01), 3: Pos(3, "EURUSD", 0, 0.01)}),
+            mock.patch.object(Config, 'CORR_MAX_EXPOSURE', 0.04),
+            mock.patch.object(Config, 'CORR_THRESHOLD', 0.7),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_scales_and_blocks_correlated_entries(self):
+        # 0.03 EURUSD long open: a GBPUSD long adds to it, a short hedges it
+        self.assertAlmostEqual(self.rm.correlated_exposure("GBPUSD", "BUY"), 0.027)
+        self.assertEqual(self.rm.allowed_orders("GBPUSD", "BUY", 0.01, 3), 1)
+        self.assertEqual(self.rm.allowed_orders("GBPUSD", "SELL", 0.01, 3), 3)
+        # USDCHF is inversely correlated: shorting it is the same bet as EURUSD long
+        self.assertEqual(self.rm.allowed_orders("USDCHF", "SELL", 0.01, 3), 1)
+        self.assertEqual(self.rm.allowed_orders("XAUUSD", "BUY", 0.01, 3), 3)
+        self.assertEqual(self.rm.allowed_orders("GBPUSD", "BUY", 0.02, 3), 0)
+        with mock.patch.object(Config, 'CORR_MAX_EXPOSURE', 0):
+            self.assertEqual(self.rm.allowed_orders("GBPUSD", "BUY", 0.02, 3), 3)
+
+    def test_can_trade_reports_the_limit(self):
+        with mock.patch.object(self.rm, '_is_trading_session', return_value=True), \
+                mock.patch.object(self.rm, 'check_daily_drawdown', return_value=True), \
+                mock.patch.object(self.rm, 'check_news', return_value=True):
+            self.assertEqual(self.rm.can_trade("GBPUSD", "BUY", 0.02), (False, "Correlated Exposure Limit"))
+            self.assertEqual(self.rm.can_trade("GBPUSD", "BUY", 0.01), (True, "OK"))
+            self.assertEqual(self.rm.can_trade("GBPUSD"), (True, "OK"))
+
+if __name__ == '__main__':
+    unittest.main()
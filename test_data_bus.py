@@ -0,0 +1,121 @@
+import os
+import unittest
+from collections import namedtuple
+from unittest import mock
+import numpy as np
+from config import Config
+from modules.data_bus import SharedRing, MarketDataFeeder, MarketDataBus, BAR_DTYPE, TICK_DTYPE
+
+Tick = namedtuple('Tick', TICK_DTYPE.names)
+
+def make_rates(start, n, price=1.1):
+    rates = np.zeros(n, dtype=BAR_DTYPE)
+    rates['time'] = np.arange(start, start + n) * 60
+    rates['close'] = price + np.arange(n) * 0.0001
+    return rates
+
+class TestDataBus(unittest.TestCase):
+
+    def setUp(self):
+        self.name = f"razgon_test_{os.getpid()}"
+        self.writer = SharedRing(self.name, BAR_DTYPE, 10, create=True)
+        self.reader = SharedRing(self.name, BAR_DTYPE)
+
+    def tearDown(self):
+        self.reader.close()
+        self.writer.close()
+
+    def test_bars_append_and_forming_update(self):
+        self.writer.write_bars(make_rates(0, 5))
+        self.assertEqual(len(self.reader), 5)
+        seq = self.reader.seq
+
+        # Same last bar with a new close (forming bar) plus one new bar
+        update = make_rates(3, 3, price=1.2)
+        self.writer.write_bars(update)
+        self.assertNotEqual(self.reader.seq, seq)
+
+        bars = self.reader.read()
+        self.assertEqual(list(bars['time'] // 60), [0, 1, 2, 3, 4, 5])
+        self.assertAlmostEqual(bars['close'][-2], update['close'][1])
+
+    def test_ring_wraps_in_order(self):
+        self.writer.write_bars(make_rates(0, 8))
+        self.writer.write_bars(make_rates(5, 10))
+        bars = self.reader.read()
+        self.assertEqual(len(bars), 10)
+        self.assertEqual(list(bars['time'] // 60), list(range(5, 15)))
+        self.assertEqual(list(self.reader.read(3)['time'] // 60), [12, 13, 14])
+
+    def test_ticks_deduplicated(self):
+        name = self.name + "_ticks"
+        writer = SharedRing(name, TICK_DTYPE, 4, create=True)
+        try:
+            tick = Tick(1, 1.1, 1.2, 0.0, 0, 1000, 0, 0.0)
+            self.assertTrue(writer.write_tick(tick))
+            self.assertFalse(writer.write_tick(tick))
+            self.assertTrue(writer.write_tick(tick._replace(time_msc=1001, bid=1.3)))
+            self.assertEqual(list(writer.read()['bid']), [1.1, 1.3])
+        finally:
+            writer.close()
+
+class FakeTerminal:
+    def __init__(self):
+        self.info_calls = 0
+
+    def get_rates(self, symbol, tf, n_bars=500):
+        return make_rates(0, 20)[-n_bars:]
+
+    def get_tick(self, symbol):
+        return Tick(1, 1.1, 1.2, 0.0, 0, 1000, 0, 0.0)
+
+    def get_symbol_info(self, symbol):
+        self.info_calls += 1
+        return namedtuple('Info', 'point digits trade_contract_size spread')(0.00001, 5, 100000.0, 10)
+
+class TestFeederAndReader(unittest.TestCase):
+
+    def test_reader_gets_bars_and_symbol_info_without_the_terminal(self):
+        terminal = FakeTerminal()
+        with mock.patch.object(Config, 'DATA_BUS_NAME', f"razgon_feed_{os.getpid()}"):
+            feeder = MarketDataFeeder(["EURUSD"], ["M1"])
+            feeder.open()
+            bus = MarketDataBus()
+            try:
+                feeder.poll_once(terminal)
+                feeder.poll_once(terminal)
+                self.assertEqual(terminal.info_calls, 1)  # metadata is published once
+                info = bus.get_symbol_info("EURUSD")
+                self.assertEqual((info.point, info.digits), (0.00001, 5))
+                self.assertEqual(len(bus.get_rates("EURUSD", "M1", 5)), 5)
+            finally:
+                bus.close()
+                feeder.close()
+
+class TestBusWiring(unittest.TestCase):
+
+    def test_data_bus_switch_points_readers_at_the_bus(self):
+        import main
+        readers = (main.strategy, main.zone_index, main.correlation_monitor)
+        saved = [r.data_source for r in readers]
+        process, stop_event = mock.Mock(pid=1234), mock.Mock()
+        try:
+            with mock.patch.object(main, 'start_feeder_process', return_value=(process, stop_event)) as start:
+                main.start_data_bus()
+            symbols, timeframes = start.call_args.args
+            self.assertEqual(symbols, list(Config.SYMBOL_LIST))
+            for tf in (Config.TIMEFRAME_LTF, Config.TIMEFRAME_HTF, Config.CORR_TIMEFRAME, *Config.ZONE_TIMEFRAMES):
+                self.assertIn(tf, timeframes)
+            for reader in readers:
+                self.assertIs(reader.data_source, main.market_data_bus)
+
+            main.stop_data_bus()
+            stop_event.set.assert_called_once()
+            process.join.assert_called_once()
+            self.assertIsNone(main.data_feeder)
+        finally:
+            for reader, source in zip(readers, saved):
+                reader.data_source = source
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import csv
+import os
+import tempfile
+import unittest
+from unittest import mock
+from config import Config
+from modules.execution_stats import ExecutionStats, RETCODE_DONE
+
+T0 = 1_760_000_000  # 08:53 UTC -> LONDON
+
+class TestExecutionStats(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.stats = ExecutionStats()
+        self.stats.path = os.path.join(self.tmp.name, "executions.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fill(self, slip_pts, order_type="BUY", retcode=RETCODE_DONE, symbol="EURUSD"):
+        price = 1.10000
+        fill = price + slip_pts * 0.00001 * (1 if order_type == "BUY" else -1)
+        return self.stats.record(symbol, order_type, price, fill, 0.00001, T0, T0 + 0.05, retcode, 20)
+
+    def rows_on_disk(self):
+        if not os.path.exists(self.stats.path):
+            return []
+        with open(self.stats.path, newline='') as f:
+            return list(csv.DictReader(f))
+
+    def test_slippage_sign_and_fields(self):
+        row = self.fill(3)
+        self.assertEqual(row['slippage_pts'], 3.0)
+        self.assertEqual(self.fill(-2, "SELL")['slippage_pts'], -2.0)  # filled better than asked
+        self.assertEqual(row['session'], "LONDON")
+        self.assertEqual(row['latency_ms'], 50.0)
+
+    def test_flushes_by_batch_and_by_interval(self):
+        with mock.patch.object(Config, 'EXEC_FLUSH_BATCH', 3), \
+                mock.patch.object(Config, 'EXEC_FLUSH_INTERVAL', 300):
+            self.fill(1)
+            self.fill(1)
+            self.assertEqual(self.rows_on_disk(), [])
+            self.fill(1)
+            self.assertEqual(len(self.rows_on_disk()), 3)
+            self.assertEqual(self.stats.pending, [])
+
+            self.fill(1)
+            self.assertEqual(len(self.rows_on_disk()), 3)
+            with mock.patch('modules.execution_stats.time.time', return_value=self.stats.last_flush + 301):
+                self.fill(1)
+            self.assertEqual(len(self.rows_on_disk()), 5)
+
+    def test_adaptive_deviation_clamped(self):
+        with mock.patch.object(Config, 'ADAPTIVE_DEVIATION', True), \
+                mock.patch.object(Config, 'DEVIATION_MIN_SAMPLES', 20), \
+                mock.patch.object(Config, 'EXEC_FLUSH_BATCH', 10 ** 6):
+            for _ in range(19):
+                self.fill(10)
+            self.assertEqual(self.stats.get_deviation("EURUSD", 20), 20)  # not enough samples yet
+            self.fill(10)
+            self.assertEqual(self.stats.get_deviation("EURUSD", 20), 15)  # p99 10 x 1.5
+
+            for _ in range(40):
+                self.fill(0, symbol="USDJPY")
+            self.assertEqual(self.stats.get_deviation("USDJPY", 20), Config.DEVIATION_MIN)
+
+            for _ in range(40):
+                self.fill(500, symbol="XAUUSD")
+            self.assertEqual(self.stats.get_deviation("XAUUSD", 20), Config.DEVIATION_MAX)
+
+        with mock.patch.object(Config, 'ADAPTIVE_DEVIATION', False):
+            self.assertEqual(self.stats.get_deviation("XAUUSD", 20), 20)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import time
+import unittest
+import numpy as np
+import pandas as pd
+from modules import indicators
+
+class TestIndicatorParity(unittest.TestCase):
+    """The NumPy kernels must reproduce the previous pandas formulas exactly."""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        n = 500
+        self.close = pd.Series(1.1 + np.cumsum(rng.normal(0, 0.0003, n)))
+        self.close[100:130] = self.close[100]  # flat stretch: zero gains and losses
+        self.high = self.close + np.abs(rng.normal(0, 0.0002, n))
+        self.low = self.close - np.abs(rng.normal(0, 0.0002, n))
+
+    def test_ema(self):
+        for span in (9, 21):
+            expected = self.close.ewm(span=span, adjust=False).mean()
+            np.testing.assert_array_equal(indicators.ema(self.close.values, span), expected.values)
+
+    def test_rsi(self):
+        delta = self.close.diff()
+        gain = delta.where(delta > 0, 0)
+        loss = -delta.where(delta < 0, 0)
+        avg_gain = gain.ewm(com=13, min_periods=14, adjust=False).mean()
+        avg_loss = loss.ewm(com=13, min_periods=14, adjust=False).mean()
+        expected = 100 - (100 / (1 + avg_gain / avg_loss))
+        np.testing.assert_array_equal(indicators.rsi(self.close.values, 14), expected.values)
+
+    def test_true_range_and_atr(self):
+        prev_close = self.close.shift(1)
+        tr = pd.concat([self.high - self.low, (self.high - prev_close).abs(),
+                        (self.low - prev_close).abs()], axis=1).max(axis=1)
+        np.testing.assert_array_equal(
+            indicators.true_range(self.high.values, self.low.values, self.close.values), tr.values)
+
+        expected = tr.ewm(com=13, min_periods=14, adjust=False).mean()
+        out = np.empty(len(tr))
+        result = indicators.atr(self.high.values, self.low.values, self.close.values, 14, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_array_equal(result, expected.values)
+
+    def test_rolling(self):
+        np.testing.assert_array_equal(indicators.rolling_max(self.high.values, 19),
+                                      self.high.rolling(19).max().values)
+        np.testing.assert_array_equal(indicators.rolling_min(self.low.values, 19),
+                                      self.low.rolling(19).min().values)
+        self.assertTrue(np.isnan(indicators.rolling_max([1.0, 2.0], 5)).all())
+
+class TestBacktestSizes(unittest.TestCase):
+    """Long series take the compiled path: same values, pandas speed."""
+
+    def test_ewm_matches_and_keeps_up_with_pandas(self):
+        rng = np.random.default_rng(11)
+        for n in (indicators.EWM_LOOP_MAX, indicators.EWM_LOOP_MAX + 1, 20_000, 200_000):
+            s = pd.Series(1.1 + np.cumsum(rng.normal(0, 0.0003, n)))
+            s[0] = np.nan  # as after diff()
+            np.testing.assert_array_equal(indicators.ema(s.values, 21),
+                                          s.ewm(span=21, adjust=False).mean().values)
+            np.testing.assert_array_equal(indicators.wilder(s.values, 14),
+                                          s.ewm(com=13, min_periods=14, adjust=False).mean().values)
+            s[n // 3] = np.nan
+            np.testing.assert_array_equal(indicators.ema(s.values, 21),
+                                          s.ewm(span=21, adjust=False, ignore_na=True).mean().values)
+
+        x = s.values
+        started = time.perf_counter()
+        indicators.ema(x, 21)
+        kernel = time.perf_counter() - started
+        started = time.perf_counter()
+        s.ewm(span=21, adjust=False).mean()
+        reference = time.perf_counter() - started
+        # The Python loop was ~10x slower than pandas at 200k bars
+        self.assertLess(kernel, reference * 3 + 0.005)
+
+if __name__ == '__main__':
+    unittest.main()
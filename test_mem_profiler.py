@@ -0,0 +1,72 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from config import Config
+from modules.mem_profiler import MemoryMonitor
+
+HOLD = []
+
+def allocate_a_lot():
+    HOLD.append([str(i) * 8 for i in range(50_000)])
+
+class TestMemoryReport(unittest.TestCase):
+
+    def setUp(self):
+        self.monitor = MemoryMonitor()
+        self.addCleanup(self.monitor.stop)
+        self.addCleanup(HOLD.clear)
+
+    def test_report_without_tracing(self):
+        self.assertIn("tracemalloc is off", self.monitor.report())
+
+    def test_top_n_sites_and_growth_diff(self):
+        self.monitor.start()
+        first = self.monitor.report(top_n=3)
+        self.assertNotIn("Growth since last snapshot", first)
+
+        allocate_a_lot()
+        text = self.monitor.report(top_n=3)
+        top, growth = text.split("\nGrowth since last snapshot:\n")
+        top_sites = top.split("allocation sites:\n")[1].splitlines()
+        growth_sites = growth.splitlines()
+        self.assertEqual(len(top_sites), 3)
+        self.assertEqual(len(growth_sites), 3)
+        # The allocation this test made is the biggest growth, attributed to its line
+        self.assertIn("test_mem_profiler.py:", growth_sites[0])
+        self.assertTrue(growth_sites[0].lstrip().startswith("+"))
+        self.assertTrue(any("test_mem_profiler.py:" in line for line in top_sites))
+
+
+class TestMemCommand(unittest.TestCase):
+
+    def test_report_runs_off_the_event_loop(self):
+        from modules.telegram_bot import TelegramBot
+        from modules.mem_profiler import memory_monitor
+        threads = []
+
+        def report():
+            threads.append(threading.current_thread())
+            return "report"
+
+        replies = []
+
+        async def reply_text(text):
+            replies.append(text)
+
+        update = SimpleNamespace(message=SimpleNamespace(reply_text=reply_text))
+        context = SimpleNamespace(args=[])
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(Config, 'LOG_DIR', tmp), \
+                mock.patch.object(memory_monitor, 'report', report):
+            asyncio.run(TelegramBot().mem_command(update, context))
+            self.assertEqual(len(os.listdir(tmp)), 1)
+
+        self.assertIsNot(threads[0], threading.main_thread())
+        self.assertTrue(replies[0].startswith("report"))
+
+if __name__ == '__main__':
+    unittest.main()
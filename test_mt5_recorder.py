@@ -0,0 +1,96 @@
+import os
+import tempfile
+import time
+import unittest
+from collections import namedtuple
+from datetime import datetime
+from types import SimpleNamespace
+from modules.mt5_recorder import RecordingTerminal, ReplayTerminal, replay_session
+
+SymbolInfo = namedtuple('SymbolInfo', 'point ask bid')
+
+class TestSessionReplay(unittest.TestCase):
+
+    def test_record_then_replay(self):
+        prices = iter([1.1, 1.2])
+        terminal = SimpleNamespace(
+            TIMEFRAME_M1=1,
+            symbol_info=lambda s: SymbolInfo(0.00001, next(prices), 1.0),
+            order_send=lambda request: (10009, request['price']),
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "session.rec")
+            rec = RecordingTerminal(terminal, path)
+            rec.symbol_info("EURUSD")
+            rec.symbol_info("EURUSD")
+            rec.order_send({'price': 1.1})
+            rec.close()
+
+            replay = ReplayTerminal(path, speed=None)
+            self.assertEqual(replay.TIMEFRAME_M1, 1)
+            self.assertEqual(replay.symbol_info("EURUSD").ask, 1.1)
+            self.assertEqual(replay.symbol_info("EURUSD")._asdict()['ask'], 1.2)
+            # order_send is matched by name only, the request may differ
+            self.assertEqual(replay.order_send({'price': 9.9}), (10009, 1.1))
+            self.assertFalse(replay.finished)
+            replay.symbol_info("EURUSD")
+            self.assertTrue(replay.finished)
+            self.assertIsNone(replay.symbol_info("GBPUSD"))
+
+    def test_kwargs_and_date_ranges_are_part_of_the_key(self):
+        terminal = SimpleNamespace(
+            history_deals_get=lambda *args, position=None: ("range", args) if args else ("deals", position))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "session.rec")
+            rec = RecordingTerminal(terminal, path)
+            rec.history_deals_get(position=1)
+            rec.history_deals_get(position=2)
+            rec.history_deals_get(datetime(2025, 1, 1), datetime(2025, 1, 2))
+            rec.history_deals_get(datetime(2025, 1, 2), datetime(2025, 1, 3))
+            rec.close()
+
+            replay = ReplayTerminal(path, speed=None)
+            self.assertEqual(replay.history_deals_get(position=2), ("deals", 2))
+            self.assertEqual(replay.history_deals_get(position=1), ("deals", 1))
+            self.assertEqual(replay.history_deals_get(datetime(2025, 1, 2), datetime(2025, 1, 3))[1][0],
+                             datetime(2025, 1, 2))
+            self.assertIsNone(replay.history_deals_get(position=3))
+
+    def test_fast_replay_runs_on_virtual_time(self):
+        import main
+        from modules.clock import clock
+        from modules.mt5_interface import mt5_interface
+        from modules.risk_manager import risk_manager
+        from modules.soak_test import SyntheticTerminal, _install, _restore
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "session.rec")
+            terminal = SyntheticTerminal(["SYN000", "SYN001"], 1_760_000_000, 1800, seed=2)
+            saved = _install(terminal)
+            session_check = risk_manager._is_trading_session
+            risk_manager._is_trading_session = lambda: True  # the synthetic day starts at 00:00 UTC
+            try:
+                recorder = RecordingTerminal(terminal, path)
+                mt5_interface.set_backend(recorder)
+                clock.run_simulated(main.trading_loop(), terminal.clock, 600)
+                mt5_interface.shutdown()  # closes the recording
+                self.assertTrue(recorder._file.closed)
+
+                _install(terminal)  # replay starts from cold caches, like a fresh process
+                from modules.telegram_bot import telegram_bot
+                telegram_bot.trading_enabled = False
+                in_session = risk_manager._is_trading_session
+                started = time.perf_counter()
+                replay = replay_session(path, fast=True)
+                # The switches it flips for the replay are put back
+                self.assertFalse(telegram_bot.trading_enabled)
+                self.assertIs(risk_manager._is_trading_session, in_session)
+                self.assertTrue(replay.finished)
+                self.assertGreater(replay.calls_served, 50)
+                self.assertLess(time.perf_counter() - started, 10)
+            finally:
+                risk_manager._is_trading_session = session_check
+                _restore(saved)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from modules.news_calendar import NewsCalendar
+
+def ts(text):
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp()
+
+class TestNewsCalendar(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "news.csv")
+        self.write([
+            "2026-01-09T13:30:00,USD,HIGH,Non-Farm Payrolls",
+            "2026-01-09T13:50:00,USD,HIGH,Unemployment Rate",
+            "2026-01-09T09:00:00,EUR,LOW,Minor speech",
+            "2026-01-09T10:00:00,GBP,MEDIUM,GDP",
+        ])
+        self.calendar = NewsCalendar(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rows):
+        with open(self.path, "w") as f:
+            f.write("time,currency,impact,title\n" + "\n".join(rows) + "\n")
+
+    def test_blackout_lookup(self):
+        self.assertTrue(self.calendar.is_blocked("EURUSD", ts("2026-01-09T13:05:00"))[0])
+        # Overlapping USD windows are merged: 13:00 - 14:20
+        blocked, reason = self.calendar.is_blocked("XAUUSD", ts("2026-01-09T14:10:00"))
+        self.assertTrue(blocked)
+        self.assertIn("USD", reason)
+        self.assertFalse(self.calendar.is_blocked("EURUSD", ts("2026-01-09T14:25:00"))[0])
+        # LOW impact is below the default NEWS_MIN_IMPACT
+        self.assertFalse(self.calendar.is_blocked("EURJPY", ts("2026-01-09T09:00:00"))[0])
+        self.assertTrue(self.calendar.is_blocked("GBPJPY", ts("2026-01-09T10:10:00"))[0])
+
+    def test_reload_touches_only_changed_currencies(self):
+        self.calendar.poll()
+        self.write([
+            "2026-01-09T13:30:00,USD,HIGH,Non-Farm Payrolls",
+            "2026-01-09T13:50:00,USD,HIGH,Unemployment Rate",
+            "2026-01-09T09:00:00,EUR,LOW,Minor speech",
+            "2026-01-09T10:00:00,GBP,MEDIUM,GDP",
+            "2026-01-12T08:00:00,JPY,HIGH,BoJ",
+        ])
+        self.assertEqual(self.calendar.reload(), ["JPY"])
+        self.assertTrue(self.calendar.is_blocked("USDJPY", ts("2026-01-12T08:10:00"))[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from collections import namedtuple
+from unittest import mock
+from modules.position_tracker import PositionTracker
+
+Pos = namedtuple('Pos', 'ticket symbol type volume price_open price_current sl tp')
+
+def deal(entry, profit, reason=5):
+    return {'entry': entry, 'profit': profit, 'commission': -0.2, 'swap': 0.0,
+            'price': 1.1050, 'reason': reason, 'time': 1}
+
+class TestPositionTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.tracker = PositionTracker()
+        self.events = []
+        self.tracker.subscribe(self.events.append)
+
+    def kinds(self):
+        return [(e.kind, e.ticket) for e in self.events]
+
+    def test_diff_emits_open_modify_close(self):
+        a = Pos(1, "EURUSD", 0, 0.01, 1.1000, 1.1010, 1.0950, 1.1050)
+        b = Pos(2, "EURUSD", 1, 0.01, 1.1000, 1.0990, 1.1050, 1.0950)
+        self.tracker.update([a, b])
+        self.assertEqual(self.kinds(), [('opened', 1), ('opened', 2)])
+        self.assertEqual(self.tracker.by_symbol, {"EURUSD": {1, 2}})
+
+        # Price moves alone are not events
+        self.events.clear()
+        self.tracker.update([a._replace(price_current=1.1020), b])
+        self.assertEqual(self.events, [])
+        self.assertEqual(self.tracker.positions[1].price_current, 1.1020)
+
+        self.tracker.update([a._replace(sl=1.1001), b])
+        self.assertEqual(self.kinds(), [('modified', 1)])
+        self.assertEqual(self.events[0].previous.sl, 1.0950)
+
+        self.events.clear()
+        with mock.patch('modules.position_tracker.mt5_interface.get_position_deals',
+                        return_value=[deal(0, 0.0), deal(1, 5.0)]):
+            self.tracker.update([b])
+        self.assertEqual(self.kinds(), [('closed', 1)])
+        close = self.events[0].close
+        self.assertEqual(close['reason'], "TP")
+        self.assertAlmostEqual(close['profit'], 4.6)
+        self.assertEqual(self.tracker.symbols(), {"EURUSD"})
+
+        self.events.clear()
+        with mock.patch('modules.position_tracker.mt5_interface.get_position_deals', return_value=None):
+            self.tracker.update([])
+        self.assertEqual(self.kinds(), [('closed', 2)])
+        self.assertIsNone(self.events[0].close)
+        self.assertEqual(self.tracker.symbols(), set())
+
+    def test_failed_fetch_changes_nothing(self):
+        self.tracker.update([Pos(1, "EURUSD", 0, 0.01, 1.1, 1.1, 1.09, 1.11)])
+        self.events.clear()
+        with mock.patch('modules.position_tracker.mt5_interface.get_position_snapshot', return_value=None):
+            self.assertEqual(self.tracker.update(), [])
+        self.assertEqual(self.events, [])
+        self.assertIn(1, self.tracker.positions)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+import pandas as pd
+from modules.robustness import backtest, walk_forward, monte_carlo, summarize, TRADE_DTYPE
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0002, n))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'time': pd.to_datetime(np.arange(n) * 60, unit='s'),
+        'open': open_,
+        'high': np.maximum(open_, close) + 0.0001,
+        'low': np.minimum(open_, close) - 0.0001,
+        'close': close,
+    })
+
+class TestRobustness(unittest.TestCase):
+
+    def test_backtest_trades_do_not_overlap(self):
+        trades = backtest(random_walk(20000))
+        self.assertEqual(trades.dtype, TRADE_DTYPE)
+        self.assertGreater(len(trades), 0)
+        self.assertTrue(np.all(trades['entry_time'][1:] > trades['exit_time'][:-1]))
+        # Exits are either the full stop (-1R) or the 0.7R target
+        self.assertTrue(np.all(np.isclose(trades['r'], -1.0) | np.isclose(trades['r'], 0.7)))
+
+    def test_walk_forward_windows(self):
+        df = random_walk(16000, seed=1)
+        result = walk_forward(df, {'sl_mult': [1.5, 2.0]}, train_bars=8000, test_bars=4000,
+                              workers=1, warmup_bars=2000)
+        self.assertEqual(len(result['windows']), 2)
+        for w in result['windows']:
+            self.assertIn(w['params']['sl_mult'], (1.5, 2.0))
+        self.assertEqual(result['summary']['trades'], len(result['trades']))
+
+    def test_monte_carlo(self):
+        r = np.array([0.7] * 6 + [-1.0] * 4)
+        shuffled = monte_carlo(r, n_sims=500, risk_per_trade=10.0, workers=1, seed=3)
+        # Reordering never changes the final result, only the path
+        self.assertAlmostEqual(shuffled['return_pct'][5], shuffled['return_pct'][95])
+        self.assertGreaterEqual(shuffled['max_dd_pct'][99], shuffled['max_dd_pct'][50])
+
+        boot = monte_carlo(r, n_sims=500, method='bootstrap', risk_per_trade=10.0,
+                           ruin_pct=30.0, workers=1, seed=3)
+        self.assertTrue(0.0 < boot['ruin_probability'] < 1.0)
+        self.assertEqual(summarize(r)['trades'], 10)
+
+if __name__ == '__main__':
+    unittest.main()
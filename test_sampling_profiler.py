@@ -0,0 +1,90 @@
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from config import Config
+from modules.sampling_profiler import SamplingProfiler
+
+def busy_inner(stop):
+    # Plain loop so busy_inner itself is the leaf frame
+    x = 0
+    while not stop:
+        x += 1
+    return x
+
+def busy_outer(stop):
+    return busy_inner(stop)
+
+class TestSamplingProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patch = mock.patch.object(Config, 'LOG_DIR', self.tmp.name)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp.cleanup()
+
+    def test_collapsed_output_and_summary(self):
+        stop = []
+        worker = threading.Thread(target=busy_outer, args=(stop,))
+        worker.start()
+        profiler = SamplingProfiler()
+        try:
+            self.assertTrue(profiler.start(thread_id=worker.ident))
+            self.assertFalse(profiler.start(thread_id=worker.ident))
+            time.sleep(0.3)
+            path, summary = profiler.stop()
+        finally:
+            stop.append(True)
+            worker.join()
+
+        self.assertGreater(profiler.samples, 10)
+        with open(path) as f:
+            lines = f.read().split("\n")
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertTrue(stack.endswith("test_sampling_profiler.py:busy_outer;test_sampling_profiler.py:busy_inner"))
+        self.assertGreater(int(count), 0)
+        name, own, total = profiler.top_functions()[0]
+        self.assertEqual(name, "test_sampling_profiler.py:busy_inner")
+        self.assertIn("busy_inner", summary)
+        self.assertIsNone(profiler.stop())
+
+    def test_auto_trigger_respects_threshold_and_cooldown(self):
+        profiler = SamplingProfiler()
+        with mock.patch.object(Config, 'PROFILE_AUTO_THRESHOLD', 2.0), \
+                mock.patch.object(Config, 'PROFILE_AUTO_DURATION', 0.05):
+            profiler.note_iteration(1.0)
+            self.assertFalse(profiler.running)
+            profiler.note_iteration(3.0)
+            self.assertTrue(profiler.running)
+            profiler._thread.join()
+            # Finished on its own: queued for run() to announce
+            self.assertEqual(len(profiler._pending), 1)
+            profiler.note_iteration(3.0)
+            self.assertFalse(profiler.running)  # cooldown
+
+class TestProfileCommand(unittest.TestCase):
+
+    def test_bad_duration_gets_the_usage_text(self):
+        from modules.telegram_bot import TelegramBot
+        from modules.sampling_profiler import sampling_profiler
+        replies = []
+
+        async def reply_text(text):
+            replies.append(text)
+
+        update = SimpleNamespace(message=SimpleNamespace(reply_text=reply_text))
+        with mock.patch.object(sampling_profiler, 'start') as start:
+            for args in (["start", "abc"], ["start", "-5"]):
+                asyncio.run(TelegramBot().profile_command(update, SimpleNamespace(args=args)))
+        start.assert_not_called()
+        self.assertEqual(len(replies), 2)
+        self.assertTrue(all(r.startswith("Usage: /profile") for r in replies))
+
+if __name__ == '__main__':
+    unittest.main()
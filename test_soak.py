@@ -0,0 +1,30 @@
+import asyncio
+import unittest
+from modules.soak_test import SyntheticTerminal, run_soak, check_budget, DEFAULT_BUDGET
+
+class TestSoakHarness(unittest.TestCase):
+
+    def test_terminal_serves_closed_history_on_sim_clock(self):
+        terminal = SyntheticTerminal(["SYN000"], 1_760_000_000, 3600)
+        rates = terminal.copy_rates_from_pos("SYN000", terminal.TIMEFRAME_M1, 0, 300)
+        self.assertEqual(len(rates), 300)
+        self.assertLessEqual(rates['time'][-1], terminal.now)
+        terminal.advance(600)
+        later = terminal.copy_rates_from_pos("SYN000", terminal.TIMEFRAME_M1, 0, 300)
+        self.assertEqual(later['time'][-1] - rates['time'][-1], 600)
+        # Same seed, same market
+        again = SyntheticTerminal(["SYN000"], 1_760_000_000, 3600)
+        self.assertEqual(again.copy_rates_from_pos("SYN000", again.TIMEFRAME_M1, 0, 300)['close'][-1],
+                         rates['close'][-1])
+
+    def test_short_run_reports_metrics(self):
+        result = asyncio.run(run_soak(3, 0.05))
+        self.assertGreater(result['iterations'], 10)
+        self.assertGreater(result['terminal_calls'], 0)
+        for key in DEFAULT_BUDGET:
+            self.assertIn(key, result)
+        self.assertEqual(check_budget(result, {key: float('inf') for key in DEFAULT_BUDGET}), [])
+        self.assertEqual(len(check_budget(result, {'iter_p95_ms': -1.0})), 1)
+
+if __name__ == '__main__':
+    unittest.main()
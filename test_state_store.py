@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from config import Config
+from modules.clock import clock, SimulatedTime
+from modules.state_store import StateStore, STATE_VERSION
+from modules.risk_manager import risk_manager
+from modules.telegram_bot import telegram_bot
+from modules.market_analysis import market_analyzer
+from modules.strategy import strategy
+from modules.zone_index import zone_index, SymbolZones
+
+START = 1_760_000_000  # 2025-10-09 08:53:20 UTC
+
+class TestStateStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = StateStore(os.path.join(self.tmp.name, "state.json"))
+        self.source = SimulatedTime(START)
+        clock.set_source(self.source)
+        self.saved = (risk_manager.export_state(), risk_manager.day, telegram_bot.trading_enabled,
+                      market_analyzer.last_report_time, strategy._memo, strategy.signal_bars,
+                      zone_index.zones, zone_index._last_bar)
+
+    def tearDown(self):
+        risk, risk_manager.day, telegram_bot.trading_enabled, market_analyzer.last_report_time, \
+            strategy._memo, strategy.signal_bars, zone_index.zones, zone_index._last_bar = self.saved
+        for k, v in risk.items():
+            if k != 'day':
+                setattr(risk_manager, k, v)
+        clock.set_source(None)
+        self.tmp.cleanup()
+
+    def populate(self):
+        risk_manager.day = clock.utcnow().date()
+        risk_manager.daily_start_balance = 1000.0
+        risk_manager.trades_today = 6
+        risk_manager.closed_today = 3
+        risk_manager.realized_pnl_today = -4.5
+        telegram_bot.trading_enabled = True
+        market_analyzer.last_report_time = START - 600
+        signal = {'signal': 'BUY', 'sl': np.float64(1.09), 'tp': np.float64(1.11), 'sl_pips': np.float64(100.0),
+                  'price': np.float64(1.1), 'time': pd.Timestamp(START - 60, unit='s'),
+                  'indicators': {'ema_fast': np.float64(1.1), 'ema_slow': np.float64(1.09),
+                                 'rsi': np.float64(60.0), 'atr': np.float64(0.001), 'h1_trend': 1}}
+        strategy._memo = {"EURUSD": (START - 60, signal), "GBPUSD": (START - 60, None)}
+        strategy.signal_bars = {"EURUSD": [signal['time'], "sid", True]}
+        zone_index.zones = {"EURUSD": SymbolZones.build([1.10, 1.1001, 1.12], [1, 2, 4], 0.0005, 0.002)}
+        zone_index._last_bar = {("EURUSD", "H1"): START - 3600}
+
+    def cold(self):
+        risk_manager.day = None
+        risk_manager.daily_start_balance = 0.0
+        risk_manager.trades_today = risk_manager.closed_today = 0
+        risk_manager.realized_pnl_today = 0.0
+        telegram_bot.trading_enabled = False
+        market_analyzer.last_report_time = 0
+        strategy._memo, strategy.signal_bars = {}, {}
+        zone_index.zones, zone_index._last_bar = {}, {}
+
+    def test_round_trip(self):
+        self.populate()
+        self.assertTrue(self.store.save())
+        self.cold()
+        self.source.advance(300)
+        self.assertEqual(self.store.restore(), ['toggles', 'risk', 'signal_memo', 'zones'])
+
+        self.assertTrue(telegram_bot.trading_enabled)
+        self.assertEqual(market_analyzer.last_report_time, START - 600)
+        self.assertEqual((risk_manager.trades_today, risk_manager.closed_today), (6, 3))
+        self.assertEqual(risk_manager.daily_start_balance, 1000.0)
+        bar_time, signal = strategy._memo["EURUSD"]
+        self.assertEqual(bar_time, START - 60)
+        self.assertEqual(signal['time'], pd.Timestamp(START - 60, unit='s'))
+        self.assertAlmostEqual(signal['sl'], 1.09)
+        self.assertIsNone(strategy._memo["GBPUSD"][1])
+        # The restored signal was already traded on this bar: the loop must not take it again
+        self.assertEqual(strategy.signal_bars, {"EURUSD": [signal['time'], "sid", True]})
+        zones = zone_index.zones["EURUSD"]
+        self.assertEqual(len(zones), 2)
+        self.assertEqual(zones.tf_mask.tolist(), [3, 4])
+        self.assertEqual(zone_index._last_bar, {("EURUSD", "H1"): START - 3600})
+
+    def test_yesterdays_counters_and_changed_settings_start_cold(self):
+        self.populate()
+        self.store.save()
+        self.cold()
+        self.source.advance(16 * 3600)   # next UTC day
+        saved_fast = Config.EMA_FAST
+        Config.EMA_FAST = saved_fast + 1
+        try:
+            self.assertEqual(self.store.restore(), ['toggles'])
+        finally:
+            Config.EMA_FAST = saved_fast
+        self.assertEqual(risk_manager.trades_today, 0)
+        self.assertEqual(strategy._memo, {})
+        self.assertEqual(strategy.signal_bars, {})
+        self.assertEqual(zone_index.zones, {})
+
+    def test_rejects_other_versions_stale_and_corrupt_files(self):
+        self.populate()
+        self.store.save()
+        with open(self.store.path) as f:
+            state = json.load(f)
+
+        state['version'] = STATE_VERSION + 1
+        self.store.write(state)
+        self.assertIsNone(self.store.load())
+
+        state['version'] = STATE_VERSION
+        state['saved_at'] = START - Config.STATE_MAX_AGE - 1
+        self.store.write(state)
+        self.assertIsNone(self.store.load())
+
+        with open(self.store.path, "w") as f:
+            f.write('{"version": 1, "saved_')
+        self.assertIsNone(self.store.load())
+        self.assertEqual(self.store.restore(), [])
+
+if __name__ == '__main__':
+    unittest.main()
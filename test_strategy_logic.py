@@ -1,6 +1,7 @@
 
 import asyncio
 import pandas as pd
+from config import Config
 from modules.strategy import strategy
 from modules.mt5_interface import mt5_interface
 from unittest.mock import MagicMock, patch
@@ -37,7 +38,9 @@ async def simulate_strategy():
     # prev: Fast <= Slow -> 1.1040, 1.1050
     # curr: Fast > Slow -> 1.1080, 1.1060
     
-    with patch('modules.mt5_interface.mt5_interface.get_data') as mock_get_data:
+    # Forming mode reads the DataFrames below; closed mode would go to get_rates first
+    with patch.object(Config, 'SIGNAL_MODE', 'forming'), \
+            patch('modules.mt5_interface.mt5_interface.get_data') as mock_get_data:
         # First call for H1, second for M1
         mock_get_data.side_effect = [df_h1, df_m1]
         mock_sym_info = MagicMock()
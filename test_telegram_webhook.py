@@ -0,0 +1,142 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from urllib.parse import parse_qs
+import httpx
+from config import Config
+from modules.telegram_bot import TelegramBot
+from modules.webhook_server import WebhookServer
+from modules.state_store import state_store
+
+class FakeTelegramAPI:
+    """Just enough of api.telegram.org for the bot to start and reply."""
+
+    def __init__(self):
+        self.calls = []
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def result_for(self, method, params):
+        if method == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "Razgon", "username": "razgon_test_bot"}
+        if method == "sendMessage":
+            return {"message_id": 2, "date": 0, "text": params.get("text", ""),
+                    "chat": {"id": int(params.get("chat_id", 0)), "type": "private"}}
+        return True
+
+    async def _handle(self, reader, writer):
+        request_line = await reader.readline()
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            k, _, v = line.decode().partition(":")
+            headers[k.strip().lower()] = v.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+        method = request_line.decode().split()[1].rsplit("/", 1)[-1]
+        if headers.get("content-type", "").startswith("application/json"):
+            params = json.loads(body or b"{}")
+        else:
+            params = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+        self.calls.append((method, params))
+
+        payload = json.dumps({"ok": True, "result": self.result_for(method, params)}).encode()
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                     b"Content-Length: " + str(len(payload)).encode() + b"\r\nConnection: close\r\n\r\n" + payload)
+        await writer.drain()
+        writer.close()
+
+class TestTelegramWebhook(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.saved = {k: getattr(Config, k) for k in (
+            'TELEGRAM_TOKEN', 'TELEGRAM_MODE', 'TELEGRAM_API_BASE_URL', 'TELEGRAM_WEBHOOK_URL',
+            'TELEGRAM_WEBHOOK_PORT', 'TELEGRAM_WEBHOOK_PATH', 'TELEGRAM_WEBHOOK_SECRET')}
+        # /on snapshots the switch
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved_state_path = state_store.path
+        state_store.path = os.path.join(self.tmp.name, "state.json")
+        self.api = FakeTelegramAPI()
+        await self.api.start()
+        Config.TELEGRAM_TOKEN = "123:TEST"
+        Config.TELEGRAM_MODE = "webhook"
+        Config.TELEGRAM_API_BASE_URL = f"http://127.0.0.1:{self.api.port}"
+        Config.TELEGRAM_WEBHOOK_URL = "https://bot.example.com"
+        Config.TELEGRAM_WEBHOOK_PORT = 0
+        Config.TELEGRAM_WEBHOOK_PATH = "/hook-abc"
+        Config.TELEGRAM_WEBHOOK_SECRET = "s3cret"
+
+    async def asyncTearDown(self):
+        for k, v in self.saved.items():
+            setattr(Config, k, v)
+        state_store.path = self.saved_state_path
+        self.tmp.cleanup()
+        await self.api.stop()
+
+    async def test_command_round_trip(self):
+        bot = TelegramBot()
+        task = asyncio.create_task(bot.run())
+        try:
+            for _ in range(200):
+                if bot.webhook_server and any(m == "setWebhook" for m, _ in self.api.calls):
+                    break
+                await asyncio.sleep(0.02)
+            self.assertIsNotNone(bot.webhook_server, "webhook mode did not start")
+            webhook = dict(self.api.calls)["setWebhook"]
+            self.assertEqual(webhook["url"], "https://bot.example.com/hook-abc")
+
+            update = {"update_id": 1, "message": {
+                "message_id": 5, "date": 0, "text": "/on",
+                "chat": {"id": 42, "type": "private"},
+                "from": {"id": 42, "is_bot": False, "first_name": "T"},
+                "entities": [{"type": "bot_command", "offset": 0, "length": 3}]}}
+            url = f"http://127.0.0.1:{bot.webhook_server.port}/hook-abc"
+            async with httpx.AsyncClient() as client:
+                bad = await client.post(url, json=update, headers={"X-Telegram-Bot-Api-Secret-Token": "nope"})
+                self.assertEqual(bad.status_code, 403)
+                ok = await client.post(url, json=update, headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"})
+                self.assertEqual(ok.status_code, 200)
+
+            for _ in range(200):
+                if any(m == "sendMessage" for m, _ in self.api.calls):
+                    break
+                await asyncio.sleep(0.02)
+            sent = [p for m, p in self.api.calls if m == "sendMessage"]
+            self.assertEqual(len(sent), 1)
+            self.assertIn("Trading ENABLED", sent[0]["text"])
+            self.assertTrue(bot.trading_enabled)
+        finally:
+            task.cancel()
+            await bot.stop()
+
+    async def test_webhook_needs_a_secret(self):
+        Config.TELEGRAM_WEBHOOK_SECRET = None
+        bot = TelegramBot()
+        self.assertFalse(await bot._start_webhook())  # run() falls back to polling
+        self.assertIsNone(bot.webhook_server)
+
+        received = []
+
+        async def on_update(data):
+            received.append(data)
+
+        server = WebhookServer("127.0.0.1", 0, "/telegram", None, on_update)
+        await server.start()
+        try:
+            async with httpx.AsyncClient() as client:
+                forged = await client.post(f"http://127.0.0.1:{server.port}/telegram", json={"update_id": 1})
+            self.assertEqual(forged.status_code, 403)
+            self.assertEqual(received, [])
+        finally:
+            await server.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+from modules.mt5_interface import mt5_interface
+from modules.trade_journal import TradeJournal
+
+def deal(ticket, position, entry, profit, symbol="EURUSD", commission=-0.1, at=None):
+    at = int(time.time()) - 3600 if at is None else at
+    return {'ticket': ticket, 'position_id': position, 'time': at, 'symbol': symbol,
+            'type': 0, 'entry': entry, 'volume': 0.01, 'price': 1.1, 'profit': profit,
+            'commission': commission, 'swap': 0.0, 'reason': 3}
+
+class TestTradeJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.journal = TradeJournal(os.path.join(self.tmp.name, "journal.db"))
+        self.journal.start()
+
+    def tearDown(self):
+        self.journal.stop()
+        self.tmp.cleanup()
+
+    def test_rows_are_written_in_background(self):
+        signal = {'signal': 'BUY', 'price': 1.1, 'sl': 1.09, 'tp': 1.107, 'sl_pips': 10.0, 'time': '2026-01-09',
+                  'indicators': {'ema_fast': 1.101, 'ema_slow': 1.1, 'rsi': 60.0, 'atr': 0.001, 'h1_trend': 1}}
+        signal_id = self.journal.record_signal("EURUSD", signal)
+        for i in range(3):
+            self.journal.record_order("EURUSD", "BUY", 0.01, 1.1, 1.09, 1.107, 20, 10009, 100 + i, 35.0, "done", signal_id)
+            self.journal.record_fill("EURUSD", "BUY", 100 + i, 200 + i, 0.01, 1.1001, 1.0)
+        self.journal.record_modification(100, "EURUSD", "BREAK_EVEN", 1.09, 1.1001, 1.107, True)
+        self.journal.stop()
+
+        conn = sqlite3.connect(self.journal.path)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("SELECT rsi, h1_trend FROM signals").fetchone(), (60.0, 1))
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM orders WHERE signal_id = ?", (signal_id,)).fetchone()[0], 3)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM fills").fetchone()[0], 3)
+        self.assertEqual(conn.execute("SELECT ok FROM modifications").fetchone()[0], 1)
+        conn.close()
+
+    def test_stats_from_deals(self):
+        deals = [deal(1, 10, 0, 0.0), deal(2, 10, 1, 5.0),       # win
+                 deal(3, 11, 0, 0.0), deal(4, 11, 1, -2.0),      # loss
+                 deal(5, 12, 0, 0.0, "GBPUSD"), deal(6, 12, 1, 3.0, "GBPUSD"),
+                 deal(7, 13, 0, 0.0)]                            # still open
+        self.journal.record_deals(deals)
+        self.journal.record_deals(deals[:2])  # re-synced window, ignored
+        self.journal.stop()
+
+        stats = self.journal.get_stats()
+        self.assertEqual(set(stats), {"EURUSD", "GBPUSD"})
+        eur = stats["EURUSD"]
+        self.assertEqual((eur['trades'], eur['wins']), (2, 1))
+        self.assertAlmostEqual(eur['net'], 5.0 - 2.0 - 0.4)
+        self.assertAlmostEqual(eur['profit_factor'], 4.8 / 2.2)
+        self.assertEqual(list(self.journal.get_stats("GBPUSD")), ["GBPUSD"])
+        self.assertEqual(len(self.journal.recent_trades(10)), 3)
+        self.assertIn("EURUSD", self.journal.format_stats())
+
+    def test_stats_window_on_the_server_clock(self):
+        offset = 3 * 3600  # server at UTC+3
+        server_now = time.time() + offset
+        fresh = server_now - 7 * 86400 + 3600    # closed 6d23h ago
+        stale = server_now - 7 * 86400 - 3600    # 7d1h ago: outside, although within 7d of UTC "now"
+        self.journal.record_deals([deal(1, 10, 0, 0.0, at=fresh - 60), deal(2, 10, 1, 5.0, at=fresh),
+                                   deal(3, 11, 0, 0.0, at=stale - 60), deal(4, 11, 1, -2.0, at=stale)])
+        self.journal.stop()
+
+        with mock.patch.object(mt5_interface, 'server_offset', 0):
+            mt5_interface._track_server_offset(int(server_now) - 5)
+            self.assertEqual(mt5_interface.server_offset, offset)
+            mt5_interface._track_server_offset(int(server_now) - 86400 - 900)  # weekend quote, ignored
+            self.assertEqual(mt5_interface.server_offset, offset)
+            stats = self.journal.get_stats(days=7)
+        self.assertEqual(stats["EURUSD"]['trades'], 1)
+        self.assertAlmostEqual(stats["EURUSD"]['net'], 4.8)
+
+if __name__ == '__main__':
+    unittest.main()
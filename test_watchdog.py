@@ -0,0 +1,48 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+from config import Config
+from modules.watchdog import LoopWatchdog
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+class TestLoopWatchdog(unittest.IsolatedAsyncioTestCase):
+
+    async def test_stall_detected_with_stack_and_cooldown(self):
+        watchdog = LoopWatchdog()
+        watchdog.interval = 0.02
+        watchdog.threshold = 0.1
+        alerts = []
+
+        async def notify(text):
+            alerts.append(text)
+
+        with mock.patch.object(Config, 'LOOP_LAG_ALERT_COOLDOWN', 60):
+            task = asyncio.create_task(watchdog.run(notify=notify))
+            try:
+                await asyncio.sleep(0.1)
+                for _ in range(2):
+                    block_the_loop(0.3)
+                    await asyncio.sleep(0.1)
+            finally:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        self.assertEqual(watchdog.stalls, 2)
+        self.assertGreaterEqual(watchdog.max_lag, 0.25)
+        self.assertTrue(any(lag > watchdog.threshold for lag in watchdog.samples))
+        # Second stall falls inside the cooldown: one alert, carrying the blocking frame
+        self.assertEqual(len(alerts), 1)
+        self.assertIn("Event loop stall", alerts[0])
+        self.assertIn("block_the_loop", alerts[0])
+        stats = watchdog.get_stats()
+        self.assertEqual(stats['stalls'], 2)
+        self.assertGreaterEqual(stats['max_ms'], 250)
+
+if __name__ == '__main__':
+    unittest.main()
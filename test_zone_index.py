@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+import numpy as np
+from config import Config
+from modules.zone_index import ZoneIndex, SymbolZones, TF_SECONDS
+
+RATE_DTYPE = [('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8')]
+
+def random_rates(n, step, seed):
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.001, n))
+    rates = np.zeros(n, dtype=RATE_DTYPE)
+    rates['time'] = 1_700_000_000 + np.arange(n) * step
+    rates['open'] = np.r_[close[0], close[:-1]]
+    rates['close'] = close
+    rates['high'] = np.maximum(rates['open'], close) + rng.uniform(0, 0.0008, n)
+    rates['low'] = np.minimum(rates['open'], close) - rng.uniform(0, 0.0008, n)
+    return rates
+
+class FakeSource:
+    """History per timeframe; `end` moves forward to simulate bars closing."""
+
+    def __init__(self, size=1200):
+        self.rates = {tf: random_rates(size, TF_SECONDS[tf], seed) for seed, tf in enumerate(Config.ZONE_TIMEFRAMES)}
+        self.end = {tf: size // 2 for tf in self.rates}
+        self.calls = 0
+
+    def get_rates(self, symbol, tf, n_bars=500):
+        self.calls += 1
+        end = self.end[tf]
+        return self.rates[tf][max(0, end - n_bars):end]
+
+class TestZoneIndex(unittest.TestCase):
+
+    def test_nearest_matches_brute_force(self):
+        rng = np.random.default_rng(7)
+        prices = rng.uniform(1.0, 1.2, 400)
+        zones = SymbolZones.build(prices, np.ones(400, dtype=np.int64), 0.002, 0.008)
+        self.assertEqual(zones.touches.sum(), 400)
+        self.assertTrue(np.all(np.diff(zones.centers) > 0))
+        self.assertTrue(np.all(zones.highs - zones.lows <= 0.002))
+
+        for price in rng.uniform(0.99, 1.21, 200):
+            below, above = zones.nearest(price)
+            under = zones.centers[zones.centers < price]
+            over = zones.centers[zones.centers >= price]
+            self.assertEqual(below and below['price'], under.max() if len(under) else None)
+            self.assertEqual(above and above['price'], over.min() if len(over) else None)
+
+    def test_incremental_update_tracks_new_pivots(self):
+        source = FakeSource()
+        index = ZoneIndex(source)
+        # Windows longer than the history, so a rebuild sees exactly the bars the index saw
+        windows = {tf: 2000 for tf in Config.ZONE_TIMEFRAMES}
+        with mock.patch.object(Config, 'ZONE_CHECK_INTERVAL', 0), \
+                mock.patch.object(Config, 'ZONE_TIMEFRAMES', windows):
+            zones = index.get("EURUSD")
+            self.assertIsNotNone(zones)
+
+            # Close 30 more H1 bars one at a time and 5 H4 bars; D1 stays put
+            for _ in range(30):
+                source.end["H1"] += 1
+                self.assertIs(index.get("EURUSD"), zones)
+            source.end["H4"] += 5
+            self.assertIs(index.get("EURUSD"), zones)
+
+            # Same pivots as a rebuild over the same history
+            incremental = zones.touches.sum()
+            self.assertTrue(np.all(np.diff(zones.centers) > 0))
+            rebuilt = ZoneIndex(source).build("EURUSD")
+            self.assertEqual(incremental, rebuilt.touches.sum())
+
+            # No new bar: one cheap head fetch per timeframe, no rebuild
+            source.calls = 0
+            index.get("EURUSD")
+            self.assertEqual(source.calls, len(Config.ZONE_TIMEFRAMES))
+
+            # A new daily bar rebuilds
+            source.end["D1"] += 1
+            self.assertIsNot(index.get("EURUSD"), zones)
+
+    def test_blocks_uses_atr_distance(self):
+        zones = SymbolZones.build([1.1000, 1.1200], [1, 1], 0.001, 0.0010)
+        with mock.patch.object(Config, 'ZONE_NEAR_ATR', 1.0):
+            self.assertTrue(zones.blocks('BUY', 1.1195))
+            self.assertFalse(zones.blocks('BUY', 1.1100))
+            self.assertTrue(zones.blocks('SELL', 1.1005))
+            self.assertFalse(zones.blocks('SELL', 1.1100))
+
+if __name__ == '__main__':
+    unittest.main()